@@ -1,11 +1,8 @@
 import json
 import os
 import time
-import glob
 import traceback
-import zipfile
-import sqlite3
-import pyautogui
+import contextlib
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
@@ -13,11 +10,23 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
-from selenium.common.exceptions import UnexpectedAlertPresentException
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import TimeoutException, UnexpectedAlertPresentException
 import multiprocessing
-from multiprocessing import Barrier, Queue
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from colorama import Fore, Style, init
+from http_uploader import HttpUploader, HttpUploadError, LoggedOutError, load_cookies
+from browser_session import block_resources, get_base_url, get_profile_account, get_profile_dir, get_session_state, clear_session_cookies, is_throttled, set_profile_account, wait_for_challenge, inject_cookies
+from progress_db import init_db, is_processed, mark_processed, filter_unprocessed, index_hashes, mark_queued, mark_started, mark_step, mark_failed, get_state_counts, load_metadata, record_step_timing
+from preflight import run_preflight, scan_zip, shutdown_pool
+from scheduler import order_work
+from categories import CategoryIndex, find_category, get_category_catalogue, load_cached_categories, save_categories, is_stale, refresh_in_background
+from watcher import watch_zips
+from routing import find_zips, route_zips
+from driver_cache import resolve_chromedriver
+from run_report import StepTimer, build_run_report
+from rate_limiter import RateLimiter
+from session_pool import SessionPool, check_cookie_file, list_cookie_files
+from simulated_driver import SimulatedDriver, simulated_sizes
 import tkinter as tk
 import TKinterModernThemes as TKMT
 import threading
@@ -40,9 +49,21 @@ class ColoredFormatter(logging.Formatter):
         else:
             return msg
 
+def get_mp_context():
+    # Forking this process copies SQLite's lock state mid-write from the feeder thread, which can
+    # deadlock a browser's first database call. Fork server and spawned processes start clean, so the
+    # browsers get the log and progress queues through run_browser_process instead of inheriting them.
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('forkserver')
+    return multiprocessing.get_context('spawn')
+
+mp_context = get_mp_context()
+
 # Logging setup
-log_queue = Queue()
-progress_queue = Queue()
+log_queue = mp_context.Queue()
+# Set by Stop Upload so watch mode stops feeding the queue
+watch_stop = threading.Event()
+progress_queue = mp_context.Queue()
 
 class QueueHandler(logging.Handler):
     def __init__(self, log_queue):
@@ -72,56 +93,36 @@ def print_progress(current, total):
     if current == total:
         logger.info("Upload complete!")
 
-def process_single_zip(zip_path, driver, config, lock, tag_to_use, shared_processed, shared_total, shared_queue, shared_turn, num_browsers, selected_name):
+def process_single_zip(zip_path, driver, config, tag_to_use, shared_processed, shared_total, submit_slots, selected_href, next_zip_path=None, prefilled=False, next_href=None, worker_id=None, limiter=None, account=None):
     zip_path = os.path.abspath(zip_path)
+    worker = worker_id if worker_id is not None else 0
     logger.info(f"Processing {zip_path}...")
+    mark_started(zip_path, worker)
     
-    # Calculate wait time based on file size
+    # Calculate upload timeout based on file size
     size_mb = os.path.getsize(zip_path) / (1024 * 1024)
-    wait_seconds = int(config.get('upload_wait_base', 30) + size_mb * config.get('upload_wait_per_mb', 0.75))
-    logger.info(f"File size: {size_mb:.2f} MB, calculated wait time: {wait_seconds} seconds")
+    # Completion is detected from the page; this is only the give-up point
+    wait_seconds = int(max(config.get('upload_wait_timeout', 180), config.get('upload_wait_base', 30) + size_mb * config.get('upload_wait_per_mb', 0.75)))
+    logger.info(f"File size: {size_mb:.2f} MB, upload timeout: {wait_seconds} seconds")
     
-    # Get description and tagline from README.md in zip
-    description, tagline = get_desc_and_tagline(zip_path)
-    logger.info(f"Tagline: {tagline}")
-    logger.info(f"Description: {description[:50]}...")  # Preview
-
-    # Fill title (use zip filename without extension)
-    logger.info("Step: Filling title...")
-    title = os.path.basename(zip_path).replace('.zip', '').replace('_', ' ')
-    title_input = WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.CSS_SELECTOR, "input[name='title']")))
-    highlight_element(driver, title_input)
-    driver.execute_script("arguments[0].value = arguments[1];", title_input, title)
-    logger.info(f"Title filled: {title}")
-    if config.get('manual_mode', False):
-        input("Press Enter to continue after filling title...")
-
-    # Fill tag line
-    logger.info("Step: Filling tag line...")
-    tag_line_input = WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.CSS_SELECTOR, "input[name='tag_line']")))
-    highlight_element(driver, tag_line_input)
-    driver.execute_script("arguments[0].value = arguments[1];", tag_line_input, tagline)
-    logger.info("Tag line filled.")
-    if config.get('manual_mode', False):
-        input("Press Enter to continue after filling tag line...")
-
-    # Fill version string
-    logger.info("Step: Filling version string...")
-    version_input = WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.CSS_SELECTOR, "input[name='version_string']")))
-    highlight_element(driver, version_input)
-    driver.execute_script("arguments[0].value = arguments[1];", version_input, "1.0.0")
-    logger.info("Version set to 1.0.0.")
-    if config.get('manual_mode', False):
-        input("Press Enter to continue after filling version...")
-
-    # Fill description
-    logger.info("Step: Filling description...")
-    desc_div = WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.fr-element")))
-    highlight_element(driver, desc_div)
-    driver.execute_script("arguments[0].innerHTML = arguments[1];", desc_div, description)
-    logger.info("Description filled.")
+    # Get title, description and tagline from the zip name and its README.md
+    values = get_form_values(zip_path)
+    logger.info(f"Tagline: {values['tag_line']}")
+    logger.info(f"Description: {values['description'][:50]}...")  # Preview
+
+    # Manual mode timings would mostly measure the user
+    timer = StepTimer(zip_path, worker, enabled=not config.get('manual_mode', False))
+    if prefilled:
+        logger.info("Form fields already filled in the prepared tab.")
+    else:
+        logger.info("Step: Filling form fields...")
+        fill_form_fields(driver, config, values)
+        timer.lap('fill')
+        logger.info(f"Form fields filled: {values['title']}")
     if config.get('manual_mode', False):
-        input("Press Enter to continue after filling description...")
+        input("Press Enter to continue after filling form fields...")
+
+    timer.restart()
 
     # Fill tags
     logger.info("Step: Filling tags...")
@@ -135,43 +136,46 @@ def process_single_zip(zip_path, driver, config, lock, tag_to_use, shared_proces
         except:
             pass
     tags_input = WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.CSS_SELECTOR, "span.tagify__input")))
-    highlight_element(driver, tags_input)
+    highlight_element(driver, tags_input, config)
     tags_input.send_keys(tags_text + Keys.ENTER)
     time.sleep(1)
     # Dismiss dropdown
     tags_input.send_keys(Keys.ESCAPE)
     logger.info(f"Tags set to {tags_text}")
+    timer.lap('tags')
     if config.get('manual_mode', False):
         input("Press Enter to continue after filling tags...")
 
     # Attach files
     logger.info("Step: Attaching files...")
-    attach_button = WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.CSS_SELECTOR, "a.button--icon--attach")))
-    highlight_element(driver, attach_button)
-    main_window = driver.current_window_handle
-    driver.execute_script("arguments[0].click();", attach_button)
-    logger.info("Attach files clicked.")
-
-    # Wait for file dialog and automate selection
-    time.sleep(5)  # Wait for dialog to open
-    pyautogui.write(zip_path)  # Write full path to filename field
-    pyautogui.press('enter')
-    logger.info("File selected via dialog.")
+    attach_file(driver, zip_path)
+    logger.info("File attached via file input.")
+    mark_step(zip_path, 'attached')
+    timer.lap('attach')
+
+    # Prepare the next zip's form in a second tab while this attachment uploads
+    prepared_tab = None
+    if next_zip_path is not None:
+        try:
+            prepared_tab = prepare_next_form(driver, config, next_href or selected_href, next_zip_path, limiter, account)
+            logger.info(f"Next form prepared for {os.path.basename(next_zip_path)}.")
+        except Exception as e:
+            logger.info(f"Could not prepare the next form: {e}")
+        timer.lap('prepare_next')
 
     # Wait for upload completion
     logger.info("Step: Waiting for file upload to complete...")
-    WebDriverWait(driver, config.get('upload_wait_timeout', 180)).until(EC.presence_of_element_located((By.CSS_SELECTOR, "a.file-info")))
-    for i in range(wait_seconds, 0, -1):
-        logger.info(f"Ensuring upload completion: {i} seconds remaining...")
-        time.sleep(1)
+    wait_for_upload(driver, wait_seconds)
     logger.info("File uploaded.")
+    mark_step(zip_path, 'uploaded')
+    timer.lap('upload')
     if config.get('manual_mode', False):
         input("Press Enter to continue after upload completion...")
 
     # Find save button
     logger.info("Step: Finding save button...")
     save_button = WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.XPATH, "//button[.//span[text()='Save']]")))
-    highlight_element(driver, save_button)
+    highlight_element(driver, save_button, config)
     logger.info("Save button found.")
     if config.get('manual_mode', False):
         input("Press Enter to continue after finding save button...")
@@ -179,15 +183,24 @@ def process_single_zip(zip_path, driver, config, lock, tag_to_use, shared_proces
     if config.get('auto_submit', False):
         logger.info("Step: Auto-submitting form...")
         submission_success = False
+        # Only a limited number of browsers may be saving at the same time
+        submit_slot = submit_slots if submit_slots is not None else contextlib.nullcontext()
         for attempt in range(3):
             try:
-                driver.execute_script("arguments[0].click();", save_button)
-                logger.info("Form submitted automatically.")
-                WebDriverWait(driver, 30).until(lambda d: '/downloads/add' not in d.current_url)
+                if limiter:
+                    limiter.acquire(account)
+                with submit_slot:
+                    driver.execute_script("arguments[0].click();", save_button)
+                    logger.info("Form submitted automatically.")
+                    mark_step(zip_path, 'submitted')
+                    WebDriverWait(driver, 30).until(lambda d: not d.current_url.rstrip('/').endswith('/add'))
                 logger.info("Submission successful, page redirected.")
+                if limiter:
+                    limiter.succeeded(account)
                 time.sleep(2)
+                timer.lap('submit')
                 zip_path = os.path.relpath(zip_path)
-                mark_processed(zip_path)
+                mark_processed(zip_path, driver.current_url)
                 logger.info(f"Marked {zip_path} as processed.")
                 if shared_processed is not None:
                     with shared_processed.get_lock():
@@ -200,9 +213,7 @@ def process_single_zip(zip_path, driver, config, lock, tag_to_use, shared_proces
                     alert = driver.switch_to.alert
                     alert.accept()
                     logger.info("Alert accepted, retrying submission.")
-                    wait_time = (attempt + 1) * 10
-                    logger.info(f"Waiting {wait_time} seconds before retry...")
-                    time.sleep(wait_time)
+                    slow_down(limiter, account, "an alert", (attempt + 1) * 10)
                     continue
                 except Exception as e:
                     logger.info(f"Alert handling failed: {e}")
@@ -210,27 +221,29 @@ def process_single_zip(zip_path, driver, config, lock, tag_to_use, shared_proces
             except Exception as e:
                 logger.info(f"Submission failed: {e}")
                 if attempt < 2:
-                    wait_time = (attempt + 1) * 10
-                    logger.info(f"Waiting {wait_time} seconds before retry...")
-                    time.sleep(wait_time)
+                    slow_down(limiter, account, "a failed submission", (attempt + 1) * 10)
                     continue
                 break
         if not submission_success:
             logger.info("Submission failed after 3 attempts. Skipping this file.")
+            mark_failed(zip_path, 'Submission failed after 3 attempts')
     else:
-        highlight_element(driver, save_button)
+        highlight_element(driver, save_button, config)
         logger.info("Form is ready. Press Enter in terminal to submit.")
         input()
+        timer.restart()
         driver.execute_script("arguments[0].click();", save_button)
         logger.info("Form submitted manually.")
+        mark_step(zip_path, 'submitted')
         # Wait for successful submission
         try:
-            WebDriverWait(driver, 30).until(lambda d: '/downloads/add' not in d.current_url)
+            WebDriverWait(driver, 30).until(lambda d: not d.current_url.rstrip('/').endswith('/add'))
             logger.info("Submission successful, page redirected.")
             time.sleep(2)
+            timer.lap('submit')
             # Mark as processed
             zip_path = os.path.relpath(zip_path)
-            mark_processed(zip_path)
+            mark_processed(zip_path, driver.current_url)
             logger.info(f"Marked {zip_path} as processed.")
             if shared_processed is not None:
                 with shared_processed.get_lock():
@@ -239,215 +252,289 @@ def process_single_zip(zip_path, driver, config, lock, tag_to_use, shared_proces
         except Exception as e:
             logger.info(f"Submission failed: {e}")
             print(f"{Fore.YELLOW}Not marking as processed.{Style.RESET_ALL}")
+            mark_failed(zip_path, e)
     
-    if not shared_queue:
-        logger.info("Preparing for next upload...")
-        driver.get(config['url'])
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, "a.button--cta")))
-        
-        upload_button = driver.find_element(By.XPATH, "//a[@href='/downloads/add']")
-        highlight_element(driver, upload_button)
-        upload_button.click()
-        
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.overlay")))
-        
-        # Select same category
-        category_link = driver.find_element(By.LINK_TEXT, selected_name)
-        highlight_element(driver, category_link)
-        category_link.click()
-        
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.NAME, "title")))
-        logger.info("Ready for next zip.")
-    
-    if shared_queue:
-        with shared_turn.get_lock():
-            shared_turn.value = (shared_turn.value + 1) % num_browsers
-from colorama import Fore, Style
+    return prepared_tab
 
-def get_categories(config):
-    logger.info("Fetching categories...")
-    options = Options()
-    options.add_argument(f"user-agent={config['user_agent']}")
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option('useAutomationExtension', False)
-    options.add_argument("--headless")  # Headless for category loading
+def move_to_next_form(driver, config, zip_path, prepared_tab, selected_href, worker_id=None, limiter=None, account=None):
+    """Leave the finished upload's page for the next add form; returns True when that form is already filled."""
+    if prepared_tab is not None:
+        # The finished tab is closed and the already filled one takes its place
+        driver.close()
+        driver.switch_to.window(prepared_tab)
+        return True
+    logger.info("Preparing for next upload...")
+    timer = StepTimer(os.path.abspath(zip_path), worker_id if worker_id is not None else 0, enabled=not config.get('manual_mode', False))
+    open_upload_form(driver, config, selected_href, limiter, account)
+    timer.lap('navigate')
+    return False
 
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+def get_form_values(zip_path):
+    # The pre-flight scan has normally cached this already, so the zip is not opened here
+    record = load_metadata(zip_path) or scan_zip(zip_path)
+    return {'title': record['title'], 'tag_line': record['tag_line'], 'version_string': '1.0.0', 'description': record['description']}
 
+def prepare_next_form(driver, config, selected_href, zip_path, limiter=None, account=None):
+    # Load and fill the next add form in a new tab, then hand control back to the current one
+    main_tab = driver.current_window_handle
+    driver.switch_to.new_window('tab')
+    prepared_tab = driver.current_window_handle
     try:
-        driver.get("https://www.se7ensins.com")
-        cookie_files = glob.glob('cookies/*.json')
-        if cookie_files:
-            cookie_path = cookie_files[0]
-            with open(cookie_path) as f:
-                cookies = json.load(f)
-            for cookie in cookies:
-                if 'sameSite' in cookie:
-                    if cookie['sameSite'].lower() == 'lax':
-                        cookie['sameSite'] = 'Lax'
-                    elif cookie['sameSite'].lower() == 'strict':
-                        cookie['sameSite'] = 'Strict'
-                    elif cookie['sameSite'].lower() == 'none':
-                        cookie['sameSite'] = 'None'
-                    else:
-                        del cookie['sameSite']
-                driver.add_cookie(cookie)
-        
-        driver.get(config['url'])
-        WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.TAG_NAME, 'body')))
-        
-        upload_button = driver.find_element(By.XPATH, "//a[@href='/downloads/add']")
-        upload_button.click()
-        
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.overlay")))
-        
-        category_links = driver.find_elements(By.CSS_SELECTOR, "a.fauxBlockLink-blockLink")
-        categories = []
-        for link in category_links:
-            name = link.text.strip()
-            href = link.get_attribute("href")
-            if name and href:
-                categories.append((name, href))
-        
-        categories_dict = {str(i+1): {'name': name, 'href': href} for i, (name, href) in enumerate(categories)}
-        with open('categories.json', 'w') as f:
-            json.dump(categories_dict, f, indent=4)
-        
-        logger.info(f"Loaded {len(categories)} categories.")
-        return categories
-    except Exception as e:
-        logger.info(f"Error loading categories: {e}")
-        return []
+        block_resources(driver, config)
+        open_upload_form(driver, config, selected_href, limiter, account)
+        fill_form_fields(driver, config, get_form_values(os.path.abspath(zip_path)))
+    except Exception:
+        driver.close()
+        raise
     finally:
-        driver.quit()
+        driver.switch_to.window(main_tab)
+    return prepared_tab
+
+def close_extra_tabs(driver):
+    handles = driver.window_handles
+    for handle in handles[1:]:
+        driver.switch_to.window(handle)
+        driver.close()
+    driver.switch_to.window(handles[0])
+
+def fill_form_fields(driver, config, values):
+    # One injected script sets every text field; it returns the ones it could not find
+    highlight = not (config.get('fast_mode', False) and not config.get('manual_mode', False))
+    missing = driver.execute_script(FILL_FORM_JS, values, highlight)
+    if missing:
+        # The form or Froala may still be initialising, so give the remaining fields a moment
+        remaining = {key: values[key] for key in missing}
+        try:
+            WebDriverWait(driver, 10, poll_frequency=0.25).until(lambda d: not d.execute_script(FILL_FORM_JS, remaining, highlight))
+        except TimeoutException:
+            missing = driver.execute_script(FILL_FORM_JS, remaining, highlight)
+            raise Exception(f"Form fields not found: {', '.join(missing)}")
+    if highlight:
+        time.sleep(1)  # Wait for highlight to be visible
+
+def attach_file(driver, zip_path):
+    # Hand the path straight to the page's file input so no OS dialog is opened
+    file_input = WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='file']")))
+    try:
+        # flow.js keeps its input hidden, and send_keys needs it to be interactable
+        driver.execute_script("arguments[0].removeAttribute('hidden'); arguments[0].style.display = 'block'; arguments[0].style.visibility = 'visible';", file_input)
+        file_input.send_keys(zip_path)
+    except Exception:
+        doc = driver.execute_cdp_cmd('DOM.getDocument', {})
+        node = driver.execute_cdp_cmd('DOM.querySelector', {'nodeId': doc['root']['nodeId'], 'selector': "input[type='file']"})
+        driver.execute_cdp_cmd('DOM.setFileInputFiles', {'nodeId': node['nodeId'], 'files': [zip_path]})
+
+def wait_for_upload(driver, timeout):
+    # Poll the attachment row instead of sleeping a fixed time per MB
+    last_percent = None
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        state = driver.execute_script(UPLOAD_STATE_JS)
+        if state.get('error'):
+            raise Exception(f"Attachment upload failed: {state['error']}")
+        if state.get('done'):
+            return
+        if state.get('percent') is not None and state['percent'] != last_percent:
+            last_percent = state['percent']
+            logger.info(f"Upload progress: {last_percent:.0f}%")
+        time.sleep(0.5)
+    raise TimeoutException(f"Upload did not finish within {timeout} seconds")
+
+def slow_down(limiter, account, reason, fallback_wait=0, site_wide=False):
+    """Tighten the shared rate limit after the site pushed back; with rate limiting off, just wait fallback_wait seconds."""
+    if limiter is not None and limiter.penalize(account, site_wide) is not None:
+        logger.info(f"Slowing down after {reason}: now {limiter.describe(account)}.")
+        return
+    if fallback_wait:
+        logger.info(f"Waiting {fallback_wait} seconds before retry...")
+        time.sleep(fallback_wait)
+
+def open_upload_form(driver, config, selected_href, limiter=None, account=None):
+    # The category's add URL opens the form directly, without the landing page or category modal
+    for attempt in range(3):
+        if limiter:
+            limiter.acquire(account)
+        driver.get(selected_href)
+        try:
+            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.NAME, "title")))
+        except TimeoutException:
+            # A challenge or rate limit page means slow down and try again; anything else is a real error
+            if limiter is None or attempt == 2:
+                raise
+            if get_session_state(driver) == 'challenge':
+                slow_down(limiter, account, "a challenge page", site_wide=True)
+            elif is_throttled(driver):
+                slow_down(limiter, account, "a rate limit page")
+            else:
+                raise
+            continue
+        if limiter:
+            limiter.succeeded(account)
+        logger.info("Ready for next zip.")
+        return
+
+from colorama import Fore, Style
 
 def load_config():
     with open('config.json') as f:
         return json.load(f)
 
-def highlight_element(driver, element):
+FILL_FORM_JS = """
+var values = arguments[0], highlight = arguments[1], missing = [];
+var selectors = {
+    title: "input[name='title']",
+    tag_line: "input[name='tag_line']",
+    version_string: "input[name='version_string']",
+    description: "div.fr-element"
+};
+Object.keys(values).forEach(function (key) {
+    var el = document.querySelector(selectors[key]);
+    if (!el) { missing.push(key); return; }
+    if (el.isContentEditable) { el.innerHTML = values[key]; } else { el.value = values[key]; }
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    if (highlight) el.setAttribute('style', 'border: 3px solid red;');
+});
+return missing;
+"""
+
+UPLOAD_STATE_JS = """
+var rows = document.querySelectorAll('.js-attachmentFile');
+if (!rows.length) rows = Array.from(document.querySelectorAll('a.file-info')).map(function (a) { return a.closest('li') || a.parentNode; });
+if (!rows.length) return {found: false, done: false, percent: null, error: null};
+var row = rows[rows.length - 1];
+var error = row.querySelector('.js-attachmentError');
+if (error && error.textContent.trim()) return {found: true, done: false, percent: null, error: error.textContent.trim()};
+var percent = null;
+var progress = row.querySelector('.js-attachmentProgress');
+if (progress && progress.offsetParent !== null) {
+    var bar = progress.querySelector('i') || progress;
+    percent = parseFloat(bar.style.width || progress.getAttribute('aria-valuenow') || '0');
+}
+var link = row.querySelector('a.file-info');
+var uploaded = !!row.getAttribute('data-attachment-id') || !!(link && link.getAttribute('href'));
+return {found: true, done: uploaded && (percent === null || percent >= 100), percent: percent, error: null};
+"""
+
+def highlight_element(driver, element, config=None):
+    # Fast mode skips the highlight round trip and pause; manual mode always keeps them
+    if config and config.get('fast_mode', False) and not config.get('manual_mode', False):
+        return
     driver.execute_script("arguments[0].setAttribute('style', 'border: 3px solid red;');", element)
     time.sleep(1)  # Wait for highlight to be visible
 
-def get_desc_and_tagline(zip_path):
-    try:
-        with zipfile.ZipFile(zip_path) as zf:
-            readme_path = None
-            for name in zf.namelist():
-                if name.lower().endswith('readme.md'):
-                    readme_path = name
-                    break
-            base_name = os.path.basename(zip_path).replace('.zip', '').replace('_', ' ')
-            if not readme_path:
-                # Use filename (without .zip) when README is missing
-                return base_name, base_name
-            content = zf.read(readme_path).decode('utf-8', errors='ignore')
-            if not content or not content.strip():
-                # Use filename when README is empty
-                return base_name, base_name
-            tagline = content[:100].replace('\r\n', ' ').replace('\n', ' ').replace('\r', ' ')
-            # Remove leading "Description:" to save space
-            tagline = tagline.lstrip("Description:").lstrip("description:").strip()
-            if not tagline:
-                tagline = base_name
-            description = content[:200]  # Limit description to 200 characters
-            return description, tagline
-    except Exception as e:
-        return f"Error reading zip: {e}", "Error"
-
-def init_db():
-    conn = sqlite3.connect('progress.db')
-    c = conn.cursor()
-    c.execute('''CREATE TABLE IF NOT EXISTS processed_zips (zip_path TEXT PRIMARY KEY)''')
-    conn.commit()
-    conn.close()
-
-def is_processed(zip_path):
-    zip_path = os.path.normcase(zip_path)
-    conn = sqlite3.connect('progress.db')
-    c = conn.cursor()
-    c.execute('SELECT 1 FROM processed_zips WHERE zip_path = ?', (zip_path,))
-    result = c.fetchone()
-    conn.close()
-    return result is not None
-
-def mark_processed(zip_path):
-    zip_path = os.path.normcase(zip_path)
-    conn = sqlite3.connect('progress.db')
-    c = conn.cursor()
-    c.execute('INSERT OR IGNORE INTO processed_zips (zip_path) VALUES (?)', (zip_path,))
-    conn.commit()
-    conn.close()
-
-def run_browser(config, lock=None, zips=None, shared_processed=None, shared_total=None, barrier=None, turn_id=None, shared_turn=None, shared_queue=None, num_browsers=1):
-    if zips is None:
-        zip_files = glob.glob('zipsToUpload/*.zip')
-        zips = [z for z in zip_files if not is_processed(z)]
-    logger.info(f"Processing {len(zips)} zips in this browser.")
+def pass_cloudflare(driver, config):
+    """Wait for a Cloudflare challenge to clear, asking the user to solve it if it does not clear by itself."""
+    logger.info("Cloudflare challenge detected, waiting for it to clear...")
+    state = wait_for_challenge(driver, config.get('cloudflare_wait', 15))
+    if state == 'challenge' and not config.get('skip_cloudflare', False):
+        logger.info("Press Enter after bypassing Cloudflare.")
+        input()
+        state = get_session_state(driver)
+    return state
+
+def log_in(driver, config, target_url, pool, account, limiter, worker_id=None):
+    """Load an account's cookies into the browser, moving on to the next account while they turn out to be logged out; returns the account in use."""
+    while True:
+        if account is not None:
+            # The profile may hold another account's session; its Cloudflare clearance stays
+            clear_session_cookies(driver)
+        limiter.acquire(account)
+        state, added = inject_cookies(driver, config, target_url, pool.cookie_files.get(account))
+        logger.info(f"Added {added} cookies to browser.")
+        if state == 'challenge':
+            state = pass_cloudflare(driver, config)
+        if state != 'logged_out':
+            set_profile_account(config, worker_id or 0, account)
+            return account
+        if account is None:
+            logger.info("Still logged out after loading cookies; re-export them into cookies/.")
+            return account
+        logger.info(f"Still logged out as {account}; re-export {pool.cookie_files[account]}. Switching accounts.")
+        pool.logged_out(account)
+        pool.release(account)
+        account = pool.assign()
+        if account is None:
+            raise HttpUploadError("No logged-in account left in cookies/")
+
+def switch_account(driver, config, target_url, pool, account, limiter, worker_id=None):
+    """Hand back an account that left the rotation and log in with the next ready one."""
+    logger.info(f"{pool.describe(account)}; switching accounts.")
+    pool.release(account)
+    account = pool.assign()
+    if account is None:
+        raise HttpUploadError("No usable account left in cookies/")
+    logger.info(f"Logging in as {account}...")
+    return log_in(driver, config, target_url, pool, account, limiter, worker_id)
+
+def run_browser(config, zips=None, shared_processed=None, shared_total=None, barrier=None, worker_id=None, submit_slots=None, shared_queue=None, limiter=None, pool=None):
+    if shared_queue is not None:
+        logger.info("Taking zips from the shared queue.")
+    else:
+        if zips is None:
+            zip_files = find_zips()
+            zips = filter_unprocessed(zip_files)
+        logger.info(f"Processing {len(zips)} zips in this browser.")
     
     logger.info("Starting browser...")
-    options = Options()
-    options.add_argument(f"user-agent={config['user_agent']}")
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option('useAutomationExtension', False)
-    # options.add_argument("--headless")  # Uncomment for headless mode if needed
-
-    logger.info("Creating Chrome driver...")
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-    logger.info("Driver created successfully.")
+    if config.get('driver_backend') == 'simulated':
+        # Dry run: same orchestration, but every browser action only takes simulated time
+        driver = SimulatedDriver(config, worker_id)
+        logger.info("Simulated driver created.")
+    else:
+        options = Options()
+        options.add_argument(f"user-agent={config['user_agent']}")
+        options.add_argument("--disable-blink-features=AutomationControlled")
+        options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        options.add_experimental_option('useAutomationExtension', False)
+        if config.get('headless', False):
+            options.add_argument("--headless=new")
+        if config.get('reuse_profiles', True):
+            options.add_argument(f"--user-data-dir={get_profile_dir(config, worker_id or 0)}")
+        # Every wait below looks for the element it needs, so there is no point waiting for the full load event
+        options.page_load_strategy = config.get('page_load_strategy', 'eager')
+
+        logger.info("Creating Chrome driver...")
+        driver = webdriver.Chrome(service=Service(config.get('chromedriver_path')), options=options)
+        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        block_resources(driver, config)
+        logger.info("Driver created successfully.")
+
+    # Every page load and save in every browser draws from the same site budget and from its account's budget
+    pool = pool or SessionPool(multiprocessing, config, list_cookie_files(config))
+    limiter = limiter or RateLimiter(multiprocessing, config, pool.accounts, pool)
+    account = pool.assign()
+    # A zip taken off the queue early for the second tab, until this browser gets to it
+    following = False
 
     try:
-        logger.info("Navigating to se7ensins.com...")
-        # Navigate to the domain to add cookies
-        driver.get("https://www.se7ensins.com")
-        logger.info("Navigated to se7ensins.com.")
-        
-        # Load cookies from any JSON file in cookies/
-        logger.info("Loading cookies...")
-        cookie_files = glob.glob('cookies/*.json')
-        logger.info(f"Found cookie files: {cookie_files}")
-        if not cookie_files:
-            logger.info("No cookie JSON file found in cookies/")
+        if pool.accounts and account is None:
+            logger.info("No usable account left for this browser.")
             return
-        cookie_path = cookie_files[0]  # Use the first valid JSON file
-        with open(cookie_path) as f:
-            cookies = json.load(f)
-        logger.info(f"Loaded {len(cookies)} cookies from {cookie_path}.")
-        
-        for cookie in cookies:
-            # Normalize cookie for Selenium
-            if 'sameSite' in cookie:
-                if cookie['sameSite'].lower() == 'lax':
-                    cookie['sameSite'] = 'Lax'
-                elif cookie['sameSite'].lower() == 'strict':
-                    cookie['sameSite'] = 'Strict'
-                elif cookie['sameSite'].lower() == 'none':
-                    cookie['sameSite'] = 'None'
-                else:
-                    # Remove invalid sameSite
-                    del cookie['sameSite']
-            driver.add_cookie(cookie)
-        logger.info("Cookies added to browser.")
-        
-        # Navigate to the target URL
-        logger.info(f"Navigating to {config['url']}...")
-        driver.get(config['url'])
-        logger.info("Navigated to target URL.")
-        
-        # Wait for page to load
-        logger.info("Waiting for page to load...")
+        # The profile keeps the session and Cloudflare clearance from earlier runs, so cookies are only loaded when needed
+        target_url = config.get('url') or get_base_url(config)
+        logger.info(f"Navigating to {target_url}...")
+        limiter.acquire(account)
+        driver.get(target_url)
         WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.TAG_NAME, 'body')))
-        logger.info("Page loaded successfully.")
-        
-        if not config.get('skip_cloudflare', False):
-            logger.info("Page loaded. Press Enter after bypassing Cloudflare if needed.")
-            input()
+        state = get_session_state(driver)
+        if state == 'challenge':
+            slow_down(limiter, account, "a challenge page", site_wide=True)
+            state = pass_cloudflare(driver, config)
+        # Only reuse the profile's session if it belongs to this browser's account; unrecorded is fine with a single account
+        profile_account = get_profile_account(config, worker_id or 0)
+        if state == 'logged_in' and (account is None or profile_account == account or (profile_account is None and len(pool.accounts) == 1)):
+            logger.info("Reusing the logged-in session from the browser profile.")
+            set_profile_account(config, worker_id or 0, account)
         else:
-            logger.info("Skipping Cloudflare bypass prompt.")
+            logger.info(f"Session not logged in{' as ' + account if account else ''}; loading cookies...")
+            try:
+                account = log_in(driver, config, target_url, pool, account, limiter, worker_id)
+            except HttpUploadError as e:
+                logger.info(f"{e}")
+                account = None  # Already handed back to the pool
+                return
+        WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.TAG_NAME, 'body')))
+        logger.info("Page loaded successfully.")
         
         if barrier:
             logger.info("Waiting for all browsers to be ready...")
@@ -458,146 +545,463 @@ def run_browser(config, lock=None, zips=None, shared_processed=None, shared_tota
                 logger.info(f"Barrier timeout or error: {e}. Proceeding without sync.")
                 logger.info("All browsers ready. Starting processing.")
         
-        if shared_turn is not None and turn_id is not None:
-            logger.info(f"Waiting for my turn ({turn_id})...")
-            while shared_turn.value != turn_id:
-                time.sleep(1)
-            logger.info("My turn! Processing zips.")
-        
-        # Automation sequence
-        logger.info("Finding Upload File button...")
-        upload_button = driver.find_element(By.XPATH, "//a[@href='/downloads/add']")
-        logger.info("Upload button found.")
-        highlight_element(driver, upload_button)
-        logger.info("Clicking Upload File button...")
-        upload_button.click()
-        logger.info("Upload button clicked.")
-        
-        # Wait for category modal
-        logger.info("Waiting for category modal...")
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.overlay")))
-        logger.info("Category modal appeared.")
-        
-        # Parse categories
-        category_links = driver.find_elements(By.CSS_SELECTOR, "a.fauxBlockLink-blockLink")
-        categories = []
-        for link in category_links:
-            name = link.text.strip()
-            href = link.get_attribute("href")
-            if name and href:
-                categories.append((name, href))
-        
-        # Save to categories.json
-        categories_dict = {str(i+1): {'name': name, 'href': href} for i, (name, href) in enumerate(categories)}
-        with open('categories.json', 'w') as f:
-            json.dump(categories_dict, f, indent=4)
-        
-        logger.info("Available categories:")
-        for i, (name, href) in enumerate(categories, 1):
-            logger.info(f"{i}. {name}")
-        
-        # Check if category_id is set in config
-        if config.get('category_id') is not None:
-            category_id = str(config['category_id'])
-            if category_id in categories_dict:
-                selected_name = categories_dict[category_id]['name']
-                selected_href = categories_dict[category_id]['href']
-                logger.info(f"Auto-selecting category: {selected_name}")
-            else:
-                logger.info(f"Invalid category_id {category_id} in config. Available: {list(categories_dict.keys())}")
-                return
-        else:
-            # Ask user to select
-            while True:
-                try:
-                    choice = int(input("Enter the number of the category to select: ")) - 1
-                    if 0 <= choice < len(categories):
-                        selected_name, selected_href = categories[choice]
-                        break
-                    else:
-                        print(f"{Fore.YELLOW}Invalid choice. Try again.{Style.RESET_ALL}")
-                except ValueError:
-                    print(f"{Fore.YELLOW}Please enter a number.{Style.RESET_ALL}")
-        
-        logger.info(f"Selecting category: {selected_name}")
         tag_to_use = config.get('tag')
         if not tag_to_use:
             tag_to_use = "default tag"  # or something, but since config has it, fine
-        # Find the link by link text
-        selected_link = driver.find_element(By.LINK_TEXT, selected_name)
-        highlight_element(driver, selected_link)
-        driver.execute_script("arguments[0].click();", selected_link)
-        logger.info("Category selected.")
-        
-        # Wait for category modal to close
-        logger.info("Waiting for category modal to close...")
-        WebDriverWait(driver, 10).until(EC.invisibility_of_element_located((By.CSS_SELECTOR, "div.overlay")))
-        logger.info("Category modal closed.")
-        
-        # Wait for upload form
-        logger.info("Waiting for upload form...")
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.NAME, "title")))
-        logger.info("Upload form loaded.")
+        
+        # Go straight to the cached add form when the category is already known
+        categories_dict = load_cached_categories(config)
+        category = find_category(config, categories_dict)
+        if category:
+            selected_name = category['name']
+            selected_href = category['href']
+            logger.info(f"Using cached category: {selected_name}")
+            open_upload_form(driver, config, selected_href, limiter, account)
+            logger.info("Upload form loaded.")
+        else:
+            # Automation sequence
+            logger.info("Finding Upload File button...")
+            upload_button = driver.find_element(By.XPATH, "//a[@href='/downloads/add']")
+            logger.info("Upload button found.")
+            highlight_element(driver, upload_button, config)
+            logger.info("Clicking Upload File button...")
+            upload_button.click()
+            logger.info("Upload button clicked.")
+        
+            # Wait for category modal
+            logger.info("Waiting for category modal...")
+            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.overlay")))
+            logger.info("Category modal appeared.")
+        
+            # Parse categories
+            category_links = driver.find_elements(By.CSS_SELECTOR, "a.fauxBlockLink-blockLink")
+            categories = []
+            for link in category_links:
+                name = link.text.strip()
+                href = link.get_attribute("href")
+                if name and href:
+                    categories.append((name, href))
+        
+            # Cache the scraped list for next time
+            categories_dict = save_categories(config, categories)
+        
+            logger.info("Available categories:")
+            for i, (name, href) in enumerate(categories, 1):
+                logger.info(f"{i}. {name}")
+        
+            # Check if category_id is set in config
+            if config.get('category_id') is not None or config.get('category_cat_id') is not None:
+                category = find_category(config, categories_dict)
+                if category:
+                    selected_name = category['name']
+                    selected_href = category['href']
+                    logger.info(f"Auto-selecting category: {selected_name}")
+                else:
+                    logger.info(f"Invalid category in config (category_id {config.get('category_id')}, category_cat_id {config.get('category_cat_id')}). Available: {list(categories_dict.keys())}")
+                    return
+            else:
+                # Ask user to select
+                while True:
+                    try:
+                        choice = int(input("Enter the number of the category to select: ")) - 1
+                        if 0 <= choice < len(categories):
+                            selected_name, selected_href = categories[choice]
+                            break
+                        else:
+                            print(f"{Fore.YELLOW}Invalid choice. Try again.{Style.RESET_ALL}")
+                    except ValueError:
+                        print(f"{Fore.YELLOW}Please enter a number.{Style.RESET_ALL}")
+        
+            logger.info(f"Selecting category: {selected_name}")
+            # Find the link by link text
+            selected_link = driver.find_element(By.LINK_TEXT, selected_name)
+            highlight_element(driver, selected_link, config)
+            driver.execute_script("arguments[0].click();", selected_link)
+            logger.info("Category selected.")
+        
+            # Wait for category modal to close
+            logger.info("Waiting for category modal to close...")
+            WebDriverWait(driver, 10).until(EC.invisibility_of_element_located((By.CSS_SELECTOR, "div.overlay")))
+            logger.info("Category modal closed.")
+        
+            # Wait for upload form
+            logger.info("Waiting for upload form...")
+            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.NAME, "title")))
+            logger.info("Upload form loaded.")
         
         if shared_queue is not None:
-            while True:
-                if shared_turn.value == turn_id:
+            # Each browser pulls its next zip as soon as its own form is ready
+            def next_zip(block=True):
+                # None is the feeder's stop marker, False means nothing is waiting yet
+                waited_from = time.time()
+                started = time.perf_counter()
+                try:
+                    item = shared_queue.get(block=block)
+                except queue.Empty:
+                    return False
+                if item is not None and not config.get('manual_mode', False):
+                    # Time blocked on the shared queue shows up as queue_wait in the run report
+                    record_step_timing(item[0] if isinstance(item, tuple) else item, 'queue_wait', time.perf_counter() - started, worker_id if worker_id is not None else 0, waited_from)
+                return item
+        else:
+            zip_iter = iter(zips)
+            def next_zip(block=True):
+                return next(zip_iter, None)
+        
+        # When pipelining, the following zip is taken early so its form can be filled in a second tab
+        pipeline = config.get('pipeline_tabs', False) and not config.get('manual_mode', False)
+        # Queue items are (zip_path, add form URL); no URL means this browser's selected category
+        def split_item(item):
+            return item if isinstance(item, tuple) else (item, None)
+        
+        item = next_zip()
+        prefilled = False
+        form_href = selected_href  # The blank add form currently open
+        count = 0
+        while item is not None:
+            zip_path, href = split_item(item)
+            href = href or selected_href
+            # Only a zip that is already waiting gets pipelined, so an idle watch folder never holds up this one
+            following = next_zip(block=False) if pipeline else False
+            next_path, next_href = split_item(following) if following else (None, None)
+            count += 1
+            logger.info(f"Processing #{count} in this browser: {os.path.basename(zip_path)}")
+            try:
+                if not prefilled and form_href != href:
+                    # Routed to another category, so switch add forms first
+                    open_upload_form(driver, config, href, limiter, account)
+                form_href = href
+                prepared_tab = process_single_zip(zip_path, driver, config, tag_to_use, shared_processed, shared_total, submit_slots, href, next_path, prefilled, next_href, worker_id, limiter, account)
+            except Exception as e:
+                logger.info(f"Worker {worker_id} failed on {os.path.basename(zip_path)}: {e}")
+                mark_failed(zip_path, e)
+                traceback.print_exc()
+                close_extra_tabs(driver)
+                form_href = None
+                prefilled = False
+                try:
+                    if account is not None and get_session_state(driver) == 'logged_out':
+                        # The account's session ended; it is rotated out below
+                        pool.logged_out(account)
+                    else:
+                        open_upload_form(driver, config, href, limiter, account)
+                        form_href = href
+                except Exception as e:
+                    # The next zip retries opening its form; stopping here would strand the queue
+                    logger.info(f"Could not reopen the add form: {e}")
+            else:
+                # The zip is finished, so a page that will not load only costs this browser its next form
+                try:
+                    prefilled = move_to_next_form(driver, config, zip_path, prepared_tab, href, worker_id, limiter, account)
+                except Exception as e:
+                    logger.info(f"Could not open the next add form: {e}")
+                    close_extra_tabs(driver)
+                    form_href = None
+                    prefilled = False
+            if account is not None:
+                if is_processed(zip_path):
+                    pool.uploaded(account)
+                if not pool.usable(account):
+                    # Throttled too often, logged out or out of upload budget: carry on with another account
+                    close_extra_tabs(driver)
                     try:
-                        zip_path = shared_queue.get_nowait()
-                        process_single_zip(zip_path, driver, config, lock, tag_to_use, shared_processed, shared_total, shared_queue, shared_turn, num_browsers, selected_name)
-                    except:
+                        account = switch_account(driver, config, target_url, pool, account, limiter, worker_id)
+                    except HttpUploadError as e:
+                        logger.info(f"{e}")
+                        account = None  # Already handed back to the pool
                         break
-                else:
-                    time.sleep(1)
-        else:
-            for i, zip_path in enumerate(zips, 1):
-                logger.info(f"Processing {i}/{len(zips)} : {os.path.basename(zip_path)}")
-                process_single_zip(zip_path, driver, config, lock, tag_to_use, shared_processed, shared_total, shared_queue, shared_turn, num_browsers, selected_name)
+                    form_href = None
+                    prefilled = False
+            item = following if following is not False else next_zip()
+            following = False
         
     except Exception as e:
         logger.info(f"Error: {e}")
         logger.info("Full traceback:")
         traceback.print_exc()
     finally:
+        # Whichever way this browser stops, another one uploads the zip it took early
+        if following and shared_queue is not None:
+            shared_queue.put(following)
+        pool.release(account)
         logger.info("Closing browser...")
         driver.quit()
         logger.info("Browser closed.")
 
+def run_browser_process(parent_log_queue, parent_progress_queue, *args):
+    """Entry point of a browser process: send logs and progress to the GUI's queues, then run the browser."""
+    global progress_queue
+    handler.log_queue = parent_log_queue
+    progress_queue = parent_progress_queue
+    run_browser(*args)
+
+def run_http_uploads(config, zips, shared_processed=None, shared_total=None, limiter=None, pool=None):
+    """Upload zips with plain HTTP requests instead of driving Chrome."""
+    categories_dict = load_cached_categories(config)
+    category = find_category(config, categories_dict)
+    # Items are (zip_path, add form URL) pairs; routed zips carry their own category's URL
+    items = [z if isinstance(z, tuple) else (z, None) for z in zips]
+    if not category and any(href is None for _, href in items):
+        logger.info(f"Invalid category in config (category_id {config.get('category_id')}, category_cat_id {config.get('category_cat_id')}). Available: {list(categories_dict.keys())}")
+        return
+    pool = pool or SessionPool(multiprocessing, config, list_cookie_files(config))
+    # One uploader (and cookie jar) per account; without accounts, load_cookies reports the missing cookie file
+    uploaders = {account: HttpUploader(config, load_cookies(config, pool.cookie_files[account]), limiter=limiter, account=account) for account in pool.accounts}
+    uploaders = uploaders or {None: HttpUploader(config, load_cookies(config), limiter=limiter)}
+    if category:
+        for account, uploader in uploaders.items():
+            try:
+                uploader.fetch_form(category['href'])
+            except LoggedOutError as e:
+                if account is None:
+                    raise
+                logger.info(f"{e}; leaving this account out.")
+                pool.logged_out(account)
+        logger.info(f"Fetched add form for {category['name']}.")
+
+    def upload_one(item):
+        zip_path, href = item
+        mark_started(zip_path, 'http')
+        timer = StepTimer(zip_path, 'http')
+
+        def record_step(step):
+            # Same states and step timings as a browser upload: navigate, upload, submit
+            if step == 'form':
+                timer.lap('navigate')
+                return
+            mark_step(zip_path, step)
+            if step == 'uploaded':
+                timer.lap('upload')
+
+        try:
+            values = get_form_values(zip_path)
+            while True:
+                # Each upload takes the least busy ready account, so a throttled or logged-out one drops out on its own
+                account = pool.assign()
+                if account is None and pool.accounts:
+                    raise HttpUploadError("No usable account left in cookies/")
+                timer.restart()
+                try:
+                    remote_url = uploaders[account].upload_zip(href or category['href'], os.path.abspath(zip_path), values['title'], values['tag_line'], values['description'], config.get('tag'), record_step)
+                    break
+                except LoggedOutError as e:
+                    if account is None:
+                        raise
+                    logger.info(f"{e}; switching accounts.")
+                    pool.logged_out(account)
+                finally:
+                    pool.release(account)
+            pool.uploaded(account)
+            timer.lap('submit')
+        except Exception as e:
+            mark_failed(zip_path, e)
+            raise
+        return zip_path, remote_url
+
+    with ThreadPoolExecutor(max_workers=config.get('http_concurrency', 8)) as executor:
+        futures = [executor.submit(upload_one, item) for item in items]
+        for future in as_completed(futures):
+            try:
+                zip_path, remote_url = future.result()
+            except Exception as e:
+                logger.info(f"HTTP upload failed: {e}")
+                continue
+            mark_processed(zip_path, remote_url)
+            logger.info(f"Uploaded {zip_path} -> {remote_url}")
+            if shared_processed is not None:
+                with shared_processed.get_lock():
+                    shared_processed.value += 1
+                    print_progress(shared_processed.value, shared_total.value if shared_total else 0)
+
+def iter_ready_zips(config, zips, shared_total=None):
+    """Yield zips that passed the pre-flight scan, flagging corrupt archives as failed."""
+    for record in run_preflight(zips, config.get('preflight_workers')):
+        if record['ok']:
+            yield record['zip_path']
+            continue
+        logger.info(f"Skipping corrupt zip {record['zip_path']}: {record['error']}")
+        mark_failed(record['zip_path'], record['error'])
+        if shared_total is not None:
+            with shared_total.get_lock():
+                shared_total.value -= 1
+
+def route_or_fail(config, zips, categories_dict):
+    """Assign each zip its category; zips whose sidecar or rule names no known category are marked failed."""
+    routes, errors, unknown_folders = route_zips(zips, config, categories_dict)
+    for folder in unknown_folders:
+        logger.info(f"Subfolder {os.path.basename(folder)} does not name a category; its zips use the rules or the configured category.")
+    for zip_path, error in errors.items():
+        logger.info(f"Not uploading {os.path.basename(zip_path)}: {error}")
+        mark_failed(zip_path, error)
+    hrefs = {z: entry['href'] for z, entry in routes.items() if entry}
+    return [z for z in zips if z not in errors], hrefs
+
+def drop_duplicates(zips, hashes, shared_total=None, queued_hashes=None):
+    """Wait for the content hashes and leave out zips whose content was already uploaded or is queued twice."""
+    try:
+        digests = hashes.result()
+    except Exception as e:
+        # Uploading a duplicate is better than not uploading at all
+        logger.info(f"Could not hash the zips, skipping the duplicate check: {e}")
+        return zips
+    unique = filter_unprocessed(zips, digests, queued_hashes)
+    missing = sum(1 for z in zips if z not in digests)
+    if missing:
+        logger.info(f"Skipping {missing} zips that were moved or deleted before they could be hashed.")
+    if len(zips) - len(unique) > missing:
+        logger.info(f"Skipping {len(zips) - len(unique) - missing} zips whose content was already uploaded or is queued twice.")
+    if shared_total is not None and len(unique) < len(zips):
+        with shared_total.get_lock():
+            shared_total.value -= len(zips) - len(unique)
+    return unique
+
+def feed_queue(config, zips, shared_queue, num_workers, shared_total=None, known=(), stop_event=None, hrefs=None, hashes=None):
+    # Runs alongside the browsers so they can start on the first clean zips right away
+    hrefs = hrefs or {}
+    # Content hashes queued so far, so watch mode does not queue a copy of a zip that is still waiting or uploading
+    queued_hashes = set()
+    try:
+        if hashes is not None:
+            zips = drop_duplicates(zips, hashes, shared_total, queued_hashes)
+        for zip_path in iter_ready_zips(config, zips, shared_total):
+            shared_queue.put((zip_path, hrefs.get(zip_path)))
+        if config.get('watch_folder', False):
+            watch_queue(config, shared_queue, shared_total, known, stop_event, queued_hashes)
+    finally:
+        for _ in range(num_workers):
+            shared_queue.put(None)
+
+def report_category_refresh(categories_dict, error):
+    if error:
+        logger.info(f"Category refresh failed, keeping the cached list: {error}")
+    else:
+        logger.info(f"Refreshed {len(categories_dict)} categories.")
+
+def watch_queue(config, shared_queue, shared_total, known=(), stop_event=None, queued_hashes=None):
+    """Keep feeding zips dropped into zipsToUpload/ to the running browsers until stopped."""
+    logger.info("Watching zipsToUpload/ for new zips...")
+    for zip_path in watch_zips('zipsToUpload', known, config.get('watch_settle_seconds', 5), config.get('watch_poll_interval', 2), stop_event):
+        # One bad file must not stop the feeder, or every browser would be sent home
+        try:
+            hashes = index_hashes([zip_path], 1)
+            if zip_path not in hashes:
+                logger.info(f"Skipping {os.path.basename(zip_path)}: it was moved or deleted before it could be hashed.")
+                continue
+            new_zips = filter_unprocessed([zip_path], hashes, queued_hashes)
+            if not new_zips:
+                logger.info(f"Skipping {os.path.basename(zip_path)}: already uploaded or queued.")
+                continue
+            new_zips, hrefs = route_or_fail(config, new_zips, load_cached_categories(config))
+            if not new_zips:
+                continue
+            mark_queued(new_zips)
+            if shared_total is not None:
+                with shared_total.get_lock():
+                    shared_total.value += 1
+            logger.info(f"New zip: {os.path.basename(zip_path)}")
+            for ready in iter_ready_zips(config, new_zips, shared_total):
+                shared_queue.put((ready, hrefs.get(ready)))
+        except Exception as e:
+            logger.info(f"Could not queue {os.path.basename(zip_path)}: {e}")
+
+def build_session_pool(ctx, config):
+    """Pool every cookie file in cookies/ that still logs in; None when there are cookie files but none of them does."""
+    cookie_files = list_cookie_files(config)
+    if cookie_files and config.get('validate_accounts', True) and config.get('driver_backend') != 'simulated':
+        url = config.get('url') or get_base_url(config)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            states = dict(zip(cookie_files, executor.map(lambda cookie_file: check_cookie_file(config, cookie_file, url), cookie_files)))
+        for cookie_file, state in states.items():
+            logger.info(f"Account {cookie_file}: {state.replace('_', ' ')}")
+        # A challenge hides the login state from plain HTTP; the browsers find out for themselves
+        cookie_files = [cookie_file for cookie_file, state in states.items() if state in ('logged_in', 'unknown')]
+        if not cookie_files:
+            logger.info("None of the cookie files in cookies/ logs in; re-export them.")
+            return None
+    return SessionPool(ctx, config, cookie_files)
+
+def report_run(since, pool=None):
+    for line in build_run_report(since):
+        logger.info(f"{line}")
+    if pool is not None and pool.accounts:
+        logger.info("Accounts:")
+        for account in pool.accounts:
+            logger.info(f"  {pool.describe(account)}")
+
 def main():
     config = load_config()
     init_db()
+    run_started = time.time()
+    watch_stop.clear()
     num_browsers = config.get('num_browsers', 1)
+    upload_engine = config.get('upload_engine', 'selenium')
     
-    # Pre-install ChromeDriver to avoid conflicts in multiprocessing
-    ChromeDriverManager().install()
+    # Resolve ChromeDriver once here; the browser processes get the path through config
+    if upload_engine != 'http' and config.get('driver_backend') != 'simulated':
+        config['chromedriver_path'] = resolve_chromedriver(config)
+        logger.info(f"Using ChromeDriver: {config['chromedriver_path'] or 'located by Selenium'}")
     
-    all_zips = [z for z in glob.glob('zipsToUpload/*.zip') if not is_processed(z)]
-    if not all_zips:
+    # One level of subfolders is allowed; a subfolder's name picks the category for its zips
+    zip_files = find_zips()
+    # Paths already uploaded are skipped right away. Content hashes, which catch zips renamed, moved or
+    # copied after being uploaded, are computed in the background and checked before the queue is fed.
+    all_zips = filter_unprocessed(zip_files)
+    hashing = ThreadPoolExecutor(max_workers=1)
+    hashes = hashing.submit(index_hashes, zip_files, config.get('hash_workers', 4))
+    hashing.shutdown(wait=False)
+    watching = config.get('watch_folder', False) and upload_engine != 'http'
+    if not all_zips and not watching:
         logger.info("No zips to process.")
         return
-    shared_total = multiprocessing.Value('i', len(all_zips))
-    shared_processed = multiprocessing.Value('i', 0)
-    shared_turn = multiprocessing.Value('i', 0)
+    # Stale category caches refresh in the background; browsers only scrape the modal if there is no cache at all
+    categories_dict = get_category_catalogue(config, report_category_refresh)
+    all_zips, hrefs = route_or_fail(config, all_zips, categories_dict)
+    if hrefs:
+        logger.info(f"Routed {len(hrefs)} zips to {len(set(hrefs.values()))} categories; the rest use the configured category.")
+    mark_queued(all_zips)
+    num_workers = config.get('http_concurrency', 8) if upload_engine == 'http' else num_browsers
+    all_zips, predicted, baseline = order_work(all_zips, config, num_workers, sizes=simulated_sizes(config, all_zips), groups=hrefs)
+    logger.info(f"Scheduled {len(all_zips)} zips ({config.get('schedule', 'largest_first')}) over {num_workers} workers: predicted makespan {predicted / 60:.1f} min (folder order: {baseline / 60:.1f} min)")
+    # Every cookie file is an account; all workers share the site budget and each account has its own
+    pool = build_session_pool(mp_context, config)
+    if pool is None:
+        return
+    limiter = RateLimiter(mp_context, config, pool.accounts, pool)
+    shared_total = mp_context.Value('i', len(all_zips))
+    shared_processed = mp_context.Value('i', 0)
+    
+    if upload_engine == 'http':
+        if config.get('watch_folder', False):
+            logger.info("watch_folder only applies to the selenium engine; uploading the current folder once.")
+        run_http_uploads(config, [(z, hrefs.get(z)) for z in iter_ready_zips(config, drop_duplicates(all_zips, hashes, shared_total), shared_total)], shared_processed, shared_total, limiter, pool)
+        shutdown_pool()
+        report_run(run_started, pool)
+        return
     
+    # The pre-flight scan feeds the queue while the browsers start up
+    shared_queue = mp_context.Queue() if num_browsers > 1 else queue.Queue()
+    feeder = threading.Thread(target=feed_queue, args=(config, all_zips, shared_queue, num_browsers, shared_total, zip_files, watch_stop, hrefs, hashes), daemon=True)
+    feeder.start()
     if num_browsers == 1:
-        run_browser(config, None, all_zips, shared_processed, shared_total, None, None, None, None, num_browsers)
+        run_browser(config, None, shared_processed, shared_total, None, None, None, shared_queue, limiter, pool)
     else:
-        shared_queue = multiprocessing.Queue()
-        for z in all_zips:
-            shared_queue.put(z)
-        lock = multiprocessing.Lock()
-        barrier = multiprocessing.Barrier(num_browsers)
+        # Caps how many browsers may be in the save/redirect step at once
+        max_concurrent_submits = max(1, min(num_browsers, config.get('max_concurrent_submits', num_browsers)))
+        submit_slots = mp_context.BoundedSemaphore(max_concurrent_submits)
+        barrier = mp_context.Barrier(num_browsers)
         processes = []
+        # No fixed pause between launches: each browser's first page load waits for the shared rate limiter instead
         for i in range(num_browsers):
-            p = multiprocessing.Process(target=run_browser, args=(config, lock, None, shared_processed, shared_total, barrier, i, shared_turn, shared_queue, num_browsers))
+            p = mp_context.Process(target=run_browser_process, args=(log_queue, progress_queue, config, None, shared_processed, shared_total, barrier, i, submit_slots, shared_queue, limiter, pool))
             p.start()
             processes.append(p)
-            if i < num_browsers - 1:
-                logger.info("waiting 10 seconds between browser windows to avoid pissing off Cloudflare...")
-                time.sleep(10)
         
         for p in processes:
             p.join()
+    # Every browser has exited, so there is nobody left to feed
+    watch_stop.set()
+    shutdown_pool()
+    report_run(run_started, pool)
 
 if __name__ == "__main__":
     config = load_config()
@@ -611,13 +1015,15 @@ if __name__ == "__main__":
             self.title("Se7enSins Uploader")
             self.protocol("WM_DELETE_WINDOW", self.on_closing)
             self.config_data = config.copy()
-            self.categories = []
-            self.zip_files = glob.glob('zipsToUpload/*.zip')
+            self.category_index = CategoryIndex({})
+            self.zip_files = find_zips()
             self.total_zips = len(self.zip_files)
             
             self.build_ui()
-            if os.path.exists('categories.json'):
-                self._load_categories_from_file()
+            init_db()
+            self.show_categories(load_cached_categories(self.config_data))
+            if is_stale(self.config_data):
+                self.load_categories()
             self.update_progress_from_db()
             self.poll_logs()
             self.poll_progress()
@@ -651,10 +1057,16 @@ if __name__ == "__main__":
             self.wait_per_mb_entry.grid(row=3, column=1, padx=5, pady=2)
             
             self.manual_mode_var = tk.BooleanVar(value=self.config_data.get('manual_mode', False))
-            tk.Checkbutton(config_frame, text="Manual Mode", variable=self.manual_mode_var).grid(row=4, column=0, columnspan=2, sticky="w")
+            tk.Checkbutton(config_frame, text="Manual Mode", variable=self.manual_mode_var).grid(row=4, column=0, sticky="w")
+            
+            self.fast_mode_var = tk.BooleanVar(value=self.config_data.get('fast_mode', False))
+            tk.Checkbutton(config_frame, text="Fast Mode", variable=self.fast_mode_var).grid(row=4, column=1, sticky="w")
             
             self.auto_submit_var = tk.BooleanVar(value=self.config_data.get('auto_submit', True))
-            tk.Checkbutton(config_frame, text="Auto Submit", variable=self.auto_submit_var).grid(row=5, column=0, columnspan=2, sticky="w")
+            tk.Checkbutton(config_frame, text="Auto Submit", variable=self.auto_submit_var).grid(row=5, column=0, sticky="w")
+            
+            self.watch_folder_var = tk.BooleanVar(value=self.config_data.get('watch_folder', False))
+            tk.Checkbutton(config_frame, text="Watch Folder", variable=self.watch_folder_var).grid(row=5, column=1, sticky="w")
             
             tk.Label(config_frame, text="Upload Wait Timeout:").grid(row=6, column=0, sticky="w")
             self.timeout_entry = tk.Entry(config_frame)
@@ -671,9 +1083,10 @@ if __name__ == "__main__":
             self.cat_id_entry.bind('<KeyRelease>', self.on_id_change)
             
             tk.Button(config_frame, text="Load Categories", command=self.load_categories).grid(row=9, column=0, sticky="w")
-            self.cat_combo = ttk.Combobox(config_frame, state="readonly")
+            self.cat_combo = ttk.Combobox(config_frame, width=40)
             self.cat_combo.grid(row=9, column=1, padx=5, pady=2)
             self.cat_combo.bind("<<ComboboxSelected>>", self.on_cat_select)
+            self.cat_combo.bind("<KeyRelease>", self.on_cat_search)
             
             tk.Label(config_frame, text="Tag:").grid(row=10, column=0, sticky="w")
             self.tag_entry = tk.Entry(config_frame)
@@ -713,10 +1126,14 @@ if __name__ == "__main__":
             self.config_data['upload_wait_base'] = int(self.wait_base_entry.get())
             self.config_data['upload_wait_per_mb'] = float(self.wait_per_mb_entry.get())
             self.config_data['manual_mode'] = self.manual_mode_var.get()
+            self.config_data['fast_mode'] = self.fast_mode_var.get()
             self.config_data['auto_submit'] = self.auto_submit_var.get()
+            self.config_data['watch_folder'] = self.watch_folder_var.get()
             self.config_data['upload_wait_timeout'] = int(self.timeout_entry.get())
             self.config_data['skip_cloudflare'] = self.skip_cf_var.get()
             self.config_data['category_id'] = int(self.cat_id_entry.get()) if self.cat_id_entry.get() else None
+            entry = self.category_index.by_key.get(self.cat_id_entry.get().strip())
+            self.config_data['category_cat_id'] = entry['cat_id'] if entry else None
             self.config_data['tag'] = self.tag_entry.get()
             self.config_data['num_browsers'] = int(self.num_browsers_entry.get())
             with open('config.json', 'w') as f:
@@ -724,26 +1141,33 @@ if __name__ == "__main__":
             logger.info("Config saved.")
         
         def load_categories(self):
-            threading.Thread(target=self._load_categories).start()
-        
-        def _load_categories(self):
-            cats = get_categories(self.config_data)
-            self.categories = [name for name, href in cats]
-            self.cat_combo['values'] = [f"{i+1}. {name}" for i, name in enumerate(self.categories)]
-            if self.config_data.get('category_id'):
-                id_val = self.config_data['category_id']
-                if 1 <= id_val <= len(self.categories):
-                    self.cat_combo.set(f"{id_val}. {self.categories[id_val-1]}")
-        
-        def _load_categories_from_file(self):
-            with open('categories.json') as f:
-                data = json.load(f)
-            self.categories = [(data[str(i+1)]['name'], data[str(i+1)]['href']) for i in range(len(data))]
-            self.cat_combo['values'] = [f"{i+1}. {name}" for i, (name, href) in enumerate(self.categories)]
-            if self.config_data.get('category_id'):
-                id_val = self.config_data['category_id']
-                if 1 <= id_val <= len(self.categories):
-                    self.cat_combo.set(f"{id_val}. {self.categories[id_val-1][0]}")
+            # Plain HTTP with the exported cookies; a failed refresh keeps the cached list
+            refresh_in_background(self.config_data, self._on_categories_refreshed)
+        
+        def _on_categories_refreshed(self, categories_dict, error):
+            report_category_refresh(categories_dict, error)
+            self.after(0, self.show_categories, categories_dict)
+        
+        def show_categories(self, categories_dict):
+            self.category_index = CategoryIndex(categories_dict)
+            self.cat_combo['values'] = [self.format_category(entry) for entry in self.category_index.search('')]
+            entry = find_category(self.config_data, categories_dict)
+            if entry:
+                # The numbered key can move when the list is refreshed; the site's cat_id does not
+                self.cat_id_entry.delete(0, tk.END)
+                self.cat_id_entry.insert(0, entry['key'])
+                self.cat_combo.set(self.format_category(entry))
+        
+        def format_category(self, entry):
+            label = f"{entry['key']}. {entry['name']}"
+            return f"{label} [{entry['cat_id']}]" if entry['cat_id'] else label
+        
+        def on_cat_search(self, event):
+            # Type-ahead: narrow the dropdown to the best matches for what has been typed
+            if event.keysym in ('Up', 'Down', 'Return', 'Escape', 'Tab'):
+                return
+            matches = self.category_index.search(self.cat_combo.get())
+            self.cat_combo['values'] = [self.format_category(entry) for entry in matches]
         
         def on_cat_select(self, event):
             selected = self.cat_combo.get()
@@ -753,19 +1177,14 @@ if __name__ == "__main__":
                 self.cat_id_entry.insert(0, num)
         
         def on_id_change(self, event):
-            try:
-                id_val = int(self.cat_id_entry.get())
-                if 1 <= id_val <= len(self.categories):
-                    self.cat_combo.set(f"{id_val}. {self.categories[id_val-1]}")
-                else:
-                    self.cat_combo.set('')
-            except ValueError:
-                self.cat_combo.set('')
+            entry = self.category_index.by_key.get(self.cat_id_entry.get().strip())
+            self.cat_combo.set(self.format_category(entry) if entry else '')
         
         def start_upload(self):
             threading.Thread(target=main).start()
         
         def stop_upload(self):
+            watch_stop.set()
             os.system('taskkill /f /im chrome.exe >nul 2>&1')
             logger.info("Upload stopped, Chrome processes killed.")
         
@@ -813,17 +1232,15 @@ if __name__ == "__main__":
         
         def update_progress_from_db(self):
             if os.path.exists('progress.db'):
-                conn = sqlite3.connect('progress.db')
-                c = conn.cursor()
-                try:
-                    c.execute('SELECT COUNT(*) FROM processed')
-                    processed = c.fetchone()[0]
-                except sqlite3.OperationalError:
-                    processed = 0
-                conn.close()
+                counts = get_state_counts()
+                processed = counts.get('done', 0)
+                failed = counts.get('failed', 0)
                 self.progress_bar['maximum'] = self.total_zips
                 self.progress_bar['value'] = processed
-                self.progress_label.config(text=f"{processed}/{self.total_zips}")
+                label = f"{processed}/{self.total_zips}"
+                if failed:
+                    label += f" ({failed} failed)"
+                self.progress_label.config(text=label)
             else:
                 self.progress_label.config(text=f"0/{self.total_zips}")
             self.update_idletasks()
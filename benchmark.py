@@ -0,0 +1,104 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+
+from colorama import Fore, Style
+
+from fake_xenforo import FakeXenForo
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def make_zips(folder, count, size_mb):
+    """Write count zips of about size_mb each, with random (incompressible) payloads and a README."""
+    os.makedirs(folder, exist_ok=True)
+    for i in range(count):
+        with zipfile.ZipFile(os.path.join(folder, f'bench_{i + 1:04d}.zip'), 'w', zipfile.ZIP_STORED) as zf:
+            zf.writestr('README.md', f"Benchmark file {i + 1}\nGenerated for the uploader benchmark.")
+            zf.writestr('payload.bin', os.urandom(int(size_mb * 1024 * 1024)))
+
+
+def make_config(server_url, args):
+    with open(os.path.join(REPO_DIR, 'config.json')) as f:
+        config = json.load(f)
+    config.update({
+        'site': 'bench',
+        'url': f'{server_url}/downloads/',
+        'num_browsers': args.browsers,
+        'upload_engine': args.engine,
+        'http_concurrency': args.browsers,
+        'headless': not args.show,
+        'auto_submit': True,
+        'fast_mode': True,
+        'manual_mode': False,
+        'skip_cloudflare': True,
+        'watch_folder': False,
+        'reuse_profiles': False,
+        'category_id': 1,
+        'category_cat_id': None,
+        'category_rules': [],
+        'tag': 'benchmark',
+        'rate_limit': bool(args.rate),
+        'site_rate_per_minute': args.rate or 30,
+        'account_rate_per_minute': args.rate or 20,
+    })
+    return config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upload generated zips to a local fake XenForo and report files/minute.")
+    parser.add_argument('--zips', type=int, default=20, help="Number of zips to upload")
+    parser.add_argument('--browsers', type=int, default=2, help="Browsers (or HTTP workers) to run")
+    parser.add_argument('--size-mb', type=float, default=1.0, help="Size of each zip")
+    parser.add_argument('--engine', choices=['selenium', 'http'], default='selenium')
+    parser.add_argument('--attach-latency', type=float, default=0.5, help="Seconds the fake server takes per attachment")
+    parser.add_argument('--attach-per-mb', type=float, default=0.0, help="Extra attachment seconds per MB")
+    parser.add_argument('--redirect-latency', type=float, default=0.2, help="Seconds the fake server takes to save")
+    parser.add_argument('--accounts', type=int, default=1, help="Cookie files (accounts) to spread the uploads over")
+    parser.add_argument('--rate', type=float, default=0, help="Site and account actions per minute (default: no rate limit)")
+    parser.add_argument('--show', action='store_true', help="Show the browser windows instead of running headless")
+    parser.add_argument('--keep', action='store_true', help="Keep the temporary work folder")
+    args = parser.parse_args()
+
+    fake = FakeXenForo(attach_latency=args.attach_latency, attach_per_mb=args.attach_per_mb,
+                       redirect_latency=args.redirect_latency).start()
+    workdir = tempfile.mkdtemp(prefix='uploader-bench-')
+    print(f"{Fore.CYAN}Fake XenForo on {fake.url}, working in {workdir}{Style.RESET_ALL}")
+    make_zips(os.path.join(workdir, 'zipsToUpload'), args.zips, args.size_mb)
+    os.makedirs(os.path.join(workdir, 'cookies'))
+    for i in range(args.accounts):
+        name = 'bench' if i == 0 else f'bench-{i + 1}'
+        with open(os.path.join(workdir, 'cookies', f'{name}.json'), 'w') as f:
+            json.dump([{'name': 'xf_session', 'value': name, 'domain': '127.0.0.1', 'path': '/'}], f)
+    with open(os.path.join(workdir, 'config.json'), 'w') as f:
+        json.dump(make_config(fake.url, args), f, indent=4)
+
+    # main.py reads config.json, cookies/, zipsToUpload/ and progress.db from the working directory
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        import main as uploader
+        started = time.perf_counter()
+        uploader.main()
+        elapsed = time.perf_counter() - started
+    finally:
+        os.chdir(cwd)
+        fake.stop()
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    stats = fake.stats
+    print(f"{Fore.CYAN}Benchmark ({args.engine}, {args.browsers} workers, {args.zips} x {args.size_mb:g} MB, "
+          f"attach {args.attach_latency:g}s + {args.attach_per_mb:g}s/MB, redirect {args.redirect_latency:g}s):{Style.RESET_ALL}")
+    print(f"{Fore.CYAN}  {stats['saves']}/{args.zips} saved in {elapsed:.1f}s: {stats['saves'] * 60 / max(elapsed, 1e-6):.1f} files/minute{Style.RESET_ALL}")
+    print(f"{Fore.CYAN}  {stats['form_views']} form loads, {stats['uploads']} attachments ({stats['upload_bytes'] / (1024 * 1024):.1f} MB), {stats['rejected_saves']} rejected saves{Style.RESET_ALL}")
+    return 0 if stats['saves'] == args.zips else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
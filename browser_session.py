@@ -0,0 +1,143 @@
+import os
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from http_uploader import load_cookies
+
+# XenForo's login cookies; everything else (cf_clearance in particular) belongs to the browser, not the account
+SESSION_COOKIES = ('xf_session', 'xf_user', 'xf_csrf')
+
+# Written into a worker's profile so a later run knows which account's session the profile holds
+PROFILE_ACCOUNT_FILE = 'uploader-account.txt'
+
+SITE_URLS = {
+    'se7ensins': 'https://www.se7ensins.com',
+    'gbatemp': 'https://gbatemp.net',
+}
+
+# Nothing the add form needs: ad and tracker hosts, images, fonts and media
+DEFAULT_BLOCKED_URLS = [
+    '*googlesyndication.com*', '*doubleclick.net*', '*adservice.google.*', '*googletagservices.com*',
+    '*google-analytics.com*', '*googletagmanager.com*', '*amazon-adsystem.com*', '*adnxs.com*',
+    '*pubmatic.com*', '*rubiconproject.com*', '*criteo.*', '*taboola.com*', '*outbrain.com*',
+    '*moatads.com*', '*scorecardresearch.com*', '*quantserve.com*', '*hotjar.com*',
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf',
+    '*.mp4', '*.webm',
+]
+
+# XenForo marks the <html> element with data-logged-in; Cloudflare's interstitial has its own markup
+SESSION_STATE_JS = """
+var title = document.title || '';
+if (title.indexOf('Just a moment') !== -1 || title.indexOf('Attention Required') !== -1 ||
+        document.querySelector('#challenge-form, #challenge-running, #cf-challenge-running, .cf-turnstile')) {
+    return 'challenge';
+}
+var flag = document.documentElement.getAttribute('data-logged-in');
+if (flag === null) return 'unknown';
+return flag === 'true' ? 'logged_in' : 'logged_out';
+"""
+
+# Error pages for 429/503 and XenForo's flood control message ("You must wait at least N seconds...")
+THROTTLE_JS = """
+var title = document.title || '';
+if (/\\b(429|503)\\b|Too Many Requests|Service Unavailable/i.test(title)) return true;
+var notices = document.querySelectorAll('.blockMessage--error, .overlay-content, .js-flashMessage, .p-body-pageContent > .blockMessage');
+for (var i = 0; i < notices.length; i++) {
+    if (/You must wait at least|Too Many Requests|too many/i.test(notices[i].textContent || '')) return true;
+}
+return false;
+"""
+
+
+def get_base_url(config):
+    """Return scheme://host for the configured site, taken from config['url'] when it is set."""
+    if config.get('url'):
+        parts = urlsplit(config['url'])
+        return f"{parts.scheme}://{parts.netloc}"
+    return SITE_URLS.get(config.get('site', 'se7ensins'), SITE_URLS['se7ensins'])
+
+
+def get_profile_dir(config, slot):
+    """Chrome user-data-dir for one worker slot; Chrome refuses to share a profile between running instances."""
+    root = config.get('profile_dir', 'profiles')
+    return os.path.abspath(os.path.join(root, config.get('site', 'se7ensins'), f'worker-{slot}'))
+
+
+def get_profile_account(config, slot):
+    """Account whose session the slot's profile holds, or None when it was never recorded."""
+    try:
+        with open(os.path.join(get_profile_dir(config, slot), PROFILE_ACCOUNT_FILE)) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def set_profile_account(config, slot, account):
+    if not account or not config.get('reuse_profiles', True):
+        return
+    profile_dir = get_profile_dir(config, slot)
+    os.makedirs(profile_dir, exist_ok=True)
+    with open(os.path.join(profile_dir, PROFILE_ACCOUNT_FILE), 'w') as f:
+        f.write(account)
+
+
+def block_resources(driver, config):
+    """Stop the current tab from loading anything on the blocklist; CDP settings are per tab."""
+    if not config.get('block_resources', True):
+        return
+    patterns = config.get('blocked_urls') or DEFAULT_BLOCKED_URLS
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+
+
+def get_session_state(driver):
+    """Return 'logged_in', 'logged_out', 'challenge' or 'unknown' for the current page."""
+    return driver.execute_script(SESSION_STATE_JS)
+
+
+def is_throttled(driver):
+    """True when the current page is a rate-limit error or XenForo flood control notice."""
+    return bool(driver.execute_script(THROTTLE_JS))
+
+
+def wait_for_challenge(driver, timeout):
+    """Give Cloudflare a chance to clear its challenge on its own; return the session state afterwards."""
+    def cleared(d):
+        state = get_session_state(d)
+        return state if state != 'challenge' else False
+
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=1).until(cleared)
+    except TimeoutException:
+        return 'challenge'
+
+
+def add_cookies(driver, cookies):
+    """Add exported browser cookies to the current domain, normalizing sameSite for Selenium."""
+    for cookie in cookies:
+        cookie = dict(cookie)
+        if 'sameSite' in cookie:
+            same_site = str(cookie['sameSite']).lower()
+            if same_site in ('lax', 'strict', 'none'):
+                cookie['sameSite'] = same_site.capitalize()
+            else:
+                # Remove invalid sameSite
+                del cookie['sameSite']
+        driver.add_cookie(cookie)
+    return len(cookies)
+
+
+def clear_session_cookies(driver):
+    """Log the browser out of XenForo without dropping the profile's Cloudflare clearance."""
+    for name in SESSION_COOKIES:
+        driver.delete_cookie(name)
+
+
+def inject_cookies(driver, config, url, cookie_file=None):
+    """Load the cookie file into the browser and reload url; returns (new session state, cookies added)."""
+    added = add_cookies(driver, load_cookies(config, cookie_file))
+    driver.get(url)
+    return get_session_state(driver), added
@@ -0,0 +1,261 @@
+import json
+import os
+import re
+import threading
+import time
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+from browser_session import get_base_url
+from http_uploader import HttpUploadError, load_cookies, make_session
+
+DEFAULT_TTL_HOURS = 24
+
+# XenForo category URLs end in /categories/{slug}.{id}/add, or carry the id as a query parameter
+CAT_ID_RE = re.compile(r'\.(\d+)/add/?(?:[?#]|$)|[?&]resource_category_id=(\d+)')
+
+
+def get_categories_path(config):
+    # Each site keeps its own category cache next to config.json
+    site = config.get('site', 'se7ensins')
+    return 'categories.json' if site == 'se7ensins' else f'{site}categories.json'
+
+
+def get_meta_path(config):
+    # Fetch time lives in a sidecar so the category file keeps its plain {"1": {...}} layout
+    return os.path.splitext(get_categories_path(config))[0] + '.meta.json'
+
+
+def load_cached_categories(config):
+    path = get_categories_path(config)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def get_fetched_at(config):
+    """Return when the category cache was last refreshed, or None if that is unknown."""
+    try:
+        with open(get_meta_path(config)) as f:
+            return json.load(f).get('fetched_at')
+    except (OSError, ValueError):
+        return None
+
+
+def is_stale(config):
+    fetched_at = get_fetched_at(config)
+    if fetched_at is None:
+        return True
+    return time.time() - fetched_at > config.get('category_ttl_hours', DEFAULT_TTL_HOURS) * 3600
+
+
+def _write_json(path, data):
+    # Write to a temp file first so readers never see half a file
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=4)
+    os.replace(tmp_path, path)
+
+
+def parse_cat_id(href):
+    """Return the site's own category id from an add-form URL, or None."""
+    match = CAT_ID_RE.search(href or '')
+    return (match.group(1) or match.group(2)) if match else None
+
+
+def save_categories(config, categories):
+    """Write [(name, href), ...] to the site's category cache and stamp the fetch time."""
+    categories_dict = {}
+    for i, (name, href) in enumerate(categories):
+        categories_dict[str(i+1)] = {'name': name, 'href': href}
+        cat_id = parse_cat_id(href)
+        if cat_id:
+            categories_dict[str(i+1)]['cat_id'] = cat_id
+    _write_json(get_categories_path(config), categories_dict)
+    _write_json(get_meta_path(config), {'fetched_at': time.time()})
+    return categories_dict
+
+
+def get_chooser_url(config):
+    """URL of the page listing the categories you can add a download to."""
+    if config.get('url'):
+        return urljoin(config['url'].rstrip('/') + '/', 'add')
+    return f"{get_base_url(config)}/downloads/add"
+
+
+class CategoryParser(HTMLParser):
+    """Collects (name, href) pairs from the category chooser's block links."""
+
+    def __init__(self, base_url):
+        super().__init__()
+        self.base_url = base_url
+        self.categories = []
+        self._href = None
+        self._text = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'a' and 'fauxBlockLink-blockLink' in (attrs.get('class') or '').split() and attrs.get('href'):
+            self._href = urljoin(self.base_url, attrs['href'])
+            self._text = []
+
+    def handle_data(self, data):
+        if self._href is not None:
+            self._text.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == 'a' and self._href is not None:
+            name = ' '.join(''.join(self._text).split())
+            if name:
+                self.categories.append((name, self._href))
+            self._href = None
+
+
+def fetch_categories(config, timeout=30):
+    """Fetch the category list over plain HTTP with the exported cookies; no browser needed."""
+    url = get_chooser_url(config)
+    resp = make_session(config, load_cookies(config)).get(url, timeout=timeout)
+    if resp.status_code != 200:
+        raise HttpUploadError(f"Fetching categories from {url} returned HTTP {resp.status_code}")
+    parser = CategoryParser(resp.url)
+    parser.feed(resp.text)
+    if not parser.categories:
+        raise HttpUploadError(f"No categories found at {url} (logged out or challenged?)")
+    return parser.categories
+
+
+def refresh_categories(config):
+    """Fetch and save the category list; raises and leaves the cache untouched on failure."""
+    return save_categories(config, fetch_categories(config))
+
+
+def refresh_in_background(config, callback=None):
+    """Refresh the cache on a daemon thread; callback(categories_dict, error) runs when it finishes."""
+    def worker():
+        try:
+            categories_dict, error = refresh_categories(config), None
+        except Exception as e:
+            categories_dict, error = load_cached_categories(config), e
+        if callback:
+            callback(categories_dict, error)
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    return thread
+
+
+def get_category_catalogue(config, callback=None):
+    """Return the cached categories right away, refreshing them first only if there is no cache at all.
+
+    A stale cache is returned as is and refreshed in the background; a failed refresh keeps it.
+    """
+    categories_dict = load_cached_categories(config)
+    if not categories_dict:
+        try:
+            return refresh_categories(config)
+        except Exception as e:
+            if callback:
+                callback({}, e)
+            return {}
+    if is_stale(config):
+        refresh_in_background(config, callback)
+    return categories_dict
+
+
+def normalize_name(text):
+    return ' '.join(re.sub(r'[^0-9a-z]+', ' ', text.lower()).split())
+
+
+def _trigrams(text):
+    padded = f'  {text} '
+    return {padded[i:i+3] for i in range(len(padded) - 2)}
+
+
+class CategoryIndex:
+    """In-memory lookup over a category cache by numbered key, site cat_id, and fuzzy name search."""
+
+    def __init__(self, categories_dict):
+        self.entries = []
+        self.by_key = {}
+        self.by_cat_id = {}
+        self.by_name = {}
+        self._grams = {}
+        for key in sorted(categories_dict, key=int):
+            category = categories_dict[key]
+            entry = {
+                'key': key,
+                'name': category['name'],
+                'href': category['href'],
+                'cat_id': str(category.get('cat_id') or parse_cat_id(category['href']) or '') or None,
+                'norm': normalize_name(category['name']),
+            }
+            self.by_key[key] = entry
+            if entry['cat_id']:
+                self.by_cat_id[entry['cat_id']] = entry
+            self.by_name.setdefault(entry['norm'], []).append(entry)
+            for gram in _trigrams(entry['norm']):
+                self._grams.setdefault(gram, []).append(len(self.entries))
+            self.entries.append(entry)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def search(self, query, limit=50):
+        """Return the best matching entries: exact ids first, then name prefixes, substrings and trigram overlap."""
+        query = query.strip()
+        if not query:
+            return self.entries[:limit]
+        results = []
+        if query.isdigit():
+            for entry in (self.by_cat_id.get(query), self.by_key.get(query)):
+                if entry and entry not in results:
+                    results.append(entry)
+        norm = normalize_name(query)
+        if not norm:
+            return results[:limit]
+        grams = _trigrams(norm)
+        counts = {}
+        for gram in grams:
+            for i in self._grams.get(gram, ()):
+                counts[i] = counts.get(i, 0) + 1
+        scored = []
+        for i, shared in counts.items():
+            entry = self.entries[i]
+            if entry['norm'].startswith(norm):
+                score = 3.0
+            elif f' {norm}' in f" {entry['norm']}":
+                score = 2.5
+            elif norm in entry['norm']:
+                score = 2.0
+            else:
+                score = shared / len(grams | _trigrams(entry['norm']))
+                if score < 0.2:
+                    continue
+            scored.append((-score, i))
+        scored.sort()
+        for _, i in scored:
+            if self.entries[i] not in results:
+                results.append(self.entries[i])
+            if len(results) >= limit:
+                break
+        return results
+
+
+def find_category(config, categories_dict):
+    """Return the configured category's index entry, or None.
+
+    category_cat_id (the site's own id) wins over the numbered category_id key,
+    so a selection survives the list being re-ordered on refresh.
+    """
+    index = CategoryIndex(categories_dict)
+    if config.get('category_cat_id') is not None:
+        entry = index.by_cat_id.get(str(config['category_cat_id']))
+        if entry:
+            return entry
+    if config.get('category_id') is not None:
+        return index.by_key.get(str(config['category_id']))
+    return None
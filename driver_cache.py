@@ -0,0 +1,104 @@
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+
+CACHE_PATH = 'chromedriver_cache.json'
+VERSION_RE = re.compile(r'(\d+)\.(\d+)\.(\d+)\.(\d+)')
+
+CHROME_COMMANDS = ['google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome']
+MAC_CHROME = '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome'
+
+
+def _run_version(cmd):
+    try:
+        out = subprocess.run(cmd, capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = VERSION_RE.search(out or '')
+    return match.group(0) if match else None
+
+
+def get_chrome_version():
+    """Return the installed Chrome version string, or None if it cannot be found locally."""
+    if sys.platform == 'win32':
+        import winreg
+        for root in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+            try:
+                with winreg.OpenKey(root, r'Software\Google\Chrome\BLBeacon') as key:
+                    return winreg.QueryValueEx(key, 'version')[0]
+            except OSError:
+                continue
+        return None
+    if sys.platform == 'darwin' and os.path.exists(MAC_CHROME):
+        return _run_version([MAC_CHROME, '--version'])
+    for name in CHROME_COMMANDS:
+        path = shutil.which(name)
+        if path:
+            version = _run_version([path, '--version'])
+            if version:
+                return version
+    return None
+
+
+def _major(version):
+    return version.split('.')[0] if version else None
+
+
+def _load_cache():
+    try:
+        with open(CACHE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache):
+    with open(CACHE_PATH, 'w') as f:
+        json.dump(cache, f, indent=4)
+
+
+def _download_chromedriver():
+    # Imported here so dry runs and benchmarks, which never start Chrome, work without webdriver-manager
+    from webdriver_manager.chrome import ChromeDriverManager
+    return ChromeDriverManager().install()
+
+
+def resolve_chromedriver(config):
+    """Find a chromedriver for the installed Chrome once and remember it per Chrome version.
+
+    Order: chromedriver_path from config, the cached path for this Chrome version, a chromedriver
+    on PATH whose major version matches, webdriver-manager (the only step that uses the network),
+    then any chromedriver on PATH. Returns None to let Selenium locate a driver itself.
+    When the Chrome version cannot be detected, a chromedriver on PATH is used as is and nothing
+    is cached, since the cache could not tell when Chrome is updated.
+    """
+    if config.get('chromedriver_path'):
+        return config['chromedriver_path']
+    local = shutil.which('chromedriver')
+    chrome_version = get_chrome_version()
+    if not chrome_version:
+        if local:
+            return local
+        try:
+            return _download_chromedriver()
+        except Exception:
+            return None
+    cache = _load_cache()
+    cached = cache.get(chrome_version)
+    if cached and os.path.exists(cached):
+        return cached
+    local_version = _run_version([local, '--version']) if local else None
+    if local and _major(local_version) == _major(chrome_version):
+        path = local
+    else:
+        try:
+            path = _download_chromedriver()
+        except Exception:
+            # Offline or blocked: an older local driver is better than nothing, but is not cached
+            return local
+    cache[chrome_version] = path
+    _save_cache(cache)
+    return path
@@ -0,0 +1,145 @@
+import argparse
+import contextlib
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+
+from colorama import Fore, Style
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+DRY_RUN_URL = 'https://dry-run.invalid/downloads/'
+
+
+@contextlib.contextmanager
+def quiet_stdout():
+    """Silence stdout for this process and every browser process it starts, which write to fd 1 directly."""
+    sys.stdout.flush()
+    saved = os.dup(1)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    try:
+        yield
+    finally:
+        sys.stdout.flush()
+        os.dup2(saved, 1)
+        os.close(devnull)
+        os.close(saved)
+
+
+def make_placeholder_zips(folder, count, min_mb, max_mb, seed):
+    """Write count tiny zips and return {name: simulated size in bytes}."""
+    os.makedirs(folder, exist_ok=True)
+    rng = random.Random(seed)
+    sizes = {}
+    for i in range(count):
+        name = f'dry_{i + 1:05d}.zip'
+        with zipfile.ZipFile(os.path.join(folder, name), 'w') as zf:
+            zf.writestr('README.md', f"Dry run file {i + 1}\nPlaceholder for the orchestration dry run.")
+        sizes[name] = int(rng.uniform(min_mb, max_mb) * 1024 * 1024)
+    return sizes
+
+
+def make_config(args, sizes):
+    with open(os.path.join(REPO_DIR, 'config.json')) as f:
+        config = json.load(f)
+    config.update({
+        'site': 'dryrun',
+        'url': DRY_RUN_URL,
+        'driver_backend': 'simulated',
+        'upload_engine': 'selenium',
+        'num_browsers': args.workers,
+        'rate_limit': bool(args.rate),
+        'site_rate_per_minute': args.rate or 30,
+        'schedule': args.schedule,
+        'pipeline_tabs': args.pipeline,
+        'auto_submit': True,
+        'manual_mode': False,
+        'fast_mode': True,
+        'watch_folder': False,
+        'category_id': 1,
+        'category_cat_id': None,
+        'category_rules': [],
+        'tag': 'dry run',
+        'simulation': {
+            'time_scale': args.time_scale,
+            'jitter': args.jitter,
+            'seed': args.seed,
+            'launch': args.launch,
+            'page_load': args.page_load,
+            'fill': args.fill,
+            'tags': args.tags,
+            'attach_base': args.attach_base,
+            'attach_per_mb': args.attach_per_mb,
+            'submit': args.submit,
+            'sizes': sizes,
+        },
+    })
+    if args.max_concurrent_submits:
+        config['max_concurrent_submits'] = args.max_concurrent_submits
+    return config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the multi-browser orchestration against simulated browsers and report where the time goes.")
+    parser.add_argument('--workers', type=int, default=50, help="Simulated browsers (one process each)")
+    parser.add_argument('--zips', type=int, default=500, help="Placeholder zips to queue")
+    parser.add_argument('--min-mb', type=float, default=1.0, help="Smallest simulated zip size")
+    parser.add_argument('--max-mb', type=float, default=50.0, help="Largest simulated zip size")
+    parser.add_argument('--schedule', default='largest_first', help="Queue order: largest_first, smallest_first or fifo")
+    parser.add_argument('--max-concurrent-submits', type=int, default=None, help="Browsers allowed to save at once (default: all)")
+    parser.add_argument('--rate', type=float, default=0, help="Site-wide page loads and saves per minute, in real time (default: no rate limit)")
+    parser.add_argument('--no-pipeline', dest='pipeline', action='store_false', help="Do not prepare the next form in a second tab")
+    parser.add_argument('--time-scale', type=float, default=0.1, help="Multiplier for every simulated latency")
+    parser.add_argument('--jitter', type=float, default=0.2, help="Random +/- fraction applied to every latency")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--launch', type=float, default=3.0, help="Seconds to start a browser")
+    parser.add_argument('--page-load', type=float, default=1.5, help="Seconds per page load")
+    parser.add_argument('--fill', type=float, default=0.2, help="Seconds to fill the form fields")
+    parser.add_argument('--tags', type=float, default=0.1, help="Seconds to type the tag")
+    parser.add_argument('--attach-base', type=float, default=2.0, help="Seconds every attachment takes")
+    parser.add_argument('--attach-per-mb', type=float, default=0.5, help="Extra attachment seconds per MB")
+    parser.add_argument('--submit', type=float, default=1.5, help="Seconds from Save to the redirect")
+    parser.add_argument('--verbose', action='store_true', help="Show the workers' normal output")
+    parser.add_argument('--keep', action='store_true', help="Keep the temporary work folder")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='uploader-dry-run-')
+    print(f"{Fore.CYAN}Dry run in {workdir}: {args.zips} zips, {args.workers} simulated browsers{Style.RESET_ALL}")
+    sizes = make_placeholder_zips(os.path.join(workdir, 'zipsToUpload'), args.zips, args.min_mb, args.max_mb, args.seed)
+    config = make_config(args, sizes)
+    with open(os.path.join(workdir, 'config.json'), 'w') as f:
+        json.dump(config, f, indent=4)
+
+    # main.py reads config.json, zipsToUpload/, the category cache and progress.db from the working directory
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        import main as uploader
+        from categories import save_categories
+        from run_report import build_orchestration_report, build_run_report
+        save_categories(config, [('Simulated', f'{DRY_RUN_URL}categories/simulated.1/add')])
+        started = time.time()
+        with contextlib.nullcontext() if args.verbose else quiet_stdout():
+            uploader.main()
+        finished = time.time()
+        # main() prints its own run report when its output is shown; per-worker figures are in the orchestration report
+        run_lines = [] if args.verbose else [line for line in build_run_report(started) if not line.startswith('  Browser ')]
+        lines = run_lines + build_orchestration_report(started, finished)
+    finally:
+        os.chdir(cwd)
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    for line in lines:
+        print(f"{Fore.CYAN}{line}{Style.RESET_ALL}")
+    print(f"{Fore.CYAN}Latencies are scaled by {args.time_scale:g}; the fixed sleeps in the upload steps are not.{Style.RESET_ALL}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,315 @@
+import argparse
+import html
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+DEFAULT_CATEGORIES = ['PC (General)', 'Xbox 360', 'PlayStation 3', 'Game Saves', 'Emulators']
+TOKEN = 'fake-xf-token'
+SECURITY_ERROR = 'Security error occurred. Please press back, reload the page, and try again.'
+
+PAGE = """<!DOCTYPE html>
+<html data-logged-in="true"><head><meta charset="utf-8"><title>{title}</title>
+<style>
+.tagify__input {{ display: inline-block; min-width: 120px; min-height: 1.2em; border: 1px solid #999; }}
+.tagify__tag__removeBtn {{ cursor: pointer; }}
+.js-attachmentProgress {{ display: block; width: 200px; background: #eee; }}
+.js-attachmentProgress i {{ display: block; height: 4px; background: #36c; }}
+</style></head>
+<body>{body}</body></html>
+"""
+
+ADD_FORM = """
+<h1>Add download: {name}</h1>
+<form action="{action}" method="post" class="block js-addForm">
+<input type="hidden" name="_xfToken" value="{token}">
+<input type="hidden" name="attachment_hash" value="{hash}">
+<input type="hidden" name="attachment_hash_combined" value="{combined}">
+<input type="hidden" name="description_html" value="">
+<input type="hidden" name="tags" value="">
+<dl><dt>Title</dt><dd><input type="text" name="title"></dd></dl>
+<dl><dt>Tag line</dt><dd><input type="text" name="tag_line"></dd></dl>
+<dl><dt>Version</dt><dd><input type="text" name="version_string"></dd></dl>
+<div class="fr-box"><div class="fr-element fr-view" contenteditable="true"></div></div>
+<tags class="tagify"><span class="tagify__input" contenteditable="true"></span></tags>
+<ul class="attachUploadList"></ul>
+<a href="{upload_url}" class="button--icon--attach js-attachmentUpload">Attach files</a>
+<button type="submit" class="button--primary"><span>Save</span></button>
+</form>
+<input type="file" multiple hidden>
+<script>
+var form = document.querySelector('form.js-addForm');
+var tagInput = document.querySelector('span.tagify__input');
+function syncTags() {{
+    form.elements.tags.value = Array.from(document.querySelectorAll('.tagify__tag-text')).map(function (t) {{ return t.textContent; }}).join(', ');
+}}
+tagInput.addEventListener('keydown', function (e) {{
+    if (e.key !== 'Enter') return;
+    e.preventDefault();
+    var text = tagInput.textContent.trim();
+    if (!text) return;
+    var tag = document.createElement('tag');
+    tag.className = 'tagify__tag';
+    tag.innerHTML = '<x class="tagify__tag__removeBtn">&times;</x><div><span class="tagify__tag-text"></span></div>';
+    tag.querySelector('.tagify__tag-text').textContent = text;
+    tag.querySelector('x').addEventListener('click', function () {{ tag.remove(); syncTags(); }});
+    tagInput.parentNode.insertBefore(tag, tagInput);
+    tagInput.textContent = '';
+    syncTags();
+}});
+var fileInput = document.querySelector('input[type=file]');
+fileInput.addEventListener('change', function () {{ Array.from(fileInput.files).forEach(uploadFile); }});
+function uploadFile(file) {{
+    var row = document.createElement('li');
+    row.className = 'js-attachmentFile';
+    row.innerHTML = '<a class="file-info"></a><div class="js-attachmentProgress"><i style="width: 0%"></i></div><div class="js-attachmentError"></div>';
+    row.querySelector('.file-info').textContent = file.name;
+    document.querySelector('.attachUploadList').appendChild(row);
+    var data = new FormData();
+    data.append('upload', file);
+    data.append('_xfToken', form.elements._xfToken.value);
+    data.append('_xfResponseType', 'json');
+    var xhr = new XMLHttpRequest();
+    xhr.open('POST', document.querySelector('.js-attachmentUpload').getAttribute('href'));
+    xhr.upload.onprogress = function (e) {{
+        if (e.lengthComputable) row.querySelector('.js-attachmentProgress i').style.width = (100 * e.loaded / e.total) + '%';
+    }};
+    xhr.onload = function () {{
+        var response = {{}};
+        try {{ response = JSON.parse(xhr.responseText); }} catch (err) {{}}
+        if (response.attachment) {{
+            row.setAttribute('data-attachment-id', response.attachment.attachment_id);
+            row.querySelector('.file-info').setAttribute('href', response.attachment.link);
+            row.querySelector('.js-attachmentProgress').style.display = 'none';
+        }} else {{
+            row.querySelector('.js-attachmentError').textContent = (response.errors || ['Upload failed']).join(' ');
+        }}
+    }};
+    xhr.onerror = function () {{ row.querySelector('.js-attachmentError').textContent = 'Upload failed'; }};
+    xhr.send(data);
+}}
+form.addEventListener('submit', function () {{
+    form.elements.description_html.value = document.querySelector('.fr-element').innerHTML;
+    syncTags();
+}});
+</script>
+"""
+
+
+def _slug(name):
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+
+
+class FakeXenForo:
+    """A local stand-in for the XenForo download pages the uploader touches.
+
+    Serves the landing page, the category chooser overlay, add forms with tagify/Froala
+    stand-ins, the attachment upload endpoint and the save redirect, with configurable latency.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, categories=None, attach_latency=0.5, attach_per_mb=0.0, redirect_latency=0.2):
+        self.categories = {str(i + 1): name for i, name in enumerate(categories or DEFAULT_CATEGORIES)}
+        self.attach_latency = attach_latency
+        self.attach_per_mb = attach_per_mb
+        self.redirect_latency = redirect_latency
+        self.lock = threading.Lock()
+        self.token = TOKEN
+        self.throttled = 0
+        self.retry_after = None
+        self.attachments = {}
+        self.stats = {'form_views': 0, 'uploads': 0, 'upload_bytes': 0, 'saves': 0, 'rejected_saves': 0}
+        self.server = ThreadingHTTPServer((host, port), self._make_handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def add_path(self, cat_id):
+        return f'/downloads/categories/{_slug(self.categories[cat_id])}.{cat_id}/add'
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def rotate_token(self):
+        """Issue a new _xfToken, like XenForo does during long sessions; forms served before now go stale."""
+        with self.lock:
+            self.token = uuid.uuid4().hex
+
+    def throttle(self, count, retry_after=None):
+        """Answer the next count requests with 429, optionally with a Retry-After header."""
+        with self.lock:
+            self.throttled = count
+            self.retry_after = retry_after
+
+    def _take_throttle(self):
+        with self.lock:
+            if not self.throttled:
+                return None
+            self.throttled -= 1
+            return {'Retry-After': str(self.retry_after)} if self.retry_after is not None else {}
+
+    def _count(self, key, amount=1):
+        with self.lock:
+            self.stats[key] += amount
+
+    def _make_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, body, content_type='text/html; charset=utf-8', headers=None):
+                data = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _page(self, title, body, status=200):
+                self._send(status, PAGE.format(title=html.escape(title), body=body))
+
+            def _category_from_path(self, path):
+                match = re.match(r'^/downloads/categories/[a-z0-9-]*\.(\d+)/add/?$', path)
+                return match.group(1) if match and match.group(1) in fake.categories else None
+
+            def _throttle(self):
+                headers = fake._take_throttle()
+                if headers is None:
+                    return False
+                self._read_body()
+                self._send(429, PAGE.format(title='Too many requests', body='<h1>Too many requests</h1>'), headers=headers)
+                return True
+
+            def do_GET(self):
+                if self._throttle():
+                    return
+                path = urlsplit(self.path).path
+                if path in ('/', '/downloads', '/downloads/'):
+                    self._page('Downloads', '<h1>Downloads</h1><a href="/downloads/add" class="button">Upload File</a>')
+                elif path in ('/downloads/add', '/downloads/add/'):
+                    links = ''.join(
+                        f'<li><div class="fauxBlockLink"><a class="fauxBlockLink-blockLink" href="{fake.add_path(cat_id)}">{html.escape(name)}</a></div></li>'
+                        for cat_id, name in fake.categories.items())
+                    self._page('Choose category', f'<div class="overlay"><h2>Choose a category</h2><ul>{links}</ul></div>')
+                elif self._category_from_path(path):
+                    self._add_form(self._category_from_path(path))
+                elif re.match(r'^/downloads/[a-z0-9-]+\.\d+/?$', path):
+                    self._page('Download', '<h1>Download saved</h1>')
+                else:
+                    self._page('Not found', '<h1>Not found</h1>', 404)
+
+            def _add_form(self, cat_id):
+                fake._count('form_views')
+                attachment_hash = uuid.uuid4().hex
+                combined = json.dumps({'type': 'resource_version', 'context': {'resource_category_id': int(cat_id)}, 'hash': attachment_hash})
+                upload_url = f'/attachments/upload?type=resource_version&context[resource_category_id]={cat_id}&hash={attachment_hash}'
+                body = ADD_FORM.format(
+                    name=html.escape(fake.categories[cat_id]), action=fake.add_path(cat_id), token=fake.token,
+                    hash=attachment_hash, combined=html.escape(combined), upload_url=html.escape(upload_url))
+                self._page('Add download', body)
+
+            def _read_body(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                remaining = length
+                head = b''
+                while remaining > 0:
+                    chunk = self.rfile.read(min(remaining, 1024 * 1024))
+                    if not chunk:
+                        break
+                    if len(head) < 4096:
+                        head += chunk[:4096 - len(head)]
+                    remaining -= len(chunk)
+                return length, head
+
+            def do_POST(self):
+                if self._throttle():
+                    return
+                parts = urlsplit(self.path)
+                if parts.path == '/attachments/upload':
+                    self._upload(parse_qs(parts.query))
+                elif self._category_from_path(parts.path):
+                    self._save(self._category_from_path(parts.path))
+                else:
+                    self._page('Not found', '<h1>Not found</h1>', 404)
+
+            def _upload(self, query):
+                length, head = self._read_body()
+                time.sleep(fake.attach_latency + length / (1024 * 1024) * fake.attach_per_mb)
+                token = re.search(rb'name="_xfToken"\r\n\r\n([^\r]*)', head)
+                if not token or token.group(1).decode('utf-8', 'replace') != fake.token:
+                    self._send(400, json.dumps({'status': 'error', 'errors': [SECURITY_ERROR]}), 'application/json')
+                    return
+                if b'name="upload"' not in head:
+                    self._send(200, json.dumps({'errors': ['No file was uploaded.']}), 'application/json')
+                    return
+                match = re.search(rb'filename="([^"]*)"', head)
+                filename = match.group(1).decode('utf-8', 'replace') if match else 'upload.zip'
+                with fake.lock:
+                    fake.stats['uploads'] += 1
+                    fake.stats['upload_bytes'] += length
+                    attachment_id = fake.stats['uploads']
+                    fake.attachments.setdefault(query.get('hash', [''])[0], []).append(attachment_id)
+                attachment = {'attachment_id': attachment_id, 'filename': filename, 'link': f'/attachments/{attachment_id}/'}
+                self._send(200, json.dumps({'status': 'ok', 'attachment': attachment}), 'application/json')
+
+            def _save(self, cat_id):
+                length, head = self._read_body()
+                fields = {k: v[0] for k, v in parse_qs(head.decode('utf-8', 'replace')).items()}
+                with fake.lock:
+                    has_attachment = bool(fake.attachments.get(fields.get('attachment_hash', '')))
+                if fields.get('_xfToken') != fake.token:
+                    fake._count('rejected_saves')
+                    self._page('Error', f'<div class="blockMessage">{SECURITY_ERROR}</div>', 400)
+                    return
+                if not fields.get('title') or not has_attachment:
+                    # XenForo re-renders the form with an error instead of redirecting
+                    fake._count('rejected_saves')
+                    self._add_form(cat_id)
+                    return
+                time.sleep(fake.redirect_latency)
+                with fake.lock:
+                    fake.stats['saves'] += 1
+                    download_id = fake.stats['saves']
+                location = f"/downloads/{_slug(fields['title']) or 'download'}.{download_id}/"
+                self._send(303, '', headers={'Location': location})
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the XenForo download pages.")
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--attach-latency', type=float, default=0.5, help="Seconds every attachment upload takes")
+    parser.add_argument('--attach-per-mb', type=float, default=0.0, help="Extra seconds per MB uploaded")
+    parser.add_argument('--redirect-latency', type=float, default=0.2, help="Seconds before the save redirect")
+    args = parser.parse_args()
+    fake = FakeXenForo(port=args.port, attach_latency=args.attach_latency, attach_per_mb=args.attach_per_mb,
+                       redirect_latency=args.redirect_latency)
+    print(f"Fake XenForo listening on {fake.url}/downloads/ (Ctrl+C to stop)")
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fake.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
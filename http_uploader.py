@@ -0,0 +1,239 @@
+import glob
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlsplit, parse_qsl, urlencode, urlunsplit
+
+import requests
+
+from rate_limiter import THROTTLE_STATUSES, retry_after_seconds
+
+
+class HttpUploadError(Exception):
+    pass
+
+
+class LoggedOutError(HttpUploadError):
+    """The site served a page to a guest, so the account's cookies no longer log in."""
+
+
+class StaleTokenError(HttpUploadError):
+    """XenForo rejected the form's _xfToken, which it rotates during long sessions."""
+
+
+# XenForo marks the <html> element with data-logged-in
+LOGGED_IN_RE = re.compile(r'<html\b[^>]*\bdata-logged-in="(true|false)"', re.IGNORECASE)
+
+# XenForo's answer to a request whose _xfToken no longer matches the session
+SECURITY_ERROR = 'Security error occurred'
+
+
+def find_cookie_file(config):
+    """Return the cookie file to use, preferring cookies/{site}.json over the first file found, or None."""
+    cookie_files = sorted(glob.glob('cookies/*.json'))
+    preferred = os.path.join('cookies', f"{config.get('site', 'se7ensins')}.json")
+    if preferred in cookie_files:
+        return preferred
+    return cookie_files[0] if cookie_files else None
+
+
+def get_account_name(cookie_file):
+    # An account is known by its cookie file's name
+    return os.path.splitext(os.path.basename(cookie_file))[0] if cookie_file else None
+
+
+def get_login_state(html):
+    """'logged_in' or 'logged_out' from a XenForo page, or 'unknown' for anything else (e.g. a challenge)."""
+    match = LOGGED_IN_RE.search(html)
+    if not match:
+        return 'unknown'
+    return 'logged_in' if match.group(1).lower() == 'true' else 'logged_out'
+
+
+def load_cookies(config, cookie_file=None):
+    """Load the session cookies from cookie_file, or from cookies/{site}.json or the first file found."""
+    cookie_file = cookie_file or find_cookie_file(config)
+    if not cookie_file:
+        raise HttpUploadError("No cookie JSON file found in cookies/")
+    with open(cookie_file) as f:
+        return json.load(f)
+
+
+def make_session(config, cookies):
+    """Return a requests session that looks like the bot's browser and carries the exported cookies."""
+    session = requests.Session()
+    session.headers['User-Agent'] = config['user_agent']
+    for cookie in cookies:
+        session.cookies.set(cookie['name'], cookie['value'], domain=cookie.get('domain', ''), path=cookie.get('path', '/'))
+    return session
+
+
+class AddFormParser(HTMLParser):
+    """Pulls the save form action, its hidden fields and the attachment upload URL out of an add page."""
+
+    def __init__(self):
+        super().__init__()
+        self.action = None
+        self.fields = {}
+        self.upload_url = None
+        self._in_form = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = (attrs.get('class') or '').split()
+        if tag == 'form' and self.action is None and (attrs.get('action') or '').rstrip('/').endswith('/add'):
+            self.action = attrs['action']
+            self._in_form = True
+        elif tag == 'input' and self._in_form and attrs.get('type') == 'hidden' and attrs.get('name'):
+            self.fields[attrs['name']] = attrs.get('value') or ''
+        elif tag == 'a' and ('js-attachmentUpload' in classes or 'button--icon--attach' in classes) and attrs.get('href'):
+            self.upload_url = attrs['href']
+
+    def handle_endtag(self, tag):
+        if tag == 'form':
+            self._in_form = False
+
+
+class HttpUploader:
+    """Uploads zips through the XenForo add-download form with plain HTTP requests."""
+
+    def __init__(self, config, cookies, timeout=60, limiter=None, account=None):
+        self.config = config
+        self.timeout = timeout
+        # One cookie jar for every thread, so the session and its CSRF token stay the same everywhere
+        self.cookies = make_session(config, cookies).cookies
+        self.limiter = limiter
+        self.account = account
+        self._forms = {}
+        self._local = threading.local()
+
+    @property
+    def session(self):
+        # requests does not promise that a Session is thread-safe, so each upload thread gets its own
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = make_session(self.config, [])
+            session.cookies = self.cookies
+            self._local.session = session
+        return session
+
+    def _request(self, method, url, rewind=None, **kwargs):
+        """Send a request paced by the rate limiter, slowing down and retrying when the site answers 429 or 503."""
+        for attempt in range(3):
+            if self.limiter:
+                self.limiter.acquire(self.account)
+            if rewind is not None:
+                rewind.seek(0)
+            resp = self.session.request(method, url, **kwargs)
+            if resp.status_code not in THROTTLE_STATUSES:
+                break
+            pause = retry_after_seconds(resp)
+            # 503 usually means the whole site is struggling, 429 that this account is going too fast
+            if self.limiter and self.limiter.penalize(self.account, site_wide=resp.status_code == 503, pause=pause) is not None:
+                continue
+            # With rate limiting off nothing else holds the retry back, so wait like the browsers do
+            if attempt < 2:
+                time.sleep(pause or (attempt + 1) * 10)
+        if self.limiter and resp.status_code < 400:
+            self.limiter.succeeded(self.account)
+        return resp
+
+    def fetch_form(self, add_url):
+        """Fetch an add form once and cache its action, hidden fields and upload URL."""
+        if add_url in self._forms:
+            return self._forms[add_url]
+        resp = self._request('GET', add_url, timeout=self.timeout)
+        if get_login_state(resp.text) == 'logged_out':
+            raise LoggedOutError(f"Logged out at {add_url}{f' as {self.account}' if self.account else ''}")
+        if resp.status_code != 200:
+            raise HttpUploadError(f"Fetching {add_url} returned HTTP {resp.status_code}")
+        parser = AddFormParser()
+        parser.feed(resp.text)
+        if not parser.action or '_xfToken' not in parser.fields:
+            raise HttpUploadError(f"No add form with an _xfToken found at {add_url} (logged out or challenged?)")
+        if not parser.upload_url:
+            raise HttpUploadError(f"No attachment upload link found at {add_url}")
+        form = {
+            'add_url': resp.url,
+            'action': urljoin(resp.url, parser.action),
+            'fields': parser.fields,
+            'upload_url': urljoin(resp.url, parser.upload_url),
+        }
+        self._forms[add_url] = form
+        return form
+
+    def _with_hash(self, form, attachment_hash):
+        # Every upload gets its own attachment hash so concurrent uploads never share attachments
+        fields = dict(form['fields'])
+        fields['attachment_hash'] = attachment_hash
+        if fields.get('attachment_hash_combined'):
+            combined = json.loads(fields['attachment_hash_combined'])
+            combined['hash'] = attachment_hash
+            fields['attachment_hash_combined'] = json.dumps(combined)
+        parts = urlsplit(form['upload_url'])
+        query = [(k, attachment_hash if k == 'hash' else v) for k, v in parse_qsl(parts.query, keep_blank_values=True)]
+        upload_url = urlunsplit(parts._replace(query=urlencode(query)))
+        return fields, upload_url
+
+    def upload_attachment(self, upload_url, token, zip_path):
+        with open(zip_path, 'rb') as f:
+            resp = self._request(
+                'POST', upload_url, rewind=f,
+                data={'_xfToken': token, '_xfResponseType': 'json', '_xfWithData': '1'},
+                files={'upload': (os.path.basename(zip_path), f, 'application/zip')},
+                timeout=self.config.get('upload_wait_timeout', 180),
+            )
+        try:
+            data = resp.json()
+        except ValueError:
+            data = None
+        if data and SECURITY_ERROR in str(data.get('errors')):
+            raise StaleTokenError("The attachment upload was rejected with a security error")
+        if resp.status_code != 200:
+            raise HttpUploadError(f"Attachment upload returned HTTP {resp.status_code}")
+        if data is None:
+            raise HttpUploadError("Attachment upload did not return JSON")
+        if data.get('errors') or not data.get('attachment'):
+            raise HttpUploadError(f"Attachment upload rejected: {data.get('errors') or data}")
+        return data['attachment']
+
+    def upload_zip(self, add_url, zip_path, title, tagline, description, tags, on_step=None):
+        """Upload one zip and return the URL of the created download, fetching a fresh form once if its token went stale.
+
+        on_step(step) is called as the upload reaches 'form' (add form ready), 'attached' (file being
+        sent), 'uploaded' (attachment accepted) and 'submitted' (save sent, redirect not yet checked).
+        """
+        on_step = on_step or (lambda step: None)
+        try:
+            return self._upload_zip(add_url, zip_path, title, tagline, description, tags, on_step)
+        except StaleTokenError:
+            self._forms.pop(add_url, None)
+            return self._upload_zip(add_url, zip_path, title, tagline, description, tags, on_step)
+
+    def _upload_zip(self, add_url, zip_path, title, tagline, description, tags, on_step):
+        form = self.fetch_form(add_url)
+        fields, upload_url = self._with_hash(form, uuid.uuid4().hex)
+        on_step('form')
+        on_step('attached')
+        self.upload_attachment(upload_url, fields['_xfToken'], zip_path)
+        on_step('uploaded')
+        fields.update({
+            'title': title,
+            'tag_line': tagline,
+            'version_string': '1.0.0',
+            'description_html': description,
+            'tags': tags or '',
+        })
+        on_step('submitted')
+        resp = self._request('POST', form['action'], data=fields, timeout=self.timeout, allow_redirects=True)
+        if SECURITY_ERROR in resp.text:
+            raise StaleTokenError("Saving was rejected with a security error")
+        if resp.status_code != 200:
+            raise HttpUploadError(f"Saving returned HTTP {resp.status_code}")
+        if resp.url.rstrip('/') in (form['add_url'].rstrip('/'), form['action'].rstrip('/')):
+            raise HttpUploadError("Save did not redirect away from the add form")
+        return resp.url
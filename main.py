@@ -1,11 +1,9 @@
 import json
 import os
 import time
-import glob
 import traceback
-import zipfile
-import sqlite3
-import pyautogui
+import threading
+import contextlib
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
@@ -13,11 +11,25 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
-from selenium.common.exceptions import UnexpectedAlertPresentException
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import TimeoutException, UnexpectedAlertPresentException
 import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import queue
 from multiprocessing import Barrier
 from colorama import Fore, Style, init
+from http_uploader import HttpUploader, HttpUploadError, LoggedOutError, load_cookies
+from browser_session import block_resources, get_base_url, get_profile_account, get_profile_dir, get_session_state, clear_session_cookies, is_throttled, set_profile_account, wait_for_challenge, inject_cookies
+from progress_db import init_db, is_processed, mark_processed, filter_unprocessed, index_hashes, mark_queued, mark_started, mark_step, mark_failed, load_metadata, record_step_timing
+from preflight import run_preflight, scan_zip, shutdown_pool
+from scheduler import order_work
+from categories import find_category, get_category_catalogue, load_cached_categories, save_categories
+from watcher import watch_zips
+from routing import find_zips, route_zips
+from driver_cache import resolve_chromedriver
+from run_report import StepTimer, build_run_report
+from rate_limiter import RateLimiter
+from session_pool import SessionPool, check_cookie_file, list_cookie_files
+from simulated_driver import SimulatedDriver, simulated_sizes
 
 init()  # Initialize colorama
 
@@ -32,56 +44,36 @@ def print_progress(current, total):
     if current == total:
         print()  # Newline at end
 
-def process_single_zip(zip_path, driver, config, lock, tag_to_use, shared_processed, shared_total, shared_queue, shared_turn, num_browsers, selected_name):
+def process_single_zip(zip_path, driver, config, tag_to_use, shared_processed, shared_total, submit_slots, selected_href, next_zip_path=None, prefilled=False, next_href=None, worker_id=None, limiter=None, account=None):
     zip_path = os.path.abspath(zip_path)
+    worker = worker_id if worker_id is not None else 0
     print(f"{Fore.CYAN}Processing {zip_path}...{Style.RESET_ALL}")
+    mark_started(zip_path, worker)
     
-    # Calculate wait time based on file size
+    # Calculate upload timeout based on file size
     size_mb = os.path.getsize(zip_path) / (1024 * 1024)
-    wait_seconds = int(config.get('upload_wait_base', 30) + size_mb * config.get('upload_wait_per_mb', 0.75))
-    print(f"{Fore.CYAN}File size: {size_mb:.2f} MB, calculated wait time: {wait_seconds} seconds{Style.RESET_ALL}")
+    # Completion is detected from the page; this is only the give-up point
+    wait_seconds = int(max(config.get('upload_wait_timeout', 180), config.get('upload_wait_base', 30) + size_mb * config.get('upload_wait_per_mb', 0.75)))
+    print(f"{Fore.CYAN}File size: {size_mb:.2f} MB, upload timeout: {wait_seconds} seconds{Style.RESET_ALL}")
     
-    # Get description and tagline from README.md in zip
-    description, tagline = get_desc_and_tagline(zip_path)
-    print(f"{Fore.CYAN}Tagline: {tagline}{Style.RESET_ALL}")
-    print(f"{Fore.CYAN}Description: {description[:50]}...{Style.RESET_ALL}")  # Preview
-
-    # Fill title (use zip filename without extension)
-    print(f"{Fore.YELLOW}Step: Filling title...{Style.RESET_ALL}")
-    title = os.path.basename(zip_path).replace('.zip', '').replace('_', ' ')
-    title_input = WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.CSS_SELECTOR, "input[name='title']")))
-    highlight_element(driver, title_input)
-    driver.execute_script("arguments[0].value = arguments[1];", title_input, title)
-    print(f"{Fore.GREEN}Title filled: {title}{Style.RESET_ALL}")
-    if config.get('manual_mode', False):
-        input("Press Enter to continue after filling title...")
-
-    # Fill tag line
-    print(f"{Fore.YELLOW}Step: Filling tag line...{Style.RESET_ALL}")
-    tag_line_input = WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.CSS_SELECTOR, "input[name='tag_line']")))
-    highlight_element(driver, tag_line_input)
-    driver.execute_script("arguments[0].value = arguments[1];", tag_line_input, tagline)
-    print(f"{Fore.GREEN}Tag line filled.{Style.RESET_ALL}")
-    if config.get('manual_mode', False):
-        input("Press Enter to continue after filling tag line...")
-
-    # Fill version string
-    print(f"{Fore.YELLOW}Step: Filling version string...{Style.RESET_ALL}")
-    version_input = WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.CSS_SELECTOR, "input[name='version_string']")))
-    highlight_element(driver, version_input)
-    driver.execute_script("arguments[0].value = arguments[1];", version_input, "1.0.0")
-    print(f"{Fore.GREEN}Version set to 1.0.0.{Style.RESET_ALL}")
-    if config.get('manual_mode', False):
-        input("Press Enter to continue after filling version...")
-
-    # Fill description
-    print(f"{Fore.YELLOW}Step: Filling description...{Style.RESET_ALL}")
-    desc_div = WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.fr-element")))
-    highlight_element(driver, desc_div)
-    driver.execute_script("arguments[0].innerHTML = arguments[1];", desc_div, description)
-    print(f"{Fore.GREEN}Description filled.{Style.RESET_ALL}")
+    # Get title, description and tagline from the zip name and its README.md
+    values = get_form_values(zip_path)
+    print(f"{Fore.CYAN}Tagline: {values['tag_line']}{Style.RESET_ALL}")
+    print(f"{Fore.CYAN}Description: {values['description'][:50]}...{Style.RESET_ALL}")  # Preview
+
+    # Manual mode timings would mostly measure the user
+    timer = StepTimer(zip_path, worker, enabled=not config.get('manual_mode', False))
+    if prefilled:
+        print(f"{Fore.GREEN}Form fields already filled in the prepared tab.{Style.RESET_ALL}")
+    else:
+        print(f"{Fore.YELLOW}Step: Filling form fields...{Style.RESET_ALL}")
+        fill_form_fields(driver, config, values)
+        timer.lap('fill')
+        print(f"{Fore.GREEN}Form fields filled: {values['title']}{Style.RESET_ALL}")
     if config.get('manual_mode', False):
-        input("Press Enter to continue after filling description...")
+        input("Press Enter to continue after filling form fields...")
+
+    timer.restart()
 
     # Fill tags
     print(f"{Fore.YELLOW}Step: Filling tags...{Style.RESET_ALL}")
@@ -95,43 +87,46 @@ def process_single_zip(zip_path, driver, config, lock, tag_to_use, shared_proces
         except:
             pass
     tags_input = WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.CSS_SELECTOR, "span.tagify__input")))
-    highlight_element(driver, tags_input)
+    highlight_element(driver, tags_input, config)
     tags_input.send_keys(tags_text + Keys.ENTER)
     time.sleep(1)
     # Dismiss dropdown
     tags_input.send_keys(Keys.ESCAPE)
     print(f"{Fore.GREEN}Tags set to {tags_text}{Style.RESET_ALL}")
+    timer.lap('tags')
     if config.get('manual_mode', False):
         input("Press Enter to continue after filling tags...")
 
     # Attach files
     print(f"{Fore.YELLOW}Step: Attaching files...{Style.RESET_ALL}")
-    attach_button = WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.CSS_SELECTOR, "a.button--icon--attach")))
-    highlight_element(driver, attach_button)
-    main_window = driver.current_window_handle
-    driver.execute_script("arguments[0].click();", attach_button)
-    print(f"{Fore.GREEN}Attach files clicked.{Style.RESET_ALL}")
-
-    # Wait for file dialog and automate selection
-    time.sleep(5)  # Wait for dialog to open
-    pyautogui.write(zip_path)  # Write full path to filename field
-    pyautogui.press('enter')
-    print(f"{Fore.GREEN}File selected via dialog.{Style.RESET_ALL}")
+    attach_file(driver, zip_path)
+    print(f"{Fore.GREEN}File attached via file input.{Style.RESET_ALL}")
+    mark_step(zip_path, 'attached')
+    timer.lap('attach')
+
+    # Prepare the next zip's form in a second tab while this attachment uploads
+    prepared_tab = None
+    if next_zip_path is not None:
+        try:
+            prepared_tab = prepare_next_form(driver, config, next_href or selected_href, next_zip_path, limiter, account)
+            print(f"{Fore.GREEN}Next form prepared for {os.path.basename(next_zip_path)}.{Style.RESET_ALL}")
+        except Exception as e:
+            print(f"{Fore.YELLOW}Could not prepare the next form: {e}{Style.RESET_ALL}")
+        timer.lap('prepare_next')
 
     # Wait for upload completion
     print(f"{Fore.YELLOW}Step: Waiting for file upload to complete...{Style.RESET_ALL}")
-    WebDriverWait(driver, config.get('upload_wait_timeout', 180)).until(EC.presence_of_element_located((By.CSS_SELECTOR, "a.file-info")))
-    for i in range(wait_seconds, 0, -1):
-        print(f"{Fore.CYAN}Ensuring upload completion: {i} seconds remaining...{Style.RESET_ALL}")
-        time.sleep(1)
+    wait_for_upload(driver, wait_seconds)
     print(f"{Fore.GREEN}File uploaded.{Style.RESET_ALL}")
+    mark_step(zip_path, 'uploaded')
+    timer.lap('upload')
     if config.get('manual_mode', False):
         input("Press Enter to continue after upload completion...")
 
     # Find save button
     print(f"{Fore.YELLOW}Step: Finding save button...{Style.RESET_ALL}")
     save_button = WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.XPATH, "//button[.//span[text()='Save']]")))
-    highlight_element(driver, save_button)
+    highlight_element(driver, save_button, config)
     print(f"{Fore.GREEN}Save button found.{Style.RESET_ALL}")
     if config.get('manual_mode', False):
         input("Press Enter to continue after finding save button...")
@@ -139,15 +134,24 @@ def process_single_zip(zip_path, driver, config, lock, tag_to_use, shared_proces
     if config.get('auto_submit', False):
         print(f"{Fore.YELLOW}Step: Auto-submitting form...{Style.RESET_ALL}")
         submission_success = False
+        # Only a limited number of browsers may be saving at the same time
+        submit_slot = submit_slots if submit_slots is not None else contextlib.nullcontext()
         for attempt in range(3):
             try:
-                driver.execute_script("arguments[0].click();", save_button)
-                print(f"{Fore.GREEN}Form submitted automatically.{Style.RESET_ALL}")
-                WebDriverWait(driver, 30).until(lambda d: '/downloads/add' not in d.current_url)
+                if limiter:
+                    limiter.acquire(account)
+                with submit_slot:
+                    driver.execute_script("arguments[0].click();", save_button)
+                    print(f"{Fore.GREEN}Form submitted automatically.{Style.RESET_ALL}")
+                    mark_step(zip_path, 'submitted')
+                    WebDriverWait(driver, 30).until(lambda d: not d.current_url.rstrip('/').endswith('/add'))
                 print(f"{Fore.GREEN}Submission successful, page redirected.{Style.RESET_ALL}")
+                if limiter:
+                    limiter.succeeded(account)
                 time.sleep(2)
+                timer.lap('submit')
                 zip_path = os.path.relpath(zip_path)
-                mark_processed(zip_path)
+                mark_processed(zip_path, driver.current_url)
                 print(f"{Fore.GREEN}Marked {zip_path} as processed.{Style.RESET_ALL}")
                 if shared_processed is not None:
                     with shared_processed.get_lock():
@@ -160,9 +164,7 @@ def process_single_zip(zip_path, driver, config, lock, tag_to_use, shared_proces
                     alert = driver.switch_to.alert
                     alert.accept()
                     print(f"{Fore.YELLOW}Alert accepted, retrying submission.{Style.RESET_ALL}")
-                    wait_time = (attempt + 1) * 10
-                    print(f"{Fore.YELLOW}Waiting {wait_time} seconds before retry...{Style.RESET_ALL}")
-                    time.sleep(wait_time)
+                    slow_down(limiter, account, "an alert", (attempt + 1) * 10)
                     continue
                 except Exception as e:
                     print(f"{Fore.RED}Alert handling failed: {e}{Style.RESET_ALL}")
@@ -170,27 +172,29 @@ def process_single_zip(zip_path, driver, config, lock, tag_to_use, shared_proces
             except Exception as e:
                 print(f"{Fore.RED}Submission failed: {e}{Style.RESET_ALL}")
                 if attempt < 2:
-                    wait_time = (attempt + 1) * 10
-                    print(f"{Fore.YELLOW}Waiting {wait_time} seconds before retry...{Style.RESET_ALL}")
-                    time.sleep(wait_time)
+                    slow_down(limiter, account, "a failed submission", (attempt + 1) * 10)
                     continue
                 break
         if not submission_success:
             print(f"{Fore.RED}Submission failed after 3 attempts. Skipping this file.{Style.RESET_ALL}")
+            mark_failed(zip_path, 'Submission failed after 3 attempts')
     else:
-        highlight_element(driver, save_button)
+        highlight_element(driver, save_button, config)
         print(f"{Fore.CYAN}Form is ready. Press Enter in terminal to submit.{Style.RESET_ALL}")
         input()
+        timer.restart()
         driver.execute_script("arguments[0].click();", save_button)
         print(f"{Fore.GREEN}Form submitted manually.{Style.RESET_ALL}")
+        mark_step(zip_path, 'submitted')
         # Wait for successful submission
         try:
-            WebDriverWait(driver, 30).until(lambda d: '/downloads/add' not in d.current_url)
+            WebDriverWait(driver, 30).until(lambda d: not d.current_url.rstrip('/').endswith('/add'))
             print(f"{Fore.GREEN}Submission successful, page redirected.{Style.RESET_ALL}")
             time.sleep(2)
+            timer.lap('submit')
             # Mark as processed
             zip_path = os.path.relpath(zip_path)
-            mark_processed(zip_path)
+            mark_processed(zip_path, driver.current_url)
             print(f"{Fore.GREEN}Marked {zip_path} as processed.{Style.RESET_ALL}")
             if shared_processed is not None:
                 with shared_processed.get_lock():
@@ -199,156 +203,293 @@ def process_single_zip(zip_path, driver, config, lock, tag_to_use, shared_proces
         except Exception as e:
             print(f"{Fore.RED}Submission failed: {e}{Style.RESET_ALL}")
             print(f"{Fore.YELLOW}Not marking as processed.{Style.RESET_ALL}")
+            mark_failed(zip_path, e)
     
-    if not shared_queue:
-        print(f"{Fore.CYAN}Preparing for next upload...{Style.RESET_ALL}")
-        driver.get(config['url'])
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, "a.button--cta")))
-        
-        upload_button = driver.find_element(By.XPATH, "//a[@href='/downloads/add']")
-        highlight_element(driver, upload_button)
-        upload_button.click()
-        
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.overlay")))
-        
-        # Select same category
-        category_link = driver.find_element(By.LINK_TEXT, selected_name)
-        highlight_element(driver, category_link)
-        category_link.click()
-        
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.NAME, "title")))
+    return prepared_tab
+
+def move_to_next_form(driver, config, zip_path, prepared_tab, selected_href, worker_id=None, limiter=None, account=None):
+    """Leave the finished upload's page for the next add form; returns True when that form is already filled."""
+    if prepared_tab is not None:
+        # The finished tab is closed and the already filled one takes its place
+        driver.close()
+        driver.switch_to.window(prepared_tab)
+        return True
+    print(f"{Fore.CYAN}Preparing for next upload...{Style.RESET_ALL}")
+    timer = StepTimer(os.path.abspath(zip_path), worker_id if worker_id is not None else 0, enabled=not config.get('manual_mode', False))
+    open_upload_form(driver, config, selected_href, limiter, account)
+    timer.lap('navigate')
+    return False
+
+def get_form_values(zip_path):
+    # The pre-flight scan has normally cached this already, so the zip is not opened here
+    record = load_metadata(zip_path) or scan_zip(zip_path)
+    return {'title': record['title'], 'tag_line': record['tag_line'], 'version_string': '1.0.0', 'description': record['description']}
+
+def prepare_next_form(driver, config, selected_href, zip_path, limiter=None, account=None):
+    # Load and fill the next add form in a new tab, then hand control back to the current one
+    main_tab = driver.current_window_handle
+    driver.switch_to.new_window('tab')
+    prepared_tab = driver.current_window_handle
+    try:
+        block_resources(driver, config)
+        open_upload_form(driver, config, selected_href, limiter, account)
+        fill_form_fields(driver, config, get_form_values(os.path.abspath(zip_path)))
+    except Exception:
+        driver.close()
+        raise
+    finally:
+        driver.switch_to.window(main_tab)
+    return prepared_tab
+
+def close_extra_tabs(driver):
+    handles = driver.window_handles
+    for handle in handles[1:]:
+        driver.switch_to.window(handle)
+        driver.close()
+    driver.switch_to.window(handles[0])
+
+def fill_form_fields(driver, config, values):
+    # One injected script sets every text field; it returns the ones it could not find
+    highlight = not (config.get('fast_mode', False) and not config.get('manual_mode', False))
+    missing = driver.execute_script(FILL_FORM_JS, values, highlight)
+    if missing:
+        # The form or Froala may still be initialising, so give the remaining fields a moment
+        remaining = {key: values[key] for key in missing}
+        try:
+            WebDriverWait(driver, 10, poll_frequency=0.25).until(lambda d: not d.execute_script(FILL_FORM_JS, remaining, highlight))
+        except TimeoutException:
+            missing = driver.execute_script(FILL_FORM_JS, remaining, highlight)
+            raise Exception(f"Form fields not found: {', '.join(missing)}")
+    if highlight:
+        time.sleep(1)  # Wait for highlight to be visible
+
+def attach_file(driver, zip_path):
+    # Hand the path straight to the page's file input so no OS dialog is opened
+    file_input = WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='file']")))
+    try:
+        # flow.js keeps its input hidden, and send_keys needs it to be interactable
+        driver.execute_script("arguments[0].removeAttribute('hidden'); arguments[0].style.display = 'block'; arguments[0].style.visibility = 'visible';", file_input)
+        file_input.send_keys(zip_path)
+    except Exception:
+        doc = driver.execute_cdp_cmd('DOM.getDocument', {})
+        node = driver.execute_cdp_cmd('DOM.querySelector', {'nodeId': doc['root']['nodeId'], 'selector': "input[type='file']"})
+        driver.execute_cdp_cmd('DOM.setFileInputFiles', {'nodeId': node['nodeId'], 'files': [zip_path]})
+
+def wait_for_upload(driver, timeout):
+    # Poll the attachment row instead of sleeping a fixed time per MB
+    last_percent = None
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        state = driver.execute_script(UPLOAD_STATE_JS)
+        if state.get('error'):
+            raise Exception(f"Attachment upload failed: {state['error']}")
+        if state.get('done'):
+            return
+        if state.get('percent') is not None and state['percent'] != last_percent:
+            last_percent = state['percent']
+            print(f"{Fore.CYAN}Upload progress: {last_percent:.0f}%{Style.RESET_ALL}")
+        time.sleep(0.5)
+    raise TimeoutException(f"Upload did not finish within {timeout} seconds")
+
+def slow_down(limiter, account, reason, fallback_wait=0, site_wide=False):
+    """Tighten the shared rate limit after the site pushed back; with rate limiting off, just wait fallback_wait seconds."""
+    if limiter is not None and limiter.penalize(account, site_wide) is not None:
+        print(f"{Fore.YELLOW}Slowing down after {reason}: now {limiter.describe(account)}.{Style.RESET_ALL}")
+        return
+    if fallback_wait:
+        print(f"{Fore.YELLOW}Waiting {fallback_wait} seconds before retry...{Style.RESET_ALL}")
+        time.sleep(fallback_wait)
+
+def open_upload_form(driver, config, selected_href, limiter=None, account=None):
+    # The category's add URL opens the form directly, without the landing page or category modal
+    for attempt in range(3):
+        if limiter:
+            limiter.acquire(account)
+        driver.get(selected_href)
+        try:
+            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.NAME, "title")))
+        except TimeoutException:
+            # A challenge or rate limit page means slow down and try again; anything else is a real error
+            if limiter is None or attempt == 2:
+                raise
+            if get_session_state(driver) == 'challenge':
+                slow_down(limiter, account, "a challenge page", site_wide=True)
+            elif is_throttled(driver):
+                slow_down(limiter, account, "a rate limit page")
+            else:
+                raise
+            continue
+        if limiter:
+            limiter.succeeded(account)
         print(f"{Fore.GREEN}Ready for next zip.{Style.RESET_ALL}")
-    
-    if shared_queue:
-        with shared_turn.get_lock():
-            shared_turn.value = (shared_turn.value + 1) % num_browsers
+        return
+
 from colorama import Fore, Style
 
 def load_config():
     with open('config.json') as f:
         return json.load(f)
 
-def highlight_element(driver, element):
+FILL_FORM_JS = """
+var values = arguments[0], highlight = arguments[1], missing = [];
+var selectors = {
+    title: "input[name='title']",
+    tag_line: "input[name='tag_line']",
+    version_string: "input[name='version_string']",
+    description: "div.fr-element"
+};
+Object.keys(values).forEach(function (key) {
+    var el = document.querySelector(selectors[key]);
+    if (!el) { missing.push(key); return; }
+    if (el.isContentEditable) { el.innerHTML = values[key]; } else { el.value = values[key]; }
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    if (highlight) el.setAttribute('style', 'border: 3px solid red;');
+});
+return missing;
+"""
+
+UPLOAD_STATE_JS = """
+var rows = document.querySelectorAll('.js-attachmentFile');
+if (!rows.length) rows = Array.from(document.querySelectorAll('a.file-info')).map(function (a) { return a.closest('li') || a.parentNode; });
+if (!rows.length) return {found: false, done: false, percent: null, error: null};
+var row = rows[rows.length - 1];
+var error = row.querySelector('.js-attachmentError');
+if (error && error.textContent.trim()) return {found: true, done: false, percent: null, error: error.textContent.trim()};
+var percent = null;
+var progress = row.querySelector('.js-attachmentProgress');
+if (progress && progress.offsetParent !== null) {
+    var bar = progress.querySelector('i') || progress;
+    percent = parseFloat(bar.style.width || progress.getAttribute('aria-valuenow') || '0');
+}
+var link = row.querySelector('a.file-info');
+var uploaded = !!row.getAttribute('data-attachment-id') || !!(link && link.getAttribute('href'));
+return {found: true, done: uploaded && (percent === null || percent >= 100), percent: percent, error: null};
+"""
+
+def highlight_element(driver, element, config=None):
+    # Fast mode skips the highlight round trip and pause; manual mode always keeps them
+    if config and config.get('fast_mode', False) and not config.get('manual_mode', False):
+        return
     driver.execute_script("arguments[0].setAttribute('style', 'border: 3px solid red;');", element)
     time.sleep(1)  # Wait for highlight to be visible
 
-def get_desc_and_tagline(zip_path):
-    try:
-        with zipfile.ZipFile(zip_path) as zf:
-            readme_path = None
-            for name in zf.namelist():
-                if name.lower().endswith('readme.md'):
-                    readme_path = name
-                    break
-            base_name = os.path.basename(zip_path).replace('.zip', '').replace('_', ' ')
-            if not readme_path:
-                # Use filename (without .zip) when README is missing
-                return base_name, base_name
-            content = zf.read(readme_path).decode('utf-8', errors='ignore')
-            if not content or not content.strip():
-                # Use filename when README is empty
-                return base_name, base_name
-            tagline = content[:100].replace('\r\n', ' ').replace('\n', ' ').replace('\r', ' ')
-            # Remove leading "Description:" to save space
-            tagline = tagline.lstrip("Description:").lstrip("description:").strip()
-            if not tagline:
-                tagline = base_name
-            description = content[:200]  # Limit description to 200 characters
-            return description, tagline
-    except Exception as e:
-        return f"Error reading zip: {e}", "Error"
-
-def init_db():
-    conn = sqlite3.connect('progress.db')
-    c = conn.cursor()
-    c.execute('''CREATE TABLE IF NOT EXISTS processed_zips (zip_path TEXT PRIMARY KEY)''')
-    conn.commit()
-    conn.close()
-
-def is_processed(zip_path):
-    zip_path = os.path.normcase(zip_path)
-    conn = sqlite3.connect('progress.db')
-    c = conn.cursor()
-    c.execute('SELECT 1 FROM processed_zips WHERE zip_path = ?', (zip_path,))
-    result = c.fetchone()
-    conn.close()
-    return result is not None
-
-def mark_processed(zip_path):
-    zip_path = os.path.normcase(zip_path)
-    conn = sqlite3.connect('progress.db')
-    c = conn.cursor()
-    c.execute('INSERT OR IGNORE INTO processed_zips (zip_path) VALUES (?)', (zip_path,))
-    conn.commit()
-    conn.close()
-
-def run_browser(config, lock=None, zips=None, shared_processed=None, shared_total=None, barrier=None, turn_id=None, shared_turn=None, shared_queue=None, num_browsers=1):
-    if zips is None:
-        zip_files = glob.glob('zipsToUpload/*.zip')
-        zips = [z for z in zip_files if not is_processed(z)]
-    print(f"{Fore.CYAN}Processing {len(zips)} zips in this browser.{Style.RESET_ALL}")
-    
-    print(f"{Fore.CYAN}Starting browser...{Style.RESET_ALL}")
+def pass_cloudflare(driver, config):
+    """Wait for a Cloudflare challenge to clear, asking the user to solve it if it does not clear by itself."""
+    print(f"{Fore.CYAN}Cloudflare challenge detected, waiting for it to clear...{Style.RESET_ALL}")
+    state = wait_for_challenge(driver, config.get('cloudflare_wait', 15))
+    if state == 'challenge' and not config.get('skip_cloudflare', False):
+        print(f"{Fore.CYAN}Press Enter after bypassing Cloudflare.{Style.RESET_ALL}")
+        input()
+        state = get_session_state(driver)
+    return state
+
+def create_driver(config, worker_id=None):
     options = Options()
     options.add_argument(f"user-agent={config['user_agent']}")
     options.add_argument("--disable-blink-features=AutomationControlled")
     options.add_experimental_option("excludeSwitches", ["enable-automation"])
     options.add_experimental_option('useAutomationExtension', False)
-    # options.add_argument("--headless")  # Uncomment for headless mode if needed
+    if config.get('headless', False):
+        options.add_argument("--headless=new")
+    if config.get('reuse_profiles', True):
+        options.add_argument(f"--user-data-dir={get_profile_dir(config, worker_id or 0)}")
+    # Every wait below looks for the element it needs, so there is no point waiting for the full load event
+    options.page_load_strategy = config.get('page_load_strategy', 'eager')
 
     print(f"{Fore.CYAN}Creating Chrome driver...{Style.RESET_ALL}")
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    driver = webdriver.Chrome(service=Service(config.get('chromedriver_path')), options=options)
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    block_resources(driver, config)
     print(f"{Fore.GREEN}Driver created successfully.{Style.RESET_ALL}")
+    return driver
+
+def log_in(driver, config, target_url, pool, account, limiter, worker_id=None):
+    """Load an account's cookies into the browser, moving on to the next account while they turn out to be logged out; returns the account in use."""
+    while True:
+        if account is not None:
+            # The profile may hold another account's session; its Cloudflare clearance stays
+            clear_session_cookies(driver)
+        limiter.acquire(account)
+        state, added = inject_cookies(driver, config, target_url, pool.cookie_files.get(account))
+        print(f"{Fore.GREEN}Added {added} cookies to browser.{Style.RESET_ALL}")
+        if state == 'challenge':
+            state = pass_cloudflare(driver, config)
+        if state != 'logged_out':
+            set_profile_account(config, worker_id or 0, account)
+            return account
+        if account is None:
+            print(f"{Fore.RED}Still logged out after loading cookies; re-export them into cookies/.{Style.RESET_ALL}")
+            return account
+        print(f"{Fore.RED}Still logged out as {account}; re-export {pool.cookie_files[account]}. Switching accounts.{Style.RESET_ALL}")
+        pool.logged_out(account)
+        pool.release(account)
+        account = pool.assign()
+        if account is None:
+            raise HttpUploadError("No logged-in account left in cookies/")
+
+def switch_account(driver, config, target_url, pool, account, limiter, worker_id=None):
+    """Hand back an account that left the rotation and log in with the next ready one."""
+    print(f"{Fore.YELLOW}{pool.describe(account)}; switching accounts.{Style.RESET_ALL}")
+    pool.release(account)
+    account = pool.assign()
+    if account is None:
+        raise HttpUploadError("No usable account left in cookies/")
+    print(f"{Fore.CYAN}Logging in as {account}...{Style.RESET_ALL}")
+    return log_in(driver, config, target_url, pool, account, limiter, worker_id)
+
+def run_browser(config, zips=None, shared_processed=None, shared_total=None, barrier=None, worker_id=None, submit_slots=None, shared_queue=None, limiter=None, pool=None):
+    if shared_queue is not None:
+        print(f"{Fore.CYAN}Taking zips from the shared queue.{Style.RESET_ALL}")
+    else:
+        if zips is None:
+            zip_files = find_zips()
+            zips = filter_unprocessed(zip_files)
+        print(f"{Fore.CYAN}Processing {len(zips)} zips in this browser.{Style.RESET_ALL}")
+    
+    print(f"{Fore.CYAN}Starting browser...{Style.RESET_ALL}")
+    if config.get('driver_backend') == 'simulated':
+        # Dry run: same orchestration, but every browser action only takes simulated time
+        driver = SimulatedDriver(config, worker_id)
+        print(f"{Fore.GREEN}Simulated driver created.{Style.RESET_ALL}")
+    else:
+        driver = create_driver(config, worker_id)
+
+    # Every page load and save in every browser draws from the same site budget and from its account's budget
+    pool = pool or SessionPool(multiprocessing, config, list_cookie_files(config))
+    limiter = limiter or RateLimiter(multiprocessing, config, pool.accounts, pool)
+    account = pool.assign()
+    # A zip taken off the queue early for the second tab, until this browser gets to it
+    following = False
 
     try:
-        print(f"{Fore.CYAN}Navigating to se7ensins.com...{Style.RESET_ALL}")
-        # Navigate to the domain to add cookies
-        driver.get("https://www.se7ensins.com")
-        print(f"{Fore.GREEN}Navigated to se7ensins.com.{Style.RESET_ALL}")
-        
-        # Load cookies from any JSON file in cookies/
-        print(f"{Fore.CYAN}Loading cookies...{Style.RESET_ALL}")
-        cookie_files = glob.glob('cookies/*.json')
-        print(f"{Fore.CYAN}Found cookie files: {cookie_files}{Style.RESET_ALL}")
-        if not cookie_files:
-            print(f"{Fore.YELLOW}No cookie JSON file found in cookies/{Style.RESET_ALL}")
+        if pool.accounts and account is None:
+            print(f"{Fore.RED}No usable account left for this browser.{Style.RESET_ALL}")
             return
-        cookie_path = cookie_files[0]  # Use the first valid JSON file
-        with open(cookie_path) as f:
-            cookies = json.load(f)
-        print(f"{Fore.GREEN}Loaded {len(cookies)} cookies from {cookie_path}.{Style.RESET_ALL}")
-        
-        for cookie in cookies:
-            # Normalize cookie for Selenium
-            if 'sameSite' in cookie:
-                if cookie['sameSite'].lower() == 'lax':
-                    cookie['sameSite'] = 'Lax'
-                elif cookie['sameSite'].lower() == 'strict':
-                    cookie['sameSite'] = 'Strict'
-                elif cookie['sameSite'].lower() == 'none':
-                    cookie['sameSite'] = 'None'
-                else:
-                    # Remove invalid sameSite
-                    del cookie['sameSite']
-            driver.add_cookie(cookie)
-        print(f"{Fore.GREEN}Cookies added to browser.{Style.RESET_ALL}")
-        
-        # Navigate to the target URL
-        print(f"{Fore.CYAN}Navigating to {config['url']}...{Style.RESET_ALL}")
-        driver.get(config['url'])
-        print(f"{Fore.GREEN}Navigated to target URL.{Style.RESET_ALL}")
-        
-        # Wait for page to load
-        print(f"{Fore.CYAN}Waiting for page to load...{Style.RESET_ALL}")
+        # The profile keeps the session and Cloudflare clearance from earlier runs, so cookies are only loaded when needed
+        target_url = config.get('url') or get_base_url(config)
+        print(f"{Fore.CYAN}Navigating to {target_url}...{Style.RESET_ALL}")
+        limiter.acquire(account)
+        driver.get(target_url)
         WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.TAG_NAME, 'body')))
-        print(f"{Fore.GREEN}Page loaded successfully.{Style.RESET_ALL}")
-        
-        if not config.get('skip_cloudflare', False):
-            print(f"{Fore.CYAN}Page loaded. Press Enter after bypassing Cloudflare if needed.{Style.RESET_ALL}")
-            input()
+        state = get_session_state(driver)
+        if state == 'challenge':
+            slow_down(limiter, account, "a challenge page", site_wide=True)
+            state = pass_cloudflare(driver, config)
+        # Only reuse the profile's session if it belongs to this browser's account; unrecorded is fine with a single account
+        profile_account = get_profile_account(config, worker_id or 0)
+        if state == 'logged_in' and (account is None or profile_account == account or (profile_account is None and len(pool.accounts) == 1)):
+            print(f"{Fore.GREEN}Reusing the logged-in session from the browser profile.{Style.RESET_ALL}")
+            set_profile_account(config, worker_id or 0, account)
         else:
-            print(f"{Fore.CYAN}Skipping Cloudflare bypass prompt.{Style.RESET_ALL}")
+            print(f"{Fore.CYAN}Session not logged in{' as ' + account if account else ''}; loading cookies...{Style.RESET_ALL}")
+            try:
+                account = log_in(driver, config, target_url, pool, account, limiter, worker_id)
+            except HttpUploadError as e:
+                print(f"{Fore.YELLOW}{e}{Style.RESET_ALL}")
+                account = None  # Already handed back to the pool
+                return
+        WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.TAG_NAME, 'body')))
+        print(f"{Fore.GREEN}Page loaded successfully.{Style.RESET_ALL}")
         
         if barrier:
             print(f"{Fore.CYAN}Waiting for all browsers to be ready...{Style.RESET_ALL}")
@@ -359,146 +500,468 @@ def run_browser(config, lock=None, zips=None, shared_processed=None, shared_tota
                 print(f"{Fore.YELLOW}Barrier timeout or error: {e}. Proceeding without sync.{Style.RESET_ALL}")
                 print(f"{Fore.GREEN}All browsers ready. Starting processing.{Style.RESET_ALL}")
         
-        if shared_turn is not None and turn_id is not None:
-            print(f"{Fore.CYAN}Waiting for my turn ({turn_id})...{Style.RESET_ALL}")
-            while shared_turn.value != turn_id:
-                time.sleep(1)
-            print(f"{Fore.GREEN}My turn! Processing zips.{Style.RESET_ALL}")
+        tag_to_use = config.get('tag')
+        if not tag_to_use:
+            tag_to_use = input("Enter the tag to use for this session: ")
         
-        # Automation sequence
-        print(f"{Fore.CYAN}Finding Upload File button...{Style.RESET_ALL}")
-        upload_button = driver.find_element(By.XPATH, "//a[@href='/downloads/add']")
-        print(f"{Fore.GREEN}Upload button found.{Style.RESET_ALL}")
-        highlight_element(driver, upload_button)
-        print(f"{Fore.CYAN}Clicking Upload File button...{Style.RESET_ALL}")
-        upload_button.click()
-        print(f"{Fore.GREEN}Upload button clicked.{Style.RESET_ALL}")
+        # Go straight to the cached add form when the category is already known
+        categories_dict = load_cached_categories(config)
+        category = find_category(config, categories_dict)
+        if category:
+            selected_name = category['name']
+            selected_href = category['href']
+            print(f"{Fore.GREEN}Using cached category: {selected_name}{Style.RESET_ALL}")
+            open_upload_form(driver, config, selected_href, limiter, account)
+            print(f"{Fore.GREEN}Upload form loaded.{Style.RESET_ALL}")
+        else:
+            # Automation sequence
+            print(f"{Fore.CYAN}Finding Upload File button...{Style.RESET_ALL}")
+            upload_button = driver.find_element(By.XPATH, "//a[@href='/downloads/add']")
+            print(f"{Fore.GREEN}Upload button found.{Style.RESET_ALL}")
+            highlight_element(driver, upload_button, config)
+            print(f"{Fore.CYAN}Clicking Upload File button...{Style.RESET_ALL}")
+            upload_button.click()
+            print(f"{Fore.GREEN}Upload button clicked.{Style.RESET_ALL}")
         
-        # Wait for category modal
-        print(f"{Fore.CYAN}Waiting for category modal...{Style.RESET_ALL}")
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.overlay")))
-        print(f"{Fore.GREEN}Category modal appeared.{Style.RESET_ALL}")
+            # Wait for category modal
+            print(f"{Fore.CYAN}Waiting for category modal...{Style.RESET_ALL}")
+            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.overlay")))
+            print(f"{Fore.GREEN}Category modal appeared.{Style.RESET_ALL}")
         
-        # Parse categories
-        category_links = driver.find_elements(By.CSS_SELECTOR, "a.fauxBlockLink-blockLink")
-        categories = []
-        for link in category_links:
-            name = link.text.strip()
-            href = link.get_attribute("href")
-            if name and href:
-                categories.append((name, href))
+            # Parse categories
+            category_links = driver.find_elements(By.CSS_SELECTOR, "a.fauxBlockLink-blockLink")
+            categories = []
+            for link in category_links:
+                name = link.text.strip()
+                href = link.get_attribute("href")
+                if name and href:
+                    categories.append((name, href))
         
-        # Save to categories.json
-        categories_dict = {str(i+1): {'name': name, 'href': href} for i, (name, href) in enumerate(categories)}
-        with open('categories.json', 'w') as f:
-            json.dump(categories_dict, f, indent=4)
+            # Cache the scraped list for next time
+            categories_dict = save_categories(config, categories)
         
-        print(f"{Fore.CYAN}Available categories:{Style.RESET_ALL}")
-        for i, (name, href) in enumerate(categories, 1):
-            print(f"{Fore.CYAN}{i}. {name}{Style.RESET_ALL}")
+            print(f"{Fore.CYAN}Available categories:{Style.RESET_ALL}")
+            for i, (name, href) in enumerate(categories, 1):
+                print(f"{Fore.CYAN}{i}. {name}{Style.RESET_ALL}")
         
-        # Check if category_id is set in config
-        if config.get('category_id') is not None:
-            category_id = str(config['category_id'])
-            if category_id in categories_dict:
-                selected_name = categories_dict[category_id]['name']
-                selected_href = categories_dict[category_id]['href']
-                print(f"{Fore.GREEN}Auto-selecting category: {selected_name}{Style.RESET_ALL}")
+            # Check if category_id is set in config
+            if config.get('category_id') is not None or config.get('category_cat_id') is not None:
+                category = find_category(config, categories_dict)
+                if category:
+                    selected_name = category['name']
+                    selected_href = category['href']
+                    print(f"{Fore.GREEN}Auto-selecting category: {selected_name}{Style.RESET_ALL}")
+                else:
+                    print(f"{Fore.RED}Invalid category in config (category_id {config.get('category_id')}, category_cat_id {config.get('category_cat_id')}). Available: {list(categories_dict.keys())}{Style.RESET_ALL}")
+                    return
             else:
-                print(f"{Fore.RED}Invalid category_id {category_id} in config. Available: {list(categories_dict.keys())}{Style.RESET_ALL}")
-                return
-        else:
-            # Ask user to select
-            while True:
-                try:
-                    choice = int(input("Enter the number of the category to select: ")) - 1
-                    if 0 <= choice < len(categories):
-                        selected_name, selected_href = categories[choice]
-                        break
-                    else:
-                        print(f"{Fore.YELLOW}Invalid choice. Try again.{Style.RESET_ALL}")
-                except ValueError:
-                    print(f"{Fore.YELLOW}Please enter a number.{Style.RESET_ALL}")
+                # Ask user to select
+                while True:
+                    try:
+                        choice = int(input("Enter the number of the category to select: ")) - 1
+                        if 0 <= choice < len(categories):
+                            selected_name, selected_href = categories[choice]
+                            break
+                        else:
+                            print(f"{Fore.YELLOW}Invalid choice. Try again.{Style.RESET_ALL}")
+                    except ValueError:
+                        print(f"{Fore.YELLOW}Please enter a number.{Style.RESET_ALL}")
         
-        print(f"{Fore.CYAN}Selecting category: {selected_name}{Style.RESET_ALL}")
-        tag_to_use = config.get('tag')
-        if not tag_to_use:
-            tag_to_use = input("Enter the tag to use for this session: ")
-        # Find the link by link text
-        selected_link = driver.find_element(By.LINK_TEXT, selected_name)
-        highlight_element(driver, selected_link)
-        driver.execute_script("arguments[0].click();", selected_link)
-        print(f"{Fore.GREEN}Category selected.{Style.RESET_ALL}")
+            print(f"{Fore.CYAN}Selecting category: {selected_name}{Style.RESET_ALL}")
+            # Find the link by link text
+            selected_link = driver.find_element(By.LINK_TEXT, selected_name)
+            highlight_element(driver, selected_link, config)
+            driver.execute_script("arguments[0].click();", selected_link)
+            print(f"{Fore.GREEN}Category selected.{Style.RESET_ALL}")
         
-        # Wait for category modal to close
-        print(f"{Fore.CYAN}Waiting for category modal to close...{Style.RESET_ALL}")
-        WebDriverWait(driver, 10).until(EC.invisibility_of_element_located((By.CSS_SELECTOR, "div.overlay")))
-        print(f"{Fore.GREEN}Category modal closed.{Style.RESET_ALL}")
+            # Wait for category modal to close
+            print(f"{Fore.CYAN}Waiting for category modal to close...{Style.RESET_ALL}")
+            WebDriverWait(driver, 10).until(EC.invisibility_of_element_located((By.CSS_SELECTOR, "div.overlay")))
+            print(f"{Fore.GREEN}Category modal closed.{Style.RESET_ALL}")
         
-        # Wait for upload form
-        print(f"{Fore.CYAN}Waiting for upload form...{Style.RESET_ALL}")
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.NAME, "title")))
-        print(f"{Fore.GREEN}Upload form loaded.{Style.RESET_ALL}")
+            # Wait for upload form
+            print(f"{Fore.CYAN}Waiting for upload form...{Style.RESET_ALL}")
+            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.NAME, "title")))
+            print(f"{Fore.GREEN}Upload form loaded.{Style.RESET_ALL}")
         
         if shared_queue is not None:
-            while True:
-                if shared_turn.value == turn_id:
+            # Each browser pulls its next zip as soon as its own form is ready
+            def next_zip(block=True):
+                # None is the feeder's stop marker, False means nothing is waiting yet
+                waited_from = time.time()
+                started = time.perf_counter()
+                try:
+                    item = shared_queue.get(block=block)
+                except queue.Empty:
+                    return False
+                if item is not None and not config.get('manual_mode', False):
+                    # Time blocked on the shared queue shows up as queue_wait in the run report
+                    record_step_timing(item[0] if isinstance(item, tuple) else item, 'queue_wait', time.perf_counter() - started, worker_id if worker_id is not None else 0, waited_from)
+                return item
+        else:
+            zip_iter = iter(zips)
+            def next_zip(block=True):
+                return next(zip_iter, None)
+        
+        # When pipelining, the following zip is taken early so its form can be filled in a second tab
+        pipeline = config.get('pipeline_tabs', False) and not config.get('manual_mode', False)
+        # Queue items are (zip_path, add form URL); no URL means this browser's selected category
+        def split_item(item):
+            return item if isinstance(item, tuple) else (item, None)
+        
+        item = next_zip()
+        prefilled = False
+        form_href = selected_href  # The blank add form currently open
+        count = 0
+        while item is not None:
+            zip_path, href = split_item(item)
+            href = href or selected_href
+            # Only a zip that is already waiting gets pipelined, so an idle watch folder never holds up this one
+            following = next_zip(block=False) if pipeline else False
+            next_path, next_href = split_item(following) if following else (None, None)
+            count += 1
+            print(f"{Fore.CYAN}Processing #{count} in this browser: {os.path.basename(zip_path)}{Style.RESET_ALL}")
+            try:
+                if not prefilled and form_href != href:
+                    # Routed to another category, so switch add forms first
+                    open_upload_form(driver, config, href, limiter, account)
+                form_href = href
+                prepared_tab = process_single_zip(zip_path, driver, config, tag_to_use, shared_processed, shared_total, submit_slots, href, next_path, prefilled, next_href, worker_id, limiter, account)
+            except Exception as e:
+                print(f"{Fore.RED}Worker {worker_id} failed on {os.path.basename(zip_path)}: {e}{Style.RESET_ALL}")
+                mark_failed(zip_path, e)
+                traceback.print_exc()
+                close_extra_tabs(driver)
+                form_href = None
+                prefilled = False
+                try:
+                    if account is not None and get_session_state(driver) == 'logged_out':
+                        # The account's session ended; it is rotated out below
+                        pool.logged_out(account)
+                    else:
+                        open_upload_form(driver, config, href, limiter, account)
+                        form_href = href
+                except Exception as e:
+                    # The next zip retries opening its form; stopping here would strand the queue
+                    print(f"{Fore.YELLOW}Could not reopen the add form: {e}{Style.RESET_ALL}")
+            else:
+                # The zip is finished, so a page that will not load only costs this browser its next form
+                try:
+                    prefilled = move_to_next_form(driver, config, zip_path, prepared_tab, href, worker_id, limiter, account)
+                except Exception as e:
+                    print(f"{Fore.YELLOW}Could not open the next add form: {e}{Style.RESET_ALL}")
+                    close_extra_tabs(driver)
+                    form_href = None
+                    prefilled = False
+            if account is not None:
+                if is_processed(zip_path):
+                    pool.uploaded(account)
+                if not pool.usable(account):
+                    # Throttled too often, logged out or out of upload budget: carry on with another account
+                    close_extra_tabs(driver)
                     try:
-                        zip_path = shared_queue.get_nowait()
-                        process_single_zip(zip_path, driver, config, lock, tag_to_use, shared_processed, shared_total, shared_queue, shared_turn, num_browsers, selected_name)
-                    except:
+                        account = switch_account(driver, config, target_url, pool, account, limiter, worker_id)
+                    except HttpUploadError as e:
+                        print(f"{Fore.YELLOW}{e}{Style.RESET_ALL}")
+                        account = None  # Already handed back to the pool
                         break
-                else:
-                    time.sleep(1)
-        else:
-            for i, zip_path in enumerate(zips, 1):
-                print(f"{Fore.CYAN}Processing {i}/{len(zips)} : {os.path.basename(zip_path)}{Style.RESET_ALL}")
-                process_single_zip(zip_path, driver, config, lock, tag_to_use, shared_processed, shared_total, shared_queue, shared_turn, num_browsers, selected_name)
+                    form_href = None
+                    prefilled = False
+            item = following if following is not False else next_zip()
+            following = False
         
     except Exception as e:
         print(f"{Fore.RED}Error: {e}{Style.RESET_ALL}")
         print(f"{Fore.RED}Full traceback:{Style.RESET_ALL}")
         traceback.print_exc()
     finally:
+        # Whichever way this browser stops, another one uploads the zip it took early
+        if following and shared_queue is not None:
+            shared_queue.put(following)
+        pool.release(account)
         print(f"{Fore.CYAN}Closing browser...{Style.RESET_ALL}")
         driver.quit()
         print(f"{Fore.GREEN}Browser closed.{Style.RESET_ALL}")
 
+def run_http_uploads(config, zips, shared_processed=None, shared_total=None, limiter=None, pool=None):
+    """Upload zips with plain HTTP requests instead of driving Chrome."""
+    categories_dict = load_cached_categories(config)
+    category = find_category(config, categories_dict)
+    # Items are (zip_path, add form URL) pairs; routed zips carry their own category's URL
+    items = [z if isinstance(z, tuple) else (z, None) for z in zips]
+    if not category and any(href is None for _, href in items):
+        print(f"{Fore.RED}Invalid category in config (category_id {config.get('category_id')}, category_cat_id {config.get('category_cat_id')}). Available: {list(categories_dict.keys())}{Style.RESET_ALL}")
+        return
+    pool = pool or SessionPool(multiprocessing, config, list_cookie_files(config))
+    # One uploader (and cookie jar) per account; without accounts, load_cookies reports the missing cookie file
+    uploaders = {account: HttpUploader(config, load_cookies(config, pool.cookie_files[account]), limiter=limiter, account=account) for account in pool.accounts}
+    uploaders = uploaders or {None: HttpUploader(config, load_cookies(config), limiter=limiter)}
+    if category:
+        for account, uploader in uploaders.items():
+            try:
+                uploader.fetch_form(category['href'])
+            except LoggedOutError as e:
+                if account is None:
+                    raise
+                print(f"{Fore.YELLOW}{e}; leaving this account out.{Style.RESET_ALL}")
+                pool.logged_out(account)
+        print(f"{Fore.GREEN}Fetched add form for {category['name']}.{Style.RESET_ALL}")
+
+    def upload_one(item):
+        zip_path, href = item
+        mark_started(zip_path, 'http')
+        timer = StepTimer(zip_path, 'http')
+
+        def record_step(step):
+            # Same states and step timings as a browser upload: navigate, upload, submit
+            if step == 'form':
+                timer.lap('navigate')
+                return
+            mark_step(zip_path, step)
+            if step == 'uploaded':
+                timer.lap('upload')
+
+        try:
+            values = get_form_values(zip_path)
+            while True:
+                # Each upload takes the least busy ready account, so a throttled or logged-out one drops out on its own
+                account = pool.assign()
+                if account is None and pool.accounts:
+                    raise HttpUploadError("No usable account left in cookies/")
+                timer.restart()
+                try:
+                    remote_url = uploaders[account].upload_zip(href or category['href'], os.path.abspath(zip_path), values['title'], values['tag_line'], values['description'], config.get('tag'), record_step)
+                    break
+                except LoggedOutError as e:
+                    if account is None:
+                        raise
+                    print(f"{Fore.YELLOW}{e}; switching accounts.{Style.RESET_ALL}")
+                    pool.logged_out(account)
+                finally:
+                    pool.release(account)
+            pool.uploaded(account)
+            timer.lap('submit')
+        except Exception as e:
+            mark_failed(zip_path, e)
+            raise
+        return zip_path, remote_url
+
+    with ThreadPoolExecutor(max_workers=config.get('http_concurrency', 8)) as executor:
+        futures = [executor.submit(upload_one, item) for item in items]
+        for future in as_completed(futures):
+            try:
+                zip_path, remote_url = future.result()
+            except Exception as e:
+                print(f"{Fore.RED}HTTP upload failed: {e}{Style.RESET_ALL}")
+                continue
+            mark_processed(zip_path, remote_url)
+            print(f"{Fore.GREEN}Uploaded {zip_path} -> {remote_url}{Style.RESET_ALL}")
+            if shared_processed is not None:
+                with shared_processed.get_lock():
+                    shared_processed.value += 1
+                    print_progress(shared_processed.value, shared_total.value if shared_total else 0)
+
+def iter_ready_zips(config, zips, shared_total=None):
+    """Yield zips that passed the pre-flight scan, flagging corrupt archives as failed."""
+    for record in run_preflight(zips, config.get('preflight_workers')):
+        if record['ok']:
+            yield record['zip_path']
+            continue
+        print(f"{Fore.RED}Skipping corrupt zip {record['zip_path']}: {record['error']}{Style.RESET_ALL}")
+        mark_failed(record['zip_path'], record['error'])
+        if shared_total is not None:
+            with shared_total.get_lock():
+                shared_total.value -= 1
+
+def route_or_fail(config, zips, categories_dict):
+    """Assign each zip its category; zips whose sidecar or rule names no known category are marked failed."""
+    routes, errors, unknown_folders = route_zips(zips, config, categories_dict)
+    for folder in unknown_folders:
+        print(f"{Fore.YELLOW}Subfolder {os.path.basename(folder)} does not name a category; its zips use the rules or the configured category.{Style.RESET_ALL}")
+    for zip_path, error in errors.items():
+        print(f"{Fore.RED}Not uploading {os.path.basename(zip_path)}: {error}{Style.RESET_ALL}")
+        mark_failed(zip_path, error)
+    hrefs = {z: entry['href'] for z, entry in routes.items() if entry}
+    return [z for z in zips if z not in errors], hrefs
+
+def drop_duplicates(zips, hashes, shared_total=None, queued_hashes=None):
+    """Wait for the content hashes and leave out zips whose content was already uploaded or is queued twice."""
+    try:
+        digests = hashes.result()
+    except Exception as e:
+        # Uploading a duplicate is better than not uploading at all
+        print(f"{Fore.YELLOW}Could not hash the zips, skipping the duplicate check: {e}{Style.RESET_ALL}")
+        return zips
+    unique = filter_unprocessed(zips, digests, queued_hashes)
+    missing = sum(1 for z in zips if z not in digests)
+    if missing:
+        print(f"{Fore.YELLOW}Skipping {missing} zips that were moved or deleted before they could be hashed.{Style.RESET_ALL}")
+    if len(zips) - len(unique) > missing:
+        print(f"{Fore.YELLOW}Skipping {len(zips) - len(unique) - missing} zips whose content was already uploaded or is queued twice.{Style.RESET_ALL}")
+    if shared_total is not None and len(unique) < len(zips):
+        with shared_total.get_lock():
+            shared_total.value -= len(zips) - len(unique)
+    return unique
+
+def feed_queue(config, zips, shared_queue, num_workers, shared_total=None, known=(), stop_event=None, hrefs=None, hashes=None):
+    # Runs alongside the browsers so they can start on the first clean zips right away
+    hrefs = hrefs or {}
+    # Content hashes queued so far, so watch mode does not queue a copy of a zip that is still waiting or uploading
+    queued_hashes = set()
+    try:
+        if hashes is not None:
+            zips = drop_duplicates(zips, hashes, shared_total, queued_hashes)
+        for zip_path in iter_ready_zips(config, zips, shared_total):
+            shared_queue.put((zip_path, hrefs.get(zip_path)))
+        if config.get('watch_folder', False):
+            watch_queue(config, shared_queue, shared_total, known, stop_event, queued_hashes)
+    finally:
+        for _ in range(num_workers):
+            shared_queue.put(None)
+
+def report_category_refresh(categories_dict, error):
+    if error:
+        print(f"{Fore.YELLOW}Category refresh failed, keeping the cached list: {error}{Style.RESET_ALL}")
+    else:
+        print(f"{Fore.GREEN}Refreshed {len(categories_dict)} categories.{Style.RESET_ALL}")
+
+def watch_queue(config, shared_queue, shared_total, known=(), stop_event=None, queued_hashes=None):
+    """Keep feeding zips dropped into zipsToUpload/ to the running browsers until stopped."""
+    print(f"{Fore.CYAN}Watching zipsToUpload/ for new zips...{Style.RESET_ALL}")
+    for zip_path in watch_zips('zipsToUpload', known, config.get('watch_settle_seconds', 5), config.get('watch_poll_interval', 2), stop_event):
+        # One bad file must not stop the feeder, or every browser would be sent home
+        try:
+            hashes = index_hashes([zip_path], 1)
+            if zip_path not in hashes:
+                print(f"{Fore.YELLOW}Skipping {os.path.basename(zip_path)}: it was moved or deleted before it could be hashed.{Style.RESET_ALL}")
+                continue
+            new_zips = filter_unprocessed([zip_path], hashes, queued_hashes)
+            if not new_zips:
+                print(f"{Fore.YELLOW}Skipping {os.path.basename(zip_path)}: already uploaded or queued.{Style.RESET_ALL}")
+                continue
+            new_zips, hrefs = route_or_fail(config, new_zips, load_cached_categories(config))
+            if not new_zips:
+                continue
+            mark_queued(new_zips)
+            if shared_total is not None:
+                with shared_total.get_lock():
+                    shared_total.value += 1
+            print(f"{Fore.CYAN}New zip: {os.path.basename(zip_path)}{Style.RESET_ALL}")
+            for ready in iter_ready_zips(config, new_zips, shared_total):
+                shared_queue.put((ready, hrefs.get(ready)))
+        except Exception as e:
+            print(f"{Fore.RED}Could not queue {os.path.basename(zip_path)}: {e}{Style.RESET_ALL}")
+
+def get_mp_context():
+    # Forking this process copies SQLite's lock state mid-write from the feeder thread, which can
+    # deadlock a browser's first database call. A fork server is started clean and still shares the
+    # imported modules with every browser; Windows has no fork server and always spawns anyway.
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context('forkserver')
+        ctx.set_forkserver_preload(['main'])
+        return ctx
+    return multiprocessing.get_context('spawn')
+
+def build_session_pool(ctx, config):
+    """Pool every cookie file in cookies/ that still logs in; None when there are cookie files but none of them does."""
+    cookie_files = list_cookie_files(config)
+    if cookie_files and config.get('validate_accounts', True) and config.get('driver_backend') != 'simulated':
+        url = config.get('url') or get_base_url(config)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            states = dict(zip(cookie_files, executor.map(lambda cookie_file: check_cookie_file(config, cookie_file, url), cookie_files)))
+        for cookie_file, state in states.items():
+            print(f"{Fore.CYAN}Account {cookie_file}: {state.replace('_', ' ')}{Style.RESET_ALL}")
+        # A challenge hides the login state from plain HTTP; the browsers find out for themselves
+        cookie_files = [cookie_file for cookie_file, state in states.items() if state in ('logged_in', 'unknown')]
+        if not cookie_files:
+            print(f"{Fore.RED}None of the cookie files in cookies/ logs in; re-export them.{Style.RESET_ALL}")
+            return None
+    return SessionPool(ctx, config, cookie_files)
+
+def report_run(since, pool=None):
+    for line in build_run_report(since):
+        print(f"{Fore.CYAN}{line}{Style.RESET_ALL}")
+    if pool is not None and pool.accounts:
+        print(f"{Fore.CYAN}Accounts:{Style.RESET_ALL}")
+        for account in pool.accounts:
+            print(f"{Fore.CYAN}  {pool.describe(account)}{Style.RESET_ALL}")
+
 def main():
     config = load_config()
     init_db()
+    run_started = time.time()
+    # Set up the fork server before anything can start it, so its preload applies to the pre-flight pool too
+    ctx = get_mp_context()
     num_browsers = config.get('num_browsers', 1)
+    upload_engine = config.get('upload_engine', 'selenium')
     
-    # Pre-install ChromeDriver to avoid conflicts in multiprocessing
-    ChromeDriverManager().install()
+    # Resolve ChromeDriver once here; the browser processes get the path through config
+    if upload_engine != 'http' and config.get('driver_backend') != 'simulated':
+        config['chromedriver_path'] = resolve_chromedriver(config)
+        print(f"{Fore.CYAN}Using ChromeDriver: {config['chromedriver_path'] or 'located by Selenium'}{Style.RESET_ALL}")
     
-    all_zips = [z for z in glob.glob('zipsToUpload/*.zip') if not is_processed(z)]
-    if not all_zips:
+    # One level of subfolders is allowed; a subfolder's name picks the category for its zips
+    zip_files = find_zips()
+    # Paths already uploaded are skipped right away. Content hashes, which catch zips renamed, moved or
+    # copied after being uploaded, are computed in the background and checked before the queue is fed.
+    all_zips = filter_unprocessed(zip_files)
+    hashing = ThreadPoolExecutor(max_workers=1)
+    hashes = hashing.submit(index_hashes, zip_files, config.get('hash_workers', 4))
+    hashing.shutdown(wait=False)
+    watching = config.get('watch_folder', False) and upload_engine != 'http'
+    if not all_zips and not watching:
         print(f"{Fore.YELLOW}No zips to process.{Style.RESET_ALL}")
         return
-    shared_total = multiprocessing.Value('i', len(all_zips))
-    shared_processed = multiprocessing.Value('i', 0)
-    shared_turn = multiprocessing.Value('i', 0)
+    # Stale category caches refresh in the background; browsers only scrape the modal if there is no cache at all
+    categories_dict = get_category_catalogue(config, report_category_refresh)
+    all_zips, hrefs = route_or_fail(config, all_zips, categories_dict)
+    if hrefs:
+        print(f"{Fore.CYAN}Routed {len(hrefs)} zips to {len(set(hrefs.values()))} categories; the rest use the configured category.{Style.RESET_ALL}")
+    mark_queued(all_zips)
+    num_workers = config.get('http_concurrency', 8) if upload_engine == 'http' else num_browsers
+    all_zips, predicted, baseline = order_work(all_zips, config, num_workers, sizes=simulated_sizes(config, all_zips), groups=hrefs)
+    print(f"{Fore.CYAN}Scheduled {len(all_zips)} zips ({config.get('schedule', 'largest_first')}) over {num_workers} workers: predicted makespan {predicted / 60:.1f} min (folder order: {baseline / 60:.1f} min){Style.RESET_ALL}")
+    # Every cookie file is an account; all workers share the site budget and each account has its own
+    pool = build_session_pool(ctx, config)
+    if pool is None:
+        return
+    limiter = RateLimiter(ctx, config, pool.accounts, pool)
+    shared_total = ctx.Value('i', len(all_zips))
+    shared_processed = ctx.Value('i', 0)
+    
+    if upload_engine == 'http':
+        if config.get('watch_folder', False):
+            print(f"{Fore.YELLOW}watch_folder only applies to the selenium engine; uploading the current folder once.{Style.RESET_ALL}")
+        run_http_uploads(config, [(z, hrefs.get(z)) for z in iter_ready_zips(config, drop_duplicates(all_zips, hashes, shared_total), shared_total)], shared_processed, shared_total, limiter, pool)
+        shutdown_pool()
+        report_run(run_started, pool)
+        return
     
+    # The pre-flight scan feeds the queue while the browsers start up
+    watch_stop = threading.Event()
+    shared_queue = ctx.Queue() if num_browsers > 1 else queue.Queue()
+    feeder = threading.Thread(target=feed_queue, args=(config, all_zips, shared_queue, num_browsers, shared_total, zip_files, watch_stop, hrefs, hashes), daemon=True)
+    feeder.start()
     if num_browsers == 1:
-        run_browser(config, None, all_zips, shared_processed, shared_total, None, None, None, None, num_browsers)
+        run_browser(config, None, shared_processed, shared_total, None, None, None, shared_queue, limiter, pool)
     else:
-        shared_queue = multiprocessing.Queue()
-        for z in all_zips:
-            shared_queue.put(z)
-        lock = multiprocessing.Lock()
-        barrier = multiprocessing.Barrier(num_browsers)
+        # Caps how many browsers may be in the save/redirect step at once
+        max_concurrent_submits = max(1, min(num_browsers, config.get('max_concurrent_submits', num_browsers)))
+        submit_slots = ctx.BoundedSemaphore(max_concurrent_submits)
+        barrier = ctx.Barrier(num_browsers)
         processes = []
+        # No fixed pause between launches: each browser's first page load waits for the shared rate limiter instead
         for i in range(num_browsers):
-            p = multiprocessing.Process(target=run_browser, args=(config, lock, None, shared_processed, shared_total, barrier, i, shared_turn, shared_queue, num_browsers))
+            p = ctx.Process(target=run_browser, args=(config, None, shared_processed, shared_total, barrier, i, submit_slots, shared_queue, limiter, pool))
             p.start()
             processes.append(p)
-            if i < num_browsers - 1:
-                print(f"{Fore.YELLOW}waiting 10 seconds between browser windows to avoid pissing off Cloudflare...{Style.RESET_ALL}")
-                time.sleep(10)
         
         for p in processes:
             p.join()
+    # Every browser has exited, so there is nobody left to feed
+    watch_stop.set()
+    shutdown_pool()
+    report_run(run_started, pool)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
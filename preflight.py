@@ -0,0 +1,99 @@
+import multiprocessing
+import os
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from progress_db import load_metadata_many, save_metadata
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_desc_and_tagline(zip_path):
+    try:
+        with zipfile.ZipFile(zip_path) as zf:
+            readme_path = None
+            for name in zf.namelist():
+                if name.lower().endswith('readme.md'):
+                    readme_path = name
+                    break
+            base_name = os.path.basename(zip_path).replace('.zip', '').replace('_', ' ')
+            if not readme_path:
+                # Use filename (without .zip) when README is missing
+                return base_name, base_name
+            content = zf.read(readme_path).decode('utf-8', errors='ignore')
+            if not content or not content.strip():
+                # Use filename when README is empty
+                return base_name, base_name
+            tagline = content[:100].replace('\r\n', ' ').replace('\n', ' ').replace('\r', ' ')
+            # Remove leading "Description:" to save space
+            tagline = tagline.lstrip("Description:").lstrip("description:").strip()
+            if not tagline:
+                tagline = base_name
+            description = content[:200]  # Limit description to 200 characters
+            return description, tagline
+    except Exception as e:
+        return f"Error reading zip: {e}", "Error"
+
+
+def scan_zip(zip_path):
+    """Check a zip's integrity and extract everything the upload form needs from it."""
+    record = {
+        'zip_path': zip_path,
+        'size': os.path.getsize(zip_path),
+        'title': os.path.basename(zip_path).replace('.zip', '').replace('_', ' '),
+        'ok': True,
+        'error': None,
+    }
+    try:
+        with zipfile.ZipFile(zip_path) as zf:
+            bad_member = zf.testzip()
+        if bad_member is not None:
+            record.update(ok=False, error=f"CRC check failed for {bad_member}")
+    except (zipfile.BadZipFile, OSError) as e:
+        record.update(ok=False, error=f"Corrupt archive: {e}")
+    if record['ok']:
+        record['description'], record['tag_line'] = get_desc_and_tagline(zip_path)
+    else:
+        record['description'], record['tag_line'] = '', ''
+    return record
+
+
+def get_pool(workers=None):
+    """Return this process's scan pool, starting it on first use; it is kept for the rest of the run."""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            # The pool starts while the feeder and browser threads run, and forking a threaded process
+            # can copy a held lock into the child and deadlock it; fork server and spawned workers start clean
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.shutdown()
+        _pool = None
+
+
+def run_preflight(zip_paths, workers=None):
+    """Yield a metadata record for every zip in order, scanning uncached ones in the process pool."""
+    records = load_metadata_many(zip_paths)
+    missing = [z for z, record in records.items() if record is None]
+    if not missing:
+        for z in zip_paths:
+            yield records[z]
+        return
+    scanned = get_pool(workers).map(scan_zip, missing, chunksize=4)
+    for z in zip_paths:
+        record = records[z]
+        if record is None:
+            record = next(scanned)
+            save_metadata(record)
+        yield record
@@ -0,0 +1,325 @@
+import contextlib
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DB_PATH = 'progress.db'
+SCHEMA_VERSION = 3
+HASH_CHUNK_SIZE = 1024 * 1024
+SQL_VARIABLE_BATCH = 900
+
+# pending -> in_progress -> uploaded (attachment done) -> submitted (saved, redirect unconfirmed) -> done
+# Any of them can end in failed; the next attempt starts again from in_progress.
+STEP_COLUMNS = {
+    'attached': ('attached_at', 'in_progress'),
+    'uploaded': ('uploaded_at', 'uploaded'),
+    'submitted': ('submitted_at', 'submitted'),
+}
+
+_conn = None
+_conn_pid = None
+_lock = threading.RLock()
+
+
+def get_connection():
+    """Return this process's long-lived connection, opening it on first use (and again after a fork)."""
+    global _conn, _conn_pid
+    with _lock:
+        if _conn is None or _conn_pid != os.getpid():
+            _conn = sqlite3.connect(DB_PATH, timeout=30, check_same_thread=False, isolation_level=None)
+            # WAL lets several browser processes write while others read
+            _conn.execute('PRAGMA journal_mode=WAL')
+            _conn.execute('PRAGMA synchronous=NORMAL')
+            _conn.execute('PRAGMA busy_timeout=30000')
+            _conn_pid = os.getpid()
+        return _conn
+
+
+@contextlib.contextmanager
+def _transaction(conn):
+    conn.execute('BEGIN')
+    try:
+        yield conn
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
+    conn.execute('COMMIT')
+
+
+def _key(zip_path):
+    return os.path.normcase(os.path.relpath(zip_path))
+
+
+def init_db():
+    with _lock:
+        conn = get_connection()
+        conn.execute('''CREATE TABLE IF NOT EXISTS uploads (
+            zip_path TEXT PRIMARY KEY,
+            state TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT,
+            bytes INTEGER,
+            queued_at REAL,
+            started_at REAL,
+            attached_at REAL,
+            uploaded_at REAL,
+            submitted_at REAL,
+            finished_at REAL,
+            remote_url TEXT
+        )''')
+        conn.execute('CREATE INDEX IF NOT EXISTS uploads_state ON uploads (state)')
+        conn.execute('''CREATE TABLE IF NOT EXISTS file_hashes (
+            zip_path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            hash TEXT NOT NULL
+        )''')
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        if version < 1:
+            _migrate_processed_zips(conn)
+        if version < 2 and 'content_hash' not in [row[1] for row in conn.execute('PRAGMA table_info(uploads)')]:
+            conn.execute('ALTER TABLE uploads ADD COLUMN content_hash TEXT')
+        conn.execute('CREATE INDEX IF NOT EXISTS uploads_content_hash ON uploads (content_hash)')
+        conn.execute('''CREATE TABLE IF NOT EXISTS zip_metadata (
+            zip_path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            ok INTEGER NOT NULL,
+            error TEXT,
+            title TEXT,
+            tag_line TEXT,
+            description TEXT
+        )''')
+        if version < 3 and 'worker' not in [row[1] for row in conn.execute('PRAGMA table_info(uploads)')]:
+            conn.execute('ALTER TABLE uploads ADD COLUMN worker TEXT')
+        conn.execute('''CREATE TABLE IF NOT EXISTS step_timings (
+            id INTEGER PRIMARY KEY,
+            zip_path TEXT NOT NULL,
+            worker TEXT,
+            step TEXT NOT NULL,
+            started_at REAL NOT NULL,
+            seconds REAL NOT NULL
+        )''')
+        conn.execute('CREATE INDEX IF NOT EXISTS step_timings_started_at ON step_timings (started_at)')
+        if version < SCHEMA_VERSION:
+            conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+
+def _migrate_processed_zips(conn):
+    # Older databases only had a list of finished paths
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'processed_zips'").fetchone():
+        return
+    with _transaction(conn):
+        conn.execute("INSERT OR IGNORE INTO uploads (zip_path, state, attempts) SELECT zip_path, 'done', 1 FROM processed_zips")
+        conn.execute('DROP TABLE processed_zips')
+
+
+def is_processed(zip_path):
+    with _lock:
+        row = get_connection().execute("SELECT 1 FROM uploads WHERE zip_path = ? AND state = 'done'", (_key(zip_path),)).fetchone()
+    return row is not None
+
+
+def hash_file(zip_path):
+    digest = hashlib.blake2b(digest_size=20)
+    with open(zip_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _hash_if_present(zip_path):
+    try:
+        return hash_file(zip_path)
+    except FileNotFoundError:
+        return None
+
+
+def index_hashes(zip_paths, workers=4):
+    """Return {zip_path: content hash}, only hashing files whose size or mtime changed since last time.
+
+    Zips that are renamed or deleted before they can be hashed (e.g. while still being copied in) are left out.
+    """
+    stats = {}
+    for z in zip_paths:
+        try:
+            stats[z] = os.stat(z)
+        except FileNotFoundError:
+            continue
+    with _lock:
+        cached = {row[0]: row[1:] for row in get_connection().execute('SELECT zip_path, size, mtime_ns, hash FROM file_hashes')}
+    hashes = {}
+    stale = []
+    for z, st in stats.items():
+        entry = cached.get(_key(z))
+        if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+            hashes[z] = entry[2]
+        else:
+            stale.append(z)
+    if stale:
+        # hashlib releases the GIL, so a thread pool hashes files in parallel
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for z, digest in zip(stale, executor.map(_hash_if_present, stale)):
+                if digest is not None:
+                    hashes[z] = digest
+        rows = [(_key(z), stats[z].st_size, stats[z].st_mtime_ns, hashes[z]) for z in stale if z in hashes]
+        with _lock:
+            with _transaction(get_connection()) as conn:
+                conn.executemany('INSERT OR REPLACE INTO file_hashes (zip_path, size, mtime_ns, hash) VALUES (?, ?, ?, ?)', rows)
+    with _lock:
+        # Uploads recorded before hashing existed pick up their hash from the index
+        get_connection().execute('''UPDATE uploads SET content_hash = (SELECT hash FROM file_hashes WHERE file_hashes.zip_path = uploads.zip_path)
+            WHERE content_hash IS NULL''')
+    return hashes
+
+
+def filter_unprocessed(zip_paths, hashes=None, queued_hashes=None):
+    """Return the zips that have not been uploaded yet, using one query for the whole folder.
+
+    With hashes from index_hashes(), zips whose content was already uploaded under another
+    name are skipped too, as are repeat copies within the batch and zips index_hashes() could
+    not hash. queued_hashes is the set of hashes queued earlier in this run; it is checked and
+    grows with every zip returned, so a copy of a queued or in-progress zip is not queued again.
+    """
+    with _lock:
+        rows = get_connection().execute("SELECT zip_path, content_hash FROM uploads WHERE state = 'done'").fetchall()
+    processed = {row[0] for row in rows}
+    seen_hashes = {row[1] for row in rows if row[1]}
+    if queued_hashes is None:
+        queued_hashes = set()
+    pending = []
+    for z in zip_paths:
+        if _key(z) in processed:
+            continue
+        if hashes is not None:
+            digest = hashes.get(z)
+            if digest is None or digest in seen_hashes or digest in queued_hashes:
+                continue
+            queued_hashes.add(digest)
+        pending.append(z)
+    return pending
+
+
+def mark_queued(zip_paths):
+    now = time.time()
+    rows = [(_key(z), os.path.getsize(z), now) for z in zip_paths]
+    with _lock:
+        with _transaction(get_connection()) as conn:
+            conn.executemany('''INSERT INTO uploads (zip_path, bytes, queued_at) VALUES (?, ?, ?)
+                ON CONFLICT(zip_path) DO UPDATE SET bytes = excluded.bytes, queued_at = excluded.queued_at''', rows)
+
+
+def mark_started(zip_path, worker=None):
+    now = time.time()
+    with _lock:
+        get_connection().execute('''INSERT INTO uploads (zip_path, state, attempts, bytes, started_at, content_hash, worker)
+            VALUES (?1, 'in_progress', 1, ?2, ?3, (SELECT hash FROM file_hashes WHERE zip_path = ?1), ?4)
+            ON CONFLICT(zip_path) DO UPDATE SET state = 'in_progress', attempts = attempts + 1, bytes = excluded.bytes,
+                started_at = excluded.started_at, attached_at = NULL, uploaded_at = NULL, submitted_at = NULL, last_error = NULL,
+                content_hash = excluded.content_hash, worker = excluded.worker''',
+            (_key(zip_path), os.path.getsize(zip_path), now, None if worker is None else str(worker)))
+
+
+def mark_step(zip_path, step):
+    column, state = STEP_COLUMNS[step]
+    with _lock:
+        get_connection().execute(f'UPDATE uploads SET {column} = ?, state = ? WHERE zip_path = ?', (time.time(), state, _key(zip_path)))
+
+
+def mark_processed(zip_path, remote_url=None):
+    with _lock:
+        get_connection().execute('''INSERT INTO uploads (zip_path, state, attempts, finished_at, remote_url) VALUES (?, 'done', 1, ?, ?)
+            ON CONFLICT(zip_path) DO UPDATE SET state = 'done', finished_at = excluded.finished_at,
+                remote_url = COALESCE(excluded.remote_url, remote_url), last_error = NULL''',
+            (_key(zip_path), time.time(), remote_url))
+
+
+def mark_failed(zip_path, error):
+    # A zip that was already posted stays done, so it is never uploaded again
+    with _lock:
+        get_connection().execute('''INSERT INTO uploads (zip_path, state, attempts, last_error, finished_at) VALUES (?, 'failed', 1, ?, ?)
+            ON CONFLICT(zip_path) DO UPDATE SET state = 'failed', last_error = excluded.last_error, finished_at = excluded.finished_at
+            WHERE uploads.state != 'done'
+        ''',
+            (_key(zip_path), str(error), time.time()))
+
+
+def get_state_counts():
+    with _lock:
+        return dict(get_connection().execute('SELECT state, COUNT(*) FROM uploads GROUP BY state').fetchall())
+
+
+def save_metadata(record):
+    st = os.stat(record['zip_path'])
+    with _lock:
+        get_connection().execute('''INSERT OR REPLACE INTO zip_metadata (zip_path, size, mtime_ns, ok, error, title, tag_line, description)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+            (_key(record['zip_path']), st.st_size, st.st_mtime_ns, int(record['ok']), record['error'],
+             record['title'], record['tag_line'], record['description']))
+
+
+def _metadata_record(zip_path, row):
+    # A cached record only counts while the file's size and mtime are unchanged
+    st = os.stat(zip_path)
+    if row is None or row[0] != st.st_size or row[1] != st.st_mtime_ns:
+        return None
+    return {'zip_path': zip_path, 'size': row[0], 'ok': bool(row[2]), 'error': row[3],
+            'title': row[4], 'tag_line': row[5], 'description': row[6]}
+
+
+def load_metadata(zip_path):
+    """Return the cached pre-flight record for a zip, or None if it is missing or the file changed."""
+    with _lock:
+        row = get_connection().execute('SELECT size, mtime_ns, ok, error, title, tag_line, description FROM zip_metadata WHERE zip_path = ?',
+                                       (_key(zip_path),)).fetchone()
+    return _metadata_record(zip_path, row)
+
+
+def load_metadata_many(zip_paths):
+    """Return {zip_path: cached pre-flight record or None} for a whole folder in one query."""
+    keys = {_key(z): z for z in zip_paths}
+    rows = {}
+    with _lock:
+        conn = get_connection()
+        # Batched only to stay under SQLite's limit on bound parameters
+        key_list = list(keys)
+        for i in range(0, len(key_list), SQL_VARIABLE_BATCH):
+            batch = key_list[i:i + SQL_VARIABLE_BATCH]
+            rows.update((row[0], row[1:]) for row in conn.execute(
+                f"SELECT zip_path, size, mtime_ns, ok, error, title, tag_line, description FROM zip_metadata WHERE zip_path IN ({', '.join('?' * len(batch))})",
+                batch))
+    return {z: _metadata_record(z, rows.get(key)) for key, z in keys.items()}
+
+
+def record_step_timing(zip_path, step, seconds, worker=None, started_at=None):
+    with _lock:
+        get_connection().execute('INSERT INTO step_timings (zip_path, worker, step, started_at, seconds) VALUES (?, ?, ?, ?, ?)',
+                                 (_key(zip_path), None if worker is None else str(worker), step,
+                                  started_at if started_at is not None else time.time() - seconds, seconds))
+
+
+def get_step_timings(since):
+    """Return {step: [seconds, ...]} for every step recorded since the given timestamp."""
+    with _lock:
+        rows = get_connection().execute('SELECT step, seconds FROM step_timings WHERE started_at >= ?', (since,)).fetchall()
+    timings = {}
+    for step, seconds in rows:
+        timings.setdefault(step, []).append(seconds)
+    return timings
+
+
+def get_worker_step_totals(since):
+    """Return (worker, step, count, total seconds, first start, last end) per worker and step recorded since the given timestamp."""
+    with _lock:
+        return get_connection().execute('''SELECT worker, step, COUNT(*), SUM(seconds), MIN(started_at), MAX(started_at + seconds)
+            FROM step_timings WHERE started_at >= ? GROUP BY worker, step ORDER BY worker''', (since,)).fetchall()
+
+
+def get_worker_totals(since):
+    """Return (worker, files, bytes, first start, last finish) for uploads finished since the given timestamp."""
+    with _lock:
+        return get_connection().execute('''SELECT worker, COUNT(*), COALESCE(SUM(bytes), 0), MIN(started_at), MAX(finished_at)
+            FROM uploads WHERE state = 'done' AND finished_at >= ? GROUP BY worker ORDER BY worker''', (since,)).fetchall()
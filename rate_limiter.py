@@ -0,0 +1,129 @@
+import time
+
+# Slots in each bucket's shared array
+TOKENS, UPDATED, RATE, PENALIZED_AT = range(4)
+
+# Several workers usually hit the same throttle at once; that counts as one penalty
+PENALTY_DEBOUNCE_SECONDS = 2.0
+
+THROTTLE_STATUSES = (429, 503)
+
+
+class TokenBucket:
+    """A token bucket shared by every worker process, with an adaptive refill rate.
+
+    Each action takes a token. The rate halves (rate_backoff) whenever the site pushes back and
+    creeps back up by rate_increase of the configured rate per success once rate_recovery_seconds
+    have passed without trouble (additive increase, multiplicative decrease).
+    """
+
+    def __init__(self, ctx, name, per_minute, burst, config):
+        self.name = name
+        self.base_rate = per_minute / 60
+        self.burst = max(1, burst)
+        self.min_rate = min(self.base_rate, config.get('rate_min_per_minute', 1) / 60)
+        self.max_rate = self.base_rate * config.get('rate_max_factor', 4)
+        self.backoff = config.get('rate_backoff', 0.5)
+        self.increase = self.base_rate * config.get('rate_increase', 0.1)
+        self.recovery_seconds = config.get('rate_recovery_seconds', 30)
+        self._lock = ctx.Lock()
+        self._state = ctx.Array('d', [self.burst, time.time(), self.base_rate, 0.0], lock=False)
+
+    def _refill(self, now):
+        state = self._state
+        state[TOKENS] = min(self.burst, state[TOKENS] + (now - state[UPDATED]) * state[RATE])
+        state[UPDATED] = now
+
+    def take(self):
+        """Take a token if one is available; otherwise return how many seconds until one will be."""
+        with self._lock:
+            now = time.time()
+            self._refill(now)
+            if self._state[TOKENS] >= 1:
+                self._state[TOKENS] -= 1
+                return 0.0
+            return (1 - self._state[TOKENS]) / self._state[RATE]
+
+    def penalize(self, pause=0.0):
+        """Cut the rate and drain the bucket; pause (e.g. from Retry-After) holds everyone back that long."""
+        with self._lock:
+            now = time.time()
+            self._refill(now)
+            if now - self._state[PENALIZED_AT] >= PENALTY_DEBOUNCE_SECONDS:
+                self._state[RATE] = max(self.min_rate, self._state[RATE] * self.backoff)
+            self._state[PENALIZED_AT] = now
+            self._state[TOKENS] = min(self._state[TOKENS], 0.0, -pause * self._state[RATE])
+            return self._state[RATE]
+
+    def succeeded(self):
+        with self._lock:
+            if time.time() - self._state[PENALIZED_AT] >= self.recovery_seconds:
+                self._state[RATE] = min(self.max_rate, self._state[RATE] + self.increase)
+            return self._state[RATE]
+
+    @property
+    def per_minute(self):
+        return self._state[RATE] * 60
+
+
+class RateLimiter:
+    """The site's bucket plus one bucket per account; every page load and submission draws from both.
+
+    Challenge pages and 503s slow the whole site down; alerts, flood messages and 429s only the account.
+    Pass the same limiter to every worker (it is built on ctx primitives, so it can go to child processes).
+    With a session pool, every account-level penalty also counts as a strike against the account's health.
+    """
+
+    def __init__(self, ctx, config, accounts=(), pool=None):
+        self.enabled = config.get('rate_limit', True)
+        self.pool = pool
+        self.site = TokenBucket(ctx, config.get('site', 'se7ensins'), config.get('site_rate_per_minute', 30), config.get('site_burst', 4), config)
+        self.accounts = {
+            account: TokenBucket(ctx, account, config.get('account_rate_per_minute', 20), config.get('account_burst', 3), config)
+            for account in accounts
+        }
+
+    def _buckets(self, account):
+        bucket = self.accounts.get(account)
+        return [self.site, bucket] if bucket else [self.site]
+
+    def acquire(self, account=None):
+        """Block until both the site and the account allow one more action; returns the seconds waited."""
+        if not self.enabled:
+            return 0.0
+        started = time.perf_counter()
+        # Account first: waiting on it while holding a site token would starve the other accounts
+        for bucket in reversed(self._buckets(account)):
+            while True:
+                wait = bucket.take()
+                if not wait:
+                    break
+                time.sleep(min(wait, 5.0))
+        return time.perf_counter() - started
+
+    def penalize(self, account=None, site_wide=False, pause=0.0):
+        """Tighten after the site pushed back; returns the new actions/minute of the bucket that was cut."""
+        if self.pool is not None and not site_wide:
+            self.pool.throttled(account)
+        if not self.enabled:
+            return None
+        bucket = self.site if site_wide or account not in self.accounts else self.accounts[account]
+        bucket.penalize(pause)
+        return bucket.per_minute
+
+    def succeeded(self, account=None):
+        if not self.enabled:
+            return
+        for bucket in self._buckets(account):
+            bucket.succeeded()
+
+    def describe(self, account=None):
+        return ', '.join(f"{bucket.name} {bucket.per_minute:.1f}/min" for bucket in self._buckets(account))
+
+
+def retry_after_seconds(response):
+    """Seconds from a Retry-After header, or 0 when it is missing or a date."""
+    try:
+        return max(0.0, float(response.headers.get('Retry-After', 0)))
+    except (TypeError, ValueError):
+        return 0.0
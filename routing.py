@@ -0,0 +1,96 @@
+import glob
+import os
+import re
+
+from categories import CategoryIndex, normalize_name
+from preflight import run_preflight
+
+UPLOAD_ROOT = 'zipsToUpload'
+SIDECAR_EXT = '.category'
+
+
+class RoutingError(Exception):
+    pass
+
+
+class UnknownCategoryError(RoutingError):
+    pass
+
+
+def find_zips(folder=UPLOAD_ROOT):
+    """Return the zips in the upload folder and one level of subfolders below it."""
+    return glob.glob(os.path.join(folder, '*.zip')) + glob.glob(os.path.join(folder, '*', '*.zip'))
+
+
+def lookup_category(index, text):
+    """Match a sidecar line, folder name or rule target to one category.
+
+    Accepts the site's cat_id ("1667"), a "{slug}.{cat_id}" name as used in category URLs,
+    the numbered key from the category cache, or the exact category name.
+    """
+    text = text.strip()
+    match = re.search(r'(?:^|\.)(\d+)$', text)
+    if match:
+        entry = index.by_cat_id.get(match.group(1)) or (index.by_key.get(text) if text.isdigit() else None)
+        if entry:
+            return entry
+    entries = index.by_name.get(normalize_name(text), [])
+    if len(entries) == 1:
+        return entries[0]
+    if entries:
+        raise RoutingError(f"Category name {text!r} is ambiguous, use one of the cat_ids {[e['cat_id'] for e in entries]}")
+    raise UnknownCategoryError(f"No category matches {text!r}")
+
+
+def read_sidecar(zip_path):
+    """Return the first non-empty line of foo.category next to foo.zip, or None."""
+    sidecar_path = os.path.splitext(zip_path)[0] + SIDECAR_EXT
+    if not os.path.exists(sidecar_path):
+        return None
+    with open(sidecar_path, encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            if line.strip():
+                return line.strip()
+    return None
+
+
+def route_zip(zip_path, config, index, record=None, unknown_folders=None):
+    """Return the category entry for one zip, or None to use the configured category.
+
+    A sidecar file wins over the zip's subfolder, which wins over the README rules. A subfolder
+    whose name matches no category is just for sorting; it is added to unknown_folders and ignored.
+    """
+    sidecar = read_sidecar(zip_path)
+    if sidecar:
+        return lookup_category(index, sidecar)
+    folder = os.path.dirname(os.path.normpath(zip_path))
+    if os.path.normcase(os.path.basename(folder)) != os.path.normcase(UPLOAD_ROOT):
+        try:
+            return lookup_category(index, os.path.basename(folder))
+        except UnknownCategoryError:
+            if unknown_folders is not None:
+                unknown_folders.add(folder)
+    if record is not None:
+        text = f"{record.get('title') or ''}\n{record.get('description') or ''}"
+        for rule in config.get('category_rules', []):
+            if re.search(rule['pattern'], text, re.IGNORECASE):
+                return lookup_category(index, str(rule['category']))
+    return None
+
+
+def route_zips(zip_paths, config, categories_dict):
+    """Route every zip; returns ({zip_path: entry or None}, {zip_path: error message}, [subfolders naming no category])."""
+    index = CategoryIndex(categories_dict)
+    records = {}
+    if config.get('category_rules'):
+        # Rules look at README text, so scan up front (cached, so the feeder's scan is free afterwards)
+        records = {record['zip_path']: record for record in run_preflight(zip_paths, config.get('preflight_workers'))}
+    routes = {}
+    errors = {}
+    unknown_folders = set()
+    for zip_path in zip_paths:
+        try:
+            routes[zip_path] = route_zip(zip_path, config, index, records.get(zip_path), unknown_folders)
+        except RoutingError as e:
+            errors[zip_path] = str(e)
+    return routes, errors, sorted(unknown_folders)
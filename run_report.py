@@ -0,0 +1,89 @@
+import math
+import time
+
+from progress_db import get_step_timings, get_worker_step_totals, get_worker_totals, record_step_timing
+
+# Report order; anything else recorded is listed after these
+STEP_ORDER = ['queue_wait', 'fill', 'tags', 'attach', 'prepare_next', 'upload', 'submit', 'navigate']
+
+
+class StepTimer:
+    """Times the steps of one upload: each lap() records the time since the previous lap under a step name."""
+
+    def __init__(self, zip_path, worker=None, enabled=True):
+        self.zip_path = zip_path
+        self.worker = worker
+        self.enabled = enabled
+        self.restart()
+
+    def restart(self):
+        self._wall = time.time()
+        self._start = time.perf_counter()
+
+    def lap(self, step):
+        if self.enabled:
+            record_step_timing(self.zip_path, step, time.perf_counter() - self._start, self.worker, self._wall)
+        self.restart()
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def build_run_report(since):
+    """Return the end-of-run report as a list of lines, covering everything recorded since the given timestamp."""
+    timings = get_step_timings(since)
+    totals = get_worker_totals(since)
+    if not timings and not totals:
+        return ["Run report: nothing was uploaded."]
+    lines = ["Run report:", f"  {'step':<13}{'count':>6}{'p50 s':>9}{'p95 s':>9}{'total s':>10}"]
+    for step in sorted(timings, key=lambda s: (STEP_ORDER.index(s) if s in STEP_ORDER else len(STEP_ORDER), s)):
+        values = timings[step]
+        lines.append(f"  {step:<13}{len(values):>6}{percentile(values, 50):>9.2f}{percentile(values, 95):>9.2f}{sum(values):>10.1f}")
+    all_files = 0
+    first_start = None
+    last_finish = None
+    for worker, files, size, started, finished in totals:
+        span = max((finished or 0) - (started or finished or 0), 1e-6)
+        label = 'HTTP' if worker == 'http' else f"Browser {worker if worker is not None else '?'}"
+        lines.append(f"  {label}: {files} files, {files * 3600 / span:.1f} files/hour, {size / span / (1024 * 1024):.2f} MB/s")
+        all_files += files
+        first_start = started if first_start is None or (started and started < first_start) else first_start
+        last_finish = finished if last_finish is None or (finished and finished > last_finish) else last_finish
+    if all_files:
+        span = max((last_finish or 0) - (first_start or last_finish or 0), 1e-6)
+        lines.append(f"  Total: {all_files} files in {span / 60:.1f} min, {all_files * 3600 / span:.1f} files/hour")
+    return lines
+
+
+def build_orchestration_report(since, finished):
+    """Return how the run's time split per worker (start-up, busy, queue wait, idle) as a list of lines."""
+    workers = {}
+    for worker, step, count, total, first, last in get_worker_step_totals(since):
+        stats = workers.setdefault(worker, {'busy': 0.0, 'queue_wait': 0.0, 'first': first, 'last': last})
+        stats['queue_wait' if step == 'queue_wait' else 'busy'] += total
+        stats['first'] = min(stats['first'], first)
+        stats['last'] = max(stats['last'], last)
+    if not workers:
+        return ["Orchestration report: no worker activity was recorded."]
+    makespan = max(finished - since, 1e-6)
+    for stats in workers.values():
+        stats['startup'] = stats['first'] - since
+        stats['idle'] = max(0.0, makespan - stats['busy'] - stats['queue_wait'])
+        stats['tail'] = finished - stats['last']
+    lines = [f"Orchestration report: {len(workers)} workers, makespan {makespan:.1f} s",
+             f"  {'per worker':<13}{'min s':>9}{'p50 s':>9}{'p95 s':>9}{'max s':>9}"]
+    for label, key in (('start-up', 'startup'), ('busy', 'busy'), ('queue wait', 'queue_wait'), ('idle', 'idle'), ('idle at end', 'tail')):
+        values = [stats[key] for stats in workers.values()]
+        lines.append(f"  {label:<13}{min(values):>9.2f}{percentile(values, 50):>9.2f}{percentile(values, 95):>9.2f}{max(values):>9.2f}")
+    waits = get_step_timings(since).get('queue_wait', [])
+    if waits:
+        lines.append(f"  Queue: {len(waits)} gets, wait p50 {percentile(waits, 50) * 1000:.1f} ms, "
+                     f"p95 {percentile(waits, 95) * 1000:.1f} ms, max {max(waits) * 1000:.1f} ms")
+    busy = sum(stats['busy'] for stats in workers.values())
+    lines.append(f"  Utilisation: {100 * busy / (makespan * len(workers)):.1f}% of worker time spent on uploads")
+    least = sorted(workers.items(), key=lambda item: item[1]['busy'])[:5]
+    lines.append("  Least busy: " + ', '.join(f"{worker} ({stats['busy'] / makespan * 100:.0f}%)" for worker, stats in least))
+    return lines
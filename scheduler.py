@@ -0,0 +1,60 @@
+import heapq
+import os
+
+SCHEDULE_MODES = ('largest_first', 'smallest_first', 'fifo')
+
+
+def estimate_seconds(size_bytes, config):
+    """Rough time one browser spends on a zip, from the same base + per-MB figures as the upload wait."""
+    size_mb = size_bytes / (1024 * 1024)
+    return config.get('upload_wait_base', 30) + size_mb * config.get('upload_wait_per_mb', 0.75)
+
+
+def predict_makespan(durations, num_workers):
+    """Simulate workers pulling jobs from a shared queue in order; return the finish time of the last one."""
+    if not durations:
+        return 0.0
+    workers = [0.0] * max(1, num_workers)
+    for duration in durations:
+        # The next job always goes to whichever worker frees up first
+        heapq.heapreplace(workers, workers[0] + duration)
+    return max(workers)
+
+
+def order_work(zip_paths, config, num_workers, sizes=None, groups=None):
+    """Order zips for the shared queue and return (ordered, predicted makespan, folder-order makespan).
+
+    largest_first is the longest-processing-time rule: with workers pulling from one queue it
+    keeps a big file from being started last while every other browser sits idle.
+    smallest_first trades total time for fast early progress.
+    groups maps zips to a category; each category's zips are then queued back to back.
+    """
+    mode = config.get('schedule', 'largest_first')
+    if mode not in SCHEDULE_MODES:
+        raise ValueError(f"Unknown schedule {mode!r}, expected one of {', '.join(SCHEDULE_MODES)}")
+    if sizes is None:
+        sizes = {z: os.path.getsize(z) for z in zip_paths}
+    if mode == 'largest_first':
+        ordered = sorted(zip_paths, key=lambda z: sizes[z], reverse=True)
+    elif mode == 'smallest_first':
+        ordered = sorted(zip_paths, key=lambda z: sizes[z])
+    else:
+        ordered = list(zip_paths)
+    if groups and config.get('group_by_category', True):
+        # Browsers only switch add forms between groups; the groups themselves follow the same mode
+        totals = {}
+        first_seen = {}
+        for i, z in enumerate(ordered):
+            group = groups.get(z)
+            totals[group] = totals.get(group, 0) + estimate_seconds(sizes[z], config)
+            first_seen.setdefault(group, i)
+        if mode == 'largest_first':
+            rank = {group: -total for group, total in totals.items()}
+        elif mode == 'smallest_first':
+            rank = totals
+        else:
+            rank = first_seen
+        ordered.sort(key=lambda z: (rank[groups.get(z)], first_seen[groups.get(z)]))
+    predicted = predict_makespan([estimate_seconds(sizes[z], config) for z in ordered], num_workers)
+    baseline = predict_makespan([estimate_seconds(sizes[z], config) for z in zip_paths], num_workers)
+    return ordered, predicted, baseline
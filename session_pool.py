@@ -0,0 +1,155 @@
+import glob
+import time
+
+import requests
+
+from http_uploader import find_cookie_file, get_account_name, get_login_state, load_cookies, make_session
+from rate_limiter import PENALTY_DEBOUNCE_SECONDS
+
+# Slots per account in the pool's shared array
+STATE, WORKERS, STRIKES, STRUCK_AT, COOLDOWN_UNTIL, UPLOADS = range(6)
+SLOTS = 6
+
+READY, COOLING, LOGGED_OUT, SPENT = range(4)
+STATE_NAMES = {READY: 'ready', COOLING: 'cooling down', LOGGED_OUT: 'logged out', SPENT: 'upload budget used'}
+
+
+def list_cookie_files(config):
+    """Every cookie file in cookies/, with the one find_cookie_file would pick first."""
+    cookie_files = sorted(glob.glob('cookies/*.json'))
+    preferred = find_cookie_file(config)
+    if preferred in cookie_files:
+        cookie_files.remove(preferred)
+        cookie_files.insert(0, preferred)
+    return cookie_files
+
+
+def check_cookie_file(config, cookie_file, url, timeout=15):
+    """Return 'logged_in', 'logged_out', 'unknown' (e.g. behind a challenge) or 'invalid' (unreadable or no live cookies)."""
+    try:
+        cookies = load_cookies(config, cookie_file)
+    except (OSError, ValueError):
+        return 'invalid'
+    if not isinstance(cookies, list):
+        return 'invalid'
+    now = time.time()
+    # Exported cookies carry expirationDate, Selenium's carry expiry; session cookies have neither
+    live = [c for c in cookies if isinstance(c, dict) and 'name' in c and 'value' in c
+            and not 0 < (c.get('expirationDate') or c.get('expiry') or 0) < now]
+    if not live:
+        return 'invalid'
+    try:
+        resp = make_session(config, live).get(url, timeout=timeout)
+    except requests.RequestException:
+        return 'unknown'
+    return get_login_state(resp.text)
+
+
+class SessionPool:
+    """Hands out accounts (one per cookie file) to workers and tracks their health across processes.
+
+    A worker gets the ready account with the fewest workers on it. Every time the site throttles an
+    account it gets a strike; account_max_strikes strikes without a successful upload in between cool
+    it down for account_cooldown_seconds. Logged-out accounts, and accounts that reached
+    account_max_uploads, are out for the rest of the run.
+    """
+
+    def __init__(self, ctx, config, cookie_files):
+        self.cookie_files = {get_account_name(f): f for f in cookie_files}
+        self.accounts = list(self.cookie_files)
+        self.max_workers = config.get('account_max_workers', 0)
+        self.max_uploads = config.get('account_max_uploads', 0)
+        self.max_strikes = max(1, config.get('account_max_strikes', 3))
+        self.cooldown = config.get('account_cooldown_seconds', 600)
+        self._lock = ctx.Lock()
+        self._state = ctx.Array('d', SLOTS * len(self.accounts), lock=False)
+
+    def _index(self, account):
+        return self.accounts.index(account) * SLOTS
+
+    def _refresh(self, i, now):
+        # A cooled down account is ready again with a clean slate
+        if self._state[i + STATE] == COOLING and now >= self._state[i + COOLDOWN_UNTIL]:
+            self._state[i + STATE] = READY
+            self._state[i + STRIKES] = 0
+
+    def assign(self):
+        """Block until an account is ready and return it; None when there are no accounts or none can come back."""
+        while True:
+            with self._lock:
+                now = time.time()
+                best, wait = None, None
+                for account in self.accounts:
+                    i = self._index(account)
+                    self._refresh(i, now)
+                    if self._state[i + STATE] == COOLING:
+                        remaining = self._state[i + COOLDOWN_UNTIL] - now
+                        wait = remaining if wait is None else min(wait, remaining)
+                        continue
+                    if self._state[i + STATE] != READY:
+                        continue
+                    if self.max_workers and self._state[i + WORKERS] >= self.max_workers:
+                        continue
+                    load = (self._state[i + WORKERS], self._state[i + UPLOADS])
+                    if best is None or load < best[0]:
+                        best = (load, account)
+                if best:
+                    self._state[self._index(best[1]) + WORKERS] += 1
+                    return best[1]
+            if wait is None:
+                return None
+            time.sleep(min(wait, 5.0))
+
+    def release(self, account):
+        if account not in self.cookie_files:
+            return
+        with self._lock:
+            self._state[self._index(account) + WORKERS] -= 1
+
+    def usable(self, account):
+        if account not in self.cookie_files:
+            return True
+        with self._lock:
+            i = self._index(account)
+            self._refresh(i, time.time())
+            return self._state[i + STATE] == READY
+
+    def throttled(self, account):
+        """Strike the account; returns True when that strike took it out of rotation."""
+        if account not in self.cookie_files:
+            return False
+        with self._lock:
+            i = self._index(account)
+            now = time.time()
+            # Several workers on one account usually hit the same throttle at once; that is one strike
+            if now - self._state[i + STRUCK_AT] < PENALTY_DEBOUNCE_SECONDS:
+                return False
+            self._state[i + STRUCK_AT] = now
+            self._state[i + STRIKES] += 1
+            if self._state[i + STATE] != READY or self._state[i + STRIKES] < self.max_strikes:
+                return False
+            self._state[i + STATE] = COOLING
+            self._state[i + COOLDOWN_UNTIL] = now + self.cooldown
+            return True
+
+    def logged_out(self, account):
+        if account not in self.cookie_files:
+            return
+        with self._lock:
+            self._state[self._index(account) + STATE] = LOGGED_OUT
+
+    def uploaded(self, account):
+        if account not in self.cookie_files:
+            return
+        with self._lock:
+            i = self._index(account)
+            self._state[i + UPLOADS] += 1
+            self._state[i + STRIKES] = 0
+            if self.max_uploads and self._state[i + UPLOADS] >= self.max_uploads and self._state[i + STATE] == READY:
+                self._state[i + STATE] = SPENT
+
+    def describe(self, account):
+        with self._lock:
+            i = self._index(account)
+            self._refresh(i, time.time())
+            return f"{account}: {int(self._state[i + UPLOADS])} uploads, {STATE_NAMES[int(self._state[i + STATE])]}"
@@ -0,0 +1,219 @@
+import os
+import random
+import time
+
+from selenium.common.exceptions import NoAlertPresentException, NoSuchElementException, NoSuchWindowException
+from selenium.webdriver.common.by import By
+
+# Seconds each simulated action takes, before time_scale and jitter are applied
+DEFAULT_LATENCIES = {
+    'launch': 3.0,
+    'page_load': 1.5,
+    'fill': 0.2,
+    'tags': 0.1,
+    'attach_base': 2.0,
+    'attach_per_mb': 0.5,
+    'submit': 1.5,
+}
+
+
+def get_simulation(config):
+    simulation = dict(DEFAULT_LATENCIES, time_scale=1.0, jitter=0.2, seed=0)
+    simulation.update(config.get('simulation') or {})
+    return simulation
+
+
+def simulated_size(config, zip_path):
+    """Size the dry run pretends a zip has; the placeholder zips on disk are tiny."""
+    sizes = get_simulation(config).get('sizes') or {}
+    return sizes.get(os.path.basename(zip_path), os.path.getsize(zip_path))
+
+
+def simulated_sizes(config, zip_paths):
+    """Sizes for order_work in a dry run, or None to let it read the real ones."""
+    if config.get('driver_backend') != 'simulated':
+        return None
+    return {z: simulated_size(config, z) for z in zip_paths}
+
+
+class SimulatedElement:
+    def __init__(self, driver, kind):
+        self.driver = driver
+        self.kind = kind
+        self.text = ''
+
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        return True
+
+    def get_attribute(self, name):
+        return None
+
+    def find_element(self, by, value):
+        raise NoSuchElementException(f"Simulated {self.kind} has no {value}")
+
+    def send_keys(self, *values):
+        if self.kind == 'tags':
+            self.driver.pause('tags')
+        elif self.kind == 'file':
+            self.driver.start_upload(''.join(values))
+
+    def click(self):
+        if self.kind == 'save':
+            self.driver.save()
+
+
+class _SwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, handle):
+        if handle not in self.driver.tabs:
+            raise NoSuchWindowException(f"No simulated tab {handle}")
+        self.driver.current_window_handle = handle
+
+    def new_window(self, type_hint=None):
+        self.driver.current_window_handle = self.driver.open_tab()
+
+    @property
+    def alert(self):
+        raise NoAlertPresentException("The simulated site never shows alerts")
+
+
+class SimulatedDriver:
+    """Stands in for a Chrome WebDriver in dry runs.
+
+    Page loads, form filling, attachments and saves take configured (scaled, jittered) time instead
+    of driving a browser, so run_browser and process_single_zip run unchanged with hundreds of workers.
+    It answers only the scripts, selectors and calls main.py uses.
+    """
+
+    def __init__(self, config, worker_id=None):
+        self.simulation = get_simulation(config)
+        self.config = config
+        self.random = random.Random(f"{self.simulation['seed']}-{worker_id}")
+        self.tabs = {}
+        self.opened = 0
+        self.saves = 0
+        self.current_window_handle = self.open_tab()
+        self.switch_to = _SwitchTo(self)
+        self.pause('launch')
+
+    def seconds(self, base):
+        jitter = self.simulation['jitter']
+        return max(0.0, base * self.simulation['time_scale'] * (1 + self.random.uniform(-jitter, jitter)))
+
+    def pause(self, step):
+        time.sleep(self.seconds(self.simulation[step]))
+
+    def open_tab(self):
+        self.opened += 1
+        handle = f'sim-tab-{self.opened}'
+        self.tabs[handle] = {'url': 'about:blank', 'upload': None}
+        return handle
+
+    @property
+    def tab(self):
+        if self.current_window_handle not in self.tabs:
+            raise NoSuchWindowException("The current simulated tab was closed")
+        return self.tabs[self.current_window_handle]
+
+    @property
+    def current_url(self):
+        return self.tab['url']
+
+    @property
+    def title(self):
+        return 'Add download' if self.on_form() else 'Downloads'
+
+    @property
+    def window_handles(self):
+        return list(self.tabs)
+
+    def on_form(self):
+        return self.tab['url'].rstrip('/').endswith('/add')
+
+    def get(self, url):
+        self.pause('page_load')
+        self.tab.update(url=url, upload=None)
+
+    def refresh(self):
+        self.get(self.current_url)
+
+    def close(self):
+        self.tabs.pop(self.current_window_handle, None)
+
+    def quit(self):
+        self.tabs.clear()
+
+    def add_cookie(self, cookie):
+        pass
+
+    def delete_all_cookies(self):
+        pass
+
+    def get_cookies(self):
+        return []
+
+    def execute_cdp_cmd(self, cmd, params):
+        return {}
+
+    def start_upload(self, path):
+        size_mb = simulated_size(self.config, path) / (1024 * 1024)
+        now = time.time()
+        duration = self.seconds(self.simulation['attach_base'] + size_mb * self.simulation['attach_per_mb'])
+        self.tab['upload'] = {'started': now, 'done_at': now + duration}
+
+    def upload_state(self):
+        upload = self.tab['upload']
+        if upload is None:
+            return {'found': False, 'done': False, 'percent': None, 'error': None}
+        now = time.time()
+        if now >= upload['done_at']:
+            return {'found': True, 'done': True, 'percent': None, 'error': None}
+        percent = 100 * (now - upload['started']) / max(upload['done_at'] - upload['started'], 1e-6)
+        return {'found': True, 'done': False, 'percent': percent, 'error': None}
+
+    def save(self):
+        self.pause('submit')
+        self.saves += 1
+        base = self.tab['url'].split('/downloads/')[0]
+        self.tab.update(url=f'{base}/downloads/simulated.{self.saves}/', upload=None)
+
+    def execute_script(self, script, *args):
+        # Recognise main.py's scripts by what they touch rather than importing them
+        if 'data-logged-in' in script:
+            return 'logged_in'
+        if 'js-attachmentFile' in script:
+            return self.upload_state()
+        if 'fr-element' in script:
+            self.pause('fill')
+            return []
+        if 'arguments[0].click()' in script and args and isinstance(args[0], SimulatedElement):
+            args[0].click()
+        return None
+
+    def find_element(self, by, value):
+        kind = None
+        if by == By.TAG_NAME and value == 'body':
+            kind = 'body'
+        elif self.on_form():
+            if by == By.NAME and value == 'title':
+                kind = 'title'
+            elif value == 'span.tagify__input':
+                kind = 'tags'
+            elif value == "input[type='file']":
+                kind = 'file'
+            elif by == By.XPATH and 'Save' in value:
+                kind = 'save'
+        if kind is None:
+            raise NoSuchElementException(f"Simulated page {self.current_url} has no {value}")
+        return SimulatedElement(self, kind)
+
+    def find_elements(self, by, value):
+        try:
+            return [self.find_element(by, value)]
+        except NoSuchElementException:
+            return []
@@ -0,0 +1,28 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import progress_db  # noqa: E402
+from fake_xenforo import FakeXenForo  # noqa: E402
+
+
+@pytest.fixture
+def fake_site():
+    site = FakeXenForo(attach_latency=0, redirect_latency=0).start()
+    yield site
+    site.stop()
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """Run in an empty folder with a fresh progress.db."""
+    monkeypatch.chdir(tmp_path)
+    path = str(tmp_path / 'progress.db')
+    monkeypatch.setattr(progress_db, 'DB_PATH', path)
+    monkeypatch.setattr(progress_db, '_conn', None)
+    yield path
+    if progress_db._conn is not None:
+        progress_db._conn.close()
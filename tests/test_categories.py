@@ -0,0 +1,68 @@
+import json
+import time
+
+import pytest
+
+from categories import CategoryIndex, find_category, get_meta_path, is_stale, parse_cat_id, save_categories
+
+BASE = 'https://example.com/downloads/categories'
+CATEGORIES = [
+    ('GTA V Mods', f'{BASE}/gta-v-mods.12/add'),
+    ('GTA V Scripts', f'{BASE}/gta-v-scripts.13/add'),
+    ('Minecraft Maps', f'{BASE}/minecraft-maps.40/add'),
+    ('Xbox 360 Modding', 'https://example.com/downloads/add?resource_category_id=7'),
+]
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return {'site': 'test'}
+
+
+@pytest.fixture
+def index(config):
+    return CategoryIndex(save_categories(config, CATEGORIES))
+
+
+def test_parse_cat_id():
+    assert parse_cat_id(f'{BASE}/gta-v-mods.12/add') == '12'
+    assert parse_cat_id('https://example.com/downloads/add?resource_category_id=7') == '7'
+    assert parse_cat_id('https://example.com/downloads/') is None
+
+
+def test_lookup_by_key_and_cat_id(index):
+    assert len(index) == 4
+    assert index.by_key['3']['name'] == 'Minecraft Maps'
+    assert index.by_cat_id['7']['name'] == 'Xbox 360 Modding'
+    # A number matches the site's id before the numbered key
+    assert [e['name'] for e in index.search('12', limit=1)] == ['GTA V Mods']
+
+
+def test_search_prefers_prefixes_then_trigram_overlap(index):
+    assert [e['name'] for e in index.search('gta')] == ['GTA V Mods', 'GTA V Scripts']
+    assert index.search('scripts')[0]['name'] == 'GTA V Scripts'
+    # A typo still finds the category through shared trigrams
+    assert index.search('minecraf maps')[0]['name'] == 'Minecraft Maps'
+    assert index.search('zzzz') == []
+    assert len(index.search('')) == 4
+
+
+def test_find_category_prefers_cat_id(config):
+    categories_dict = save_categories(config, CATEGORIES)
+    assert find_category(dict(config, category_cat_id=40, category_id=1), categories_dict)['name'] == 'Minecraft Maps'
+    assert find_category(dict(config, category_id=2), categories_dict)['name'] == 'GTA V Scripts'
+    assert find_category(config, categories_dict) is None
+
+
+def test_cache_goes_stale_after_the_ttl(config):
+    assert is_stale(config)
+    save_categories(config, CATEGORIES)
+    assert not is_stale(config)
+    with open(get_meta_path(config), 'w') as f:
+        json.dump({'fetched_at': time.time() - 2 * 3600}, f)
+    assert not is_stale(dict(config, category_ttl_hours=3))
+    assert is_stale(dict(config, category_ttl_hours=1))
+    with open(get_meta_path(config), 'w') as f:
+        f.write('not json')
+    assert is_stale(config)
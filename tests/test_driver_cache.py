@@ -0,0 +1,94 @@
+import json
+import sys
+
+import pytest
+
+import driver_cache
+
+
+@pytest.fixture
+def host(tmp_path, monkeypatch):
+    """A host with Chrome 120 installed, a chromedriver 120 on PATH and a counting webdriver-manager."""
+    monkeypatch.chdir(tmp_path)
+    state = {'chrome': '120.0.6099.109', 'local': str(tmp_path / 'chromedriver'), 'local_version': '120.0.6099.71', 'downloads': 0}
+    (tmp_path / 'chromedriver').write_text('')
+
+    def download():
+        state['downloads'] += 1
+        return str(tmp_path / 'downloaded-chromedriver')
+
+    (tmp_path / 'downloaded-chromedriver').write_text('')
+    monkeypatch.setattr(driver_cache, 'get_chrome_version', lambda: state['chrome'])
+    monkeypatch.setattr(driver_cache.shutil, 'which', lambda name: state['local'])
+    monkeypatch.setattr(driver_cache, '_run_version', lambda cmd: state['local_version'])
+    monkeypatch.setattr(driver_cache, '_download_chromedriver', download)
+    return state
+
+
+def cache():
+    with open(driver_cache.CACHE_PATH) as f:
+        return json.load(f)
+
+
+def test_configured_path_wins(host):
+    assert driver_cache.resolve_chromedriver({'chromedriver_path': '/opt/chromedriver'}) == '/opt/chromedriver'
+
+
+def test_matching_local_driver_is_cached_per_chrome_version(host):
+    assert driver_cache.resolve_chromedriver({}) == host['local']
+    assert cache() == {'120.0.6099.109': host['local']}
+    host['local_version'] = None
+    assert driver_cache.resolve_chromedriver({}) == host['local']
+    assert host['downloads'] == 0
+
+
+def test_chrome_update_downloads_a_new_driver(host):
+    driver_cache.resolve_chromedriver({})
+    host['chrome'] = '121.0.6167.85'
+    path = driver_cache.resolve_chromedriver({})
+    assert path.endswith('downloaded-chromedriver')
+    assert host['downloads'] == 1
+    assert cache() == {'120.0.6099.109': host['local'], '121.0.6167.85': path}
+
+
+def test_cached_path_that_disappeared_is_resolved_again(host, tmp_path):
+    with open(driver_cache.CACHE_PATH, 'w') as f:
+        json.dump({'120.0.6099.109': str(tmp_path / 'gone')}, f)
+    assert driver_cache.resolve_chromedriver({}) == host['local']
+    assert cache() == {'120.0.6099.109': host['local']}
+
+
+def test_corrupt_cache_is_rebuilt(host):
+    with open(driver_cache.CACHE_PATH, 'w') as f:
+        f.write('{not json')
+    assert driver_cache.resolve_chromedriver({}) == host['local']
+    assert cache() == {'120.0.6099.109': host['local']}
+
+
+def test_unknown_chrome_version_uses_the_local_driver_uncached(host):
+    host['chrome'] = None
+    assert driver_cache.resolve_chromedriver({}) == host['local']
+    host['local'] = None
+    assert driver_cache.resolve_chromedriver({}).endswith('downloaded-chromedriver')
+    with pytest.raises(FileNotFoundError):
+        cache()
+
+
+def test_failed_download_falls_back_to_an_old_local_driver_uncached(host, monkeypatch):
+    host['local_version'] = '119.0.6045.105'
+
+    def offline():
+        raise OSError('offline')
+
+    monkeypatch.setattr(driver_cache, '_download_chromedriver', offline)
+    assert driver_cache.resolve_chromedriver({}) == host['local']
+    with pytest.raises(FileNotFoundError):
+        cache()
+
+
+def test_importing_does_not_need_webdriver_manager(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'webdriver_manager', None)
+    monkeypatch.setitem(sys.modules, 'webdriver_manager.chrome', None)
+    monkeypatch.delitem(sys.modules, 'driver_cache')
+    import driver_cache as reloaded
+    assert reloaded.resolve_chromedriver({'chromedriver_path': 'x'}) == 'x'
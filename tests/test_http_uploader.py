@@ -0,0 +1,89 @@
+import multiprocessing
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import http_uploader
+from fake_xenforo import TOKEN
+from http_uploader import AddFormParser, HttpUploader
+from rate_limiter import RateLimiter
+
+CONFIG = {'user_agent': 'pytest'}
+
+
+def make_zip(tmp_path, name='mod.zip'):
+    path = tmp_path / name
+    path.write_bytes(b'PK\x05\x06' + b'\x00' * 18)
+    return str(path)
+
+
+def test_add_form_parser_reads_the_form(fake_site):
+    uploader = HttpUploader(CONFIG, [])
+    html = uploader.session.get(fake_site.url + fake_site.add_path('1')).text
+    parser = AddFormParser()
+    parser.feed(html)
+    assert parser.action == fake_site.add_path('1')
+    assert parser.fields['_xfToken'] == TOKEN
+    assert parser.upload_url.startswith('/attachments/upload?')
+
+
+def test_upload_zip_saves_a_download(fake_site, tmp_path):
+    uploader = HttpUploader(CONFIG, [])
+    url = uploader.upload_zip(fake_site.url + fake_site.add_path('1'), make_zip(tmp_path), 'My Mod', 'tagline', '<p>desc</p>', 'tag')
+    assert '/downloads/my-mod.1' in url
+    assert fake_site.stats['uploads'] == 1
+    assert fake_site.stats['saves'] == 1
+
+
+def test_stale_token_is_refreshed(fake_site, tmp_path):
+    uploader = HttpUploader(CONFIG, [])
+    add_url = fake_site.url + fake_site.add_path('1')
+    uploader.fetch_form(add_url)
+    fake_site.rotate_token()
+    uploader.upload_zip(add_url, make_zip(tmp_path), 'My Mod', '', '', '')
+    assert fake_site.stats['form_views'] == 2
+    assert fake_site.stats['saves'] == 1
+    assert uploader.fetch_form(add_url)['fields']['_xfToken'] == fake_site.token
+
+
+def test_threads_upload_concurrently(fake_site, tmp_path):
+    uploader = HttpUploader(CONFIG, [])
+    add_url = fake_site.url + fake_site.add_path('2')
+    zips = [make_zip(tmp_path, f'mod{i}.zip') for i in range(8)]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        urls = list(pool.map(lambda z: uploader.upload_zip(add_url, z, z, '', '', ''), zips))
+    assert len(set(urls)) == 8
+    assert fake_site.stats['saves'] == 8
+    assert fake_site.stats['rejected_saves'] == 0
+
+
+def test_throttled_requests_wait_before_retrying_without_rate_limiting(fake_site, tmp_path):
+    limiter = RateLimiter(multiprocessing.get_context('spawn'), {'rate_limit': False})
+    uploader = HttpUploader(CONFIG, [], limiter=limiter)
+    fake_site.throttle(2, retry_after=0.2)
+    started = time.perf_counter()
+    uploader.upload_zip(fake_site.url + fake_site.add_path('1'), make_zip(tmp_path), 'My Mod', '', '', '')
+    assert time.perf_counter() - started >= 0.4
+    assert fake_site.stats['saves'] == 1
+
+
+def test_throttled_requests_fall_back_to_fixed_waits(fake_site, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(http_uploader.time, 'sleep', sleeps.append)
+    uploader = HttpUploader(CONFIG, [], limiter=RateLimiter(multiprocessing.get_context('spawn'), {'rate_limit': False}))
+    fake_site.throttle(3)
+    resp = uploader._request('GET', fake_site.url + fake_site.add_path('1'))
+    assert resp.status_code == 429
+    assert sleeps == [10, 20]
+
+
+def test_upload_reports_each_step(fake_site, tmp_path):
+    uploader = HttpUploader(CONFIG, [])
+    add_url = fake_site.url + fake_site.add_path('1')
+    steps = []
+    uploader.upload_zip(add_url, make_zip(tmp_path), 'My Mod', '', '', '', steps.append)
+    assert steps == ['form', 'attached', 'uploaded', 'submitted']
+    # A stale token starts over from a fresh form
+    fake_site.rotate_token()
+    steps.clear()
+    uploader.upload_zip(add_url, make_zip(tmp_path, 'other.zip'), 'Other', '', '', '', steps.append)
+    assert steps == ['form', 'attached', 'form', 'attached', 'uploaded', 'submitted']
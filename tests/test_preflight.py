@@ -0,0 +1,49 @@
+import zipfile
+
+import pytest
+
+import preflight
+from progress_db import init_db, load_metadata
+
+
+@pytest.fixture
+def zips(db_path):
+    init_db()
+    with zipfile.ZipFile('with_readme.zip', 'w') as zf:
+        zf.writestr('mod/README.md', 'Description: Adds a new car\nand more')
+        zf.writestr('mod/car.bin', b'\x00' * 1000)
+    with zipfile.ZipFile('no_readme.zip', 'w') as zf:
+        zf.writestr('car.bin', b'\x00' * 10)
+    with open('corrupt.zip', 'wb') as f:
+        f.write(b'this is not a zip')
+    yield ['with_readme.zip', 'no_readme.zip', 'corrupt.zip']
+    preflight.shutdown_pool()
+
+
+def test_scan_zip_reads_the_readme_and_flags_corrupt_archives(zips):
+    record = preflight.scan_zip('with_readme.zip')
+    assert record['ok'] and record['title'] == 'with readme'
+    assert record['tag_line'] == 'Adds a new car and more'
+    assert preflight.scan_zip('no_readme.zip')['tag_line'] == 'no readme'
+    record = preflight.scan_zip('corrupt.zip')
+    assert not record['ok'] and record['error'].startswith('Corrupt archive')
+
+
+def test_run_preflight_scans_in_order_and_caches(zips, monkeypatch):
+    records = list(preflight.run_preflight(zips, 2))
+    assert [r['zip_path'] for r in records] == zips
+    assert [r['ok'] for r in records] == [True, True, False]
+    assert load_metadata('with_readme.zip')['tag_line'] == 'Adds a new car and more'
+    # Everything is cached now, so a second pass never touches the pool
+    monkeypatch.setattr(preflight, 'get_pool', None)
+    cached = list(preflight.run_preflight(zips, 2))
+    assert [(r['zip_path'], r['ok'], r['tag_line']) for r in cached] == [(r['zip_path'], r['ok'], r['tag_line']) for r in records]
+
+
+def test_the_pool_is_kept_and_never_forks(zips):
+    pool = preflight.get_pool(2)
+    assert pool._mp_context.get_start_method() != 'fork'
+    list(preflight.run_preflight(zips, 2))
+    assert preflight.get_pool(2) is pool
+    preflight.shutdown_pool()
+    assert preflight.get_pool(2) is not pool
@@ -0,0 +1,112 @@
+import sqlite3
+
+import progress_db
+
+
+def columns(path, table):
+    with sqlite3.connect(path) as conn:
+        return [row[1] for row in conn.execute(f'PRAGMA table_info({table})')]
+
+
+def test_fresh_database_is_at_the_current_version(db_path):
+    progress_db.init_db()
+    conn = progress_db.get_connection()
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == progress_db.SCHEMA_VERSION
+    assert {'content_hash', 'worker'} <= set(columns(db_path, 'uploads'))
+    # Running it again on an up-to-date database changes nothing
+    progress_db.init_db()
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == progress_db.SCHEMA_VERSION
+
+
+def test_legacy_processed_zips_become_done_uploads(db_path):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute('CREATE TABLE processed_zips (zip_path TEXT PRIMARY KEY)')
+        conn.executemany('INSERT INTO processed_zips VALUES (?)', [('a.zip',), ('b.zip',)])
+    progress_db.init_db()
+    conn = progress_db.get_connection()
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == progress_db.SCHEMA_VERSION
+    assert conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'processed_zips'").fetchone() is None
+    assert dict(conn.execute('SELECT zip_path, state FROM uploads').fetchall()) == {'a.zip': 'done', 'b.zip': 'done'}
+    assert progress_db.is_processed('a.zip')
+    assert progress_db.filter_unprocessed(['a.zip', 'b.zip', 'c.zip']) == ['c.zip']
+
+
+def test_version_one_database_gains_the_new_columns(db_path):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE uploads (zip_path TEXT PRIMARY KEY, state TEXT NOT NULL DEFAULT 'pending', attempts INTEGER NOT NULL DEFAULT 0, last_error TEXT, bytes INTEGER, queued_at REAL, started_at REAL, attached_at REAL, uploaded_at REAL, submitted_at REAL, finished_at REAL, remote_url TEXT)")
+        conn.execute("INSERT INTO uploads (zip_path, state) VALUES ('a.zip', 'done')")
+        conn.execute('PRAGMA user_version = 1')
+    progress_db.init_db()
+    assert {'content_hash', 'worker'} <= set(columns(db_path, 'uploads'))
+    assert progress_db.is_processed('a.zip')
+    assert progress_db.get_connection().execute('PRAGMA user_version').fetchone()[0] == progress_db.SCHEMA_VERSION
+
+
+def test_mark_failed_never_undoes_a_finished_upload(db_path):
+    progress_db.init_db()
+    progress_db.mark_processed('a.zip', 'https://example.com/downloads/a.1/')
+    progress_db.mark_failed('a.zip', 'late error')
+    progress_db.mark_failed('b.zip', 'timed out')
+    conn = progress_db.get_connection()
+    assert conn.execute("SELECT state, last_error FROM uploads WHERE zip_path = 'a.zip'").fetchone() == ('done', None)
+    assert conn.execute("SELECT state, last_error FROM uploads WHERE zip_path = 'b.zip'").fetchone() == ('failed', 'timed out')
+
+
+def write_zip(name, content):
+    with open(name, 'wb') as f:
+        f.write(content)
+    return name
+
+
+def test_index_hashes_reuses_entries_while_size_and_mtime_match(db_path, monkeypatch):
+    progress_db.init_db()
+    a = write_zip('a.zip', b'first')
+    b = write_zip('b.zip', b'second')
+    hashed = []
+    hash_file = progress_db.hash_file
+    monkeypatch.setattr(progress_db, 'hash_file', lambda z: hashed.append(z) or hash_file(z))
+    first = progress_db.index_hashes([a, b], 1)
+    assert sorted(hashed) == ['a.zip', 'b.zip']
+    hashed.clear()
+    assert progress_db.index_hashes([a, b], 1) == first
+    assert hashed == []
+    write_zip('b.zip', b'changed')
+    second = progress_db.index_hashes([a, b], 1)
+    assert hashed == ['b.zip']
+    assert second['a.zip'] == first['a.zip'] and second['b.zip'] != first['b.zip']
+
+
+def test_index_hashes_skips_zips_that_disappeared(db_path):
+    progress_db.init_db()
+    a = write_zip('a.zip', b'first')
+    assert list(progress_db.index_hashes([a, 'gone.zip'], 1)) == ['a.zip']
+
+
+def test_duplicates_within_one_batch_are_queued_once(db_path):
+    progress_db.init_db()
+    zips = [write_zip('a.zip', b'same'), write_zip('b.zip', b'same'), write_zip('c.zip', b'other')]
+    progress_db.mark_queued(zips)
+    hashes = progress_db.index_hashes(zips, 1)
+    assert progress_db.filter_unprocessed(zips, hashes) == ['a.zip', 'c.zip']
+
+
+def test_copy_of_an_uploaded_zip_is_skipped(db_path):
+    progress_db.init_db()
+    a = write_zip('a.zip', b'same')
+    progress_db.index_hashes([a], 1)
+    progress_db.mark_started(a)
+    progress_db.mark_processed(a)
+    copy = write_zip('copy.zip', b'same')
+    new = write_zip('new.zip', b'new')
+    hashes = progress_db.index_hashes([a, copy, new], 1)
+    assert progress_db.filter_unprocessed([a, copy, new], hashes) == ['new.zip']
+
+
+def test_copy_of_a_queued_zip_is_skipped(db_path):
+    progress_db.init_db()
+    queued_hashes = set()
+    a = write_zip('a.zip', b'same')
+    assert progress_db.filter_unprocessed([a], progress_db.index_hashes([a], 1), queued_hashes) == [a]
+    # Later, while a.zip is still waiting or uploading, a copy lands in the watched folder
+    copy = write_zip('copy.zip', b'same')
+    assert progress_db.filter_unprocessed([copy], progress_db.index_hashes([copy], 1), queued_hashes) == []
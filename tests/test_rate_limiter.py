@@ -0,0 +1,106 @@
+import multiprocessing
+
+import pytest
+
+import rate_limiter
+from rate_limiter import PENALTY_DEBOUNCE_SECONDS, RateLimiter, TokenBucket
+
+CTX = multiprocessing.get_context('spawn')
+CONFIG = {'rate_min_per_minute': 6, 'rate_recovery_seconds': 30, 'rate_increase': 0.1}
+
+
+class FakeClock:
+    """Stands in for the time module; sleeping just moves the clock forward."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def time(self):
+        return self.now
+
+    perf_counter = time
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, 'time', clock)
+    return clock
+
+
+def test_bucket_allows_a_burst_then_paces(clock):
+    bucket = TokenBucket(CTX, 'site', 60, 3, CONFIG)
+    assert [bucket.take() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.take() == pytest.approx(1.0)
+    clock.now += 0.5
+    assert bucket.take() == pytest.approx(0.5)
+    clock.now += 0.5
+    assert bucket.take() == 0.0
+
+
+def test_acquire_sleeps_until_a_token_is_free(clock):
+    limiter = RateLimiter(CTX, dict(CONFIG, site_rate_per_minute=30, site_burst=1))
+    assert limiter.acquire() == 0.0
+    assert limiter.acquire() == pytest.approx(2.0)
+    assert sum(clock.slept) == pytest.approx(2.0)
+
+
+def test_penalize_halves_the_rate_once_per_burst_of_throttles(clock):
+    bucket = TokenBucket(CTX, 'site', 60, 3, CONFIG)
+    assert bucket.penalize() * 60 == pytest.approx(30)
+    # Workers hitting the same throttle right after count as one penalty
+    clock.now += PENALTY_DEBOUNCE_SECONDS / 2
+    assert bucket.penalize() * 60 == pytest.approx(30)
+    clock.now += PENALTY_DEBOUNCE_SECONDS
+    assert bucket.penalize() * 60 == pytest.approx(15)
+
+
+def test_penalize_drains_the_bucket_and_honours_the_pause(clock):
+    bucket = TokenBucket(CTX, 'site', 60, 3, CONFIG)
+    bucket.penalize(pause=10)
+    # Half a token per second now, and ten seconds of pause on top of the empty bucket
+    assert bucket.take() == pytest.approx(12.0)
+
+
+def test_rate_never_drops_below_the_minimum(clock):
+    bucket = TokenBucket(CTX, 'site', 60, 3, CONFIG)
+    for _ in range(10):
+        bucket.penalize()
+        clock.now += PENALTY_DEBOUNCE_SECONDS
+    assert bucket.per_minute == pytest.approx(6)
+
+
+def test_rate_recovers_only_after_a_quiet_spell(clock):
+    bucket = TokenBucket(CTX, 'site', 60, 3, CONFIG)
+    bucket.penalize()
+    bucket.succeeded()
+    assert bucket.per_minute == pytest.approx(30)
+    clock.now += 30
+    bucket.succeeded()
+    assert bucket.per_minute == pytest.approx(36)
+
+
+def test_account_throttles_only_slow_that_account(clock):
+    limiter = RateLimiter(CTX, CONFIG, accounts=['alice', 'bob'])
+    limiter.penalize('alice')
+    assert limiter.accounts['alice'].per_minute == pytest.approx(10)
+    assert limiter.accounts['bob'].per_minute == pytest.approx(20)
+    assert limiter.site.per_minute == pytest.approx(30)
+    limiter.penalize('bob', site_wide=True)
+    assert limiter.site.per_minute == pytest.approx(15)
+
+
+def test_waiting_on_an_account_does_not_hold_site_budget(clock):
+    limiter = RateLimiter(CTX, dict(CONFIG, account_burst=1, site_burst=4), accounts=['alice', 'bob'])
+    limiter.acquire('alice')
+    site_tokens = []
+    sleep = clock.sleep
+    clock.sleep = lambda seconds: site_tokens.append(limiter.site._state[rate_limiter.TOKENS]) or sleep(seconds)
+    # alice's own budget is spent, so she waits for it with the site's tokens still free for bob
+    limiter.acquire('alice')
+    assert site_tokens and all(tokens >= 3 for tokens in site_tokens)
@@ -0,0 +1,83 @@
+import os
+
+import pytest
+
+from categories import CategoryIndex
+from routing import RoutingError, find_zips, lookup_category, route_zip, route_zips
+
+CATEGORIES = {
+    '1': {'name': 'Emulators', 'href': 'https://example.com/downloads/categories/emulators.1667/add'},
+    '2': {'name': 'Mods', 'href': 'https://example.com/downloads/categories/mods.20/add'},
+    '3': {'name': 'Mods', 'href': 'https://example.com/downloads/categories/mods.21/add'},
+    '4': {'name': 'Tools', 'href': 'https://example.com/downloads/categories/tools.30/add'},
+}
+INDEX = CategoryIndex(CATEGORIES)
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('zipsToUpload')
+    return tmp_path
+
+
+def touch(path, content=''):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content)
+    return path
+
+
+def test_lookup_accepts_cat_ids_slugs_keys_and_names():
+    assert lookup_category(INDEX, '1667')['name'] == 'Emulators'
+    assert lookup_category(INDEX, 'tools.30')['cat_id'] == '30'
+    assert lookup_category(INDEX, '4')['name'] == 'Tools'
+    assert lookup_category(INDEX, 'emulators')['cat_id'] == '1667'
+
+
+def test_an_ambiguous_name_is_an_error():
+    with pytest.raises(RoutingError, match='ambiguous'):
+        lookup_category(INDEX, 'Mods')
+
+
+def test_sidecar_beats_folder_beats_rules(upload_dir):
+    config = {'category_rules': [{'pattern': 'cheat', 'category': '30'}]}
+    record = {'title': 'cheat menu', 'description': ''}
+    zip_path = touch('zipsToUpload/Emulators/menu.zip')
+    assert route_zip(zip_path, config, INDEX, record)['cat_id'] == '1667'
+    touch('zipsToUpload/Emulators/menu.category', '\nmods.21\n')
+    assert route_zip(zip_path, config, INDEX, record)['cat_id'] == '21'
+    top_level = touch('zipsToUpload/menu.zip')
+    assert route_zip(top_level, config, INDEX, record)['cat_id'] == '30'
+    assert route_zip(top_level, {}, INDEX, record) is None
+
+
+def test_an_unknown_folder_falls_back_to_rules_and_is_reported(upload_dir):
+    config = {'category_rules': [{'pattern': 'cheat', 'category': 'Tools'}]}
+    unknown = set()
+    zip_path = touch('zipsToUpload/my stuff/menu.zip')
+    assert route_zip(zip_path, config, INDEX, {'title': 'cheat menu'}, unknown)['cat_id'] == '30'
+    assert route_zip(zip_path, config, INDEX, {'title': 'skin'}, unknown) is None
+    assert unknown == {os.path.join('zipsToUpload', 'my stuff')}
+
+
+def test_route_zips_separates_errors_and_unknown_folders(upload_dir):
+    zips = [
+        touch('zipsToUpload/a.zip'),
+        touch('zipsToUpload/Mods/b.zip'),
+        touch('zipsToUpload/sorted/c.zip'),
+        touch('zipsToUpload/d.zip'),
+    ]
+    touch('zipsToUpload/d.category', 'Nope')
+    routes, errors, unknown = route_zips(zips, {}, CATEGORIES)
+    assert routes == {zips[0]: None, zips[2]: None}
+    assert set(errors) == {zips[1], zips[3]}
+    assert unknown == [os.path.join('zipsToUpload', 'sorted')]
+
+
+def test_find_zips_looks_one_level_deep(upload_dir):
+    touch('zipsToUpload/a.zip')
+    touch('zipsToUpload/Mods/b.zip')
+    touch('zipsToUpload/Mods/deeper/c.zip')
+    touch('zipsToUpload/notes.txt')
+    assert sorted(find_zips()) == [os.path.join('zipsToUpload', 'Mods', 'b.zip'), os.path.join('zipsToUpload', 'a.zip')]
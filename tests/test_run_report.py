@@ -0,0 +1,84 @@
+import pytest
+
+import progress_db
+import run_report
+from run_report import StepTimer, build_orchestration_report, build_run_report, percentile
+
+MB = 1024 * 1024
+
+
+@pytest.fixture
+def db(db_path):
+    progress_db.init_db()
+    return progress_db.get_connection()
+
+
+def add_upload(conn, zip_path, worker, size, started_at, finished_at):
+    conn.execute("INSERT INTO uploads (zip_path, state, worker, bytes, started_at, finished_at) VALUES (?, 'done', ?, ?, ?, ?)",
+                 (zip_path, worker, size, started_at, finished_at))
+
+
+def test_percentile_is_nearest_rank():
+    values = [10, 1, 4, 2, 3]
+    assert percentile(values, 50) == 3
+    assert percentile(values, 95) == 10
+    assert percentile(values, 0) == 1
+    assert percentile([7], 95) == 7
+
+
+def test_step_timer_records_laps(db, monkeypatch):
+    now = [1000.0]
+    clock = type('Clock', (), {'time': staticmethod(lambda: now[0]), 'perf_counter': staticmethod(lambda: now[0])})
+    monkeypatch.setattr(run_report, 'time', clock)
+    timer = StepTimer('a.zip', 3)
+    now[0] += 2.5
+    timer.lap('fill')
+    now[0] += 1
+    timer.lap('attach')
+    StepTimer('b.zip', 3, enabled=False).lap('fill')
+    rows = db.execute('SELECT zip_path, worker, step, started_at, seconds FROM step_timings ORDER BY id').fetchall()
+    assert rows == [('a.zip', '3', 'fill', 1000.0, 2.5), ('a.zip', '3', 'attach', 1002.5, 1.0)]
+
+
+def test_empty_run(db):
+    assert build_run_report(1000) == ["Run report: nothing was uploaded."]
+    assert build_orchestration_report(1000, 1100) == ["Orchestration report: no worker activity was recorded."]
+
+
+def test_run_report_percentiles_and_throughput(db):
+    for seconds in (1, 2, 3, 4, 10):
+        progress_db.record_step_timing('a.zip', 'upload', seconds, 0, 1000)
+    progress_db.record_step_timing('a.zip', 'fill', 0.5, 0, 1000)
+    # Before the run started, so left out
+    progress_db.record_step_timing('old.zip', 'upload', 99, 0, 500)
+    add_upload(db, 'a.zip', '0', 12 * MB, 1000, 1200)
+    add_upload(db, 'b.zip', '0', 24 * MB, 1200, 1360)
+    add_upload(db, 'c.zip', 'http', 18 * MB, 1100, 1280)
+    add_upload(db, 'old.zip', '0', MB, 400, 500)
+    assert build_run_report(1000) == [
+        "Run report:",
+        "  step          count    p50 s    p95 s   total s",
+        "  fill              1     0.50     0.50       0.5",
+        "  upload            5     3.00    10.00      20.0",
+        "  Browser 0: 2 files, 20.0 files/hour, 0.10 MB/s",
+        "  HTTP: 1 files, 20.0 files/hour, 0.10 MB/s",
+        "  Total: 3 files in 6.0 min, 30.0 files/hour",
+    ]
+
+
+def test_orchestration_report_splits_worker_time(db):
+    progress_db.record_step_timing('a.zip', 'queue_wait', 10, 0, 1000)
+    progress_db.record_step_timing('a.zip', 'upload', 40, 0, 1010)
+    progress_db.record_step_timing('b.zip', 'upload', 60, 1, 1020)
+    assert build_orchestration_report(1000, 1100) == [
+        "Orchestration report: 2 workers, makespan 100.0 s",
+        "  per worker       min s    p50 s    p95 s    max s",
+        "  start-up          0.00     0.00    20.00    20.00",
+        "  busy             40.00    40.00    60.00    60.00",
+        "  queue wait        0.00     0.00    10.00    10.00",
+        "  idle             40.00    40.00    50.00    50.00",
+        "  idle at end      20.00    20.00    50.00    50.00",
+        "  Queue: 1 gets, wait p50 10000.0 ms, p95 10000.0 ms, max 10000.0 ms",
+        "  Utilisation: 50.0% of worker time spent on uploads",
+        "  Least busy: 0 (40%), 1 (60%)",
+    ]
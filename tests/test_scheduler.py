@@ -0,0 +1,47 @@
+import pytest
+
+from scheduler import order_work, predict_makespan
+
+MB = 1024 * 1024
+CONFIG = {'upload_wait_base': 0, 'upload_wait_per_mb': 1}
+SIZES = {'a.zip': 1 * MB, 'd.zip': 2 * MB, 'c.zip': 5 * MB, 'b.zip': 10 * MB}
+
+
+def test_predict_makespan_hands_jobs_to_the_first_free_worker():
+    assert predict_makespan([], 2) == 0.0
+    assert predict_makespan([1, 1, 10], 2) == 11
+    assert predict_makespan([10, 1, 1], 2) == 10
+
+
+def test_largest_first_is_lpt_order():
+    ordered, predicted, baseline = order_work(list(SIZES), CONFIG, 2, sizes=SIZES)
+    assert ordered == ['b.zip', 'c.zip', 'd.zip', 'a.zip']
+    assert predicted == 10
+    assert baseline == 12
+    assert predicted <= baseline
+
+
+def test_smallest_first_and_fifo():
+    ordered, _, _ = order_work(list(SIZES), dict(CONFIG, schedule='smallest_first'), 2, sizes=SIZES)
+    assert ordered == ['a.zip', 'd.zip', 'c.zip', 'b.zip']
+    ordered, _, _ = order_work(list(SIZES), dict(CONFIG, schedule='fifo'), 2, sizes=SIZES)
+    assert ordered == list(SIZES)
+
+
+def test_unknown_schedule_is_rejected():
+    with pytest.raises(ValueError):
+        order_work(list(SIZES), dict(CONFIG, schedule='random'), 2, sizes=SIZES)
+
+
+def test_groups_are_queued_back_to_back_largest_group_first():
+    groups = {'a.zip': 'maps', 'b.zip': 'skins', 'c.zip': 'maps', 'd.zip': 'maps'}
+    sizes = dict(SIZES, **{'a.zip': 4 * MB})
+    ordered, _, _ = order_work(list(sizes), CONFIG, 2, sizes=sizes, groups=groups)
+    # maps totals 11 MB against skins' 10, and inside a group the largest zip still goes first
+    assert ordered == ['c.zip', 'a.zip', 'd.zip', 'b.zip']
+
+
+def test_grouping_can_be_turned_off():
+    groups = {'a.zip': 'maps', 'b.zip': 'skins', 'c.zip': 'maps', 'd.zip': 'maps'}
+    ordered, _, _ = order_work(list(SIZES), dict(CONFIG, group_by_category=False), 2, sizes=SIZES, groups=groups)
+    assert ordered == ['b.zip', 'c.zip', 'd.zip', 'a.zip']
@@ -0,0 +1,147 @@
+import json
+import multiprocessing
+import os
+
+import pytest
+
+import session_pool
+from rate_limiter import PENALTY_DEBOUNCE_SECONDS
+from session_pool import SessionPool, check_cookie_file, list_cookie_files
+
+CTX = multiprocessing.get_context('spawn')
+CONFIG = {'user_agent': 'pytest', 'site': 'bob', 'account_max_strikes': 2, 'account_cooldown_seconds': 60}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(session_pool, 'time', clock)
+    return clock
+
+
+def make_pool(config=CONFIG, accounts=('alice', 'bob')):
+    return SessionPool(CTX, config, [os.path.join('cookies', f'{a}.json') for a in accounts])
+
+
+def strike(pool, account, clock, times):
+    for _ in range(times):
+        pool.throttled(account)
+        clock.now += PENALTY_DEBOUNCE_SECONDS
+
+
+def test_list_cookie_files_puts_the_site_account_first(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('cookies')
+    for name in ('alice', 'bob', 'carol'):
+        open(os.path.join('cookies', f'{name}.json'), 'w').close()
+    assert [os.path.basename(f) for f in list_cookie_files(CONFIG)] == ['bob.json', 'alice.json', 'carol.json']
+
+
+def test_assign_spreads_workers_over_accounts(clock):
+    pool = make_pool()
+    assert [pool.assign() for _ in range(4)] == ['alice', 'bob', 'alice', 'bob']
+    pool.release('alice')
+    assert pool.assign() == 'alice'
+
+
+def test_assign_prefers_the_account_with_fewer_uploads(clock):
+    pool = make_pool()
+    pool.uploaded('alice')
+    assert pool.assign() == 'bob'
+
+
+def test_max_workers_caps_each_account(clock):
+    pool = make_pool(dict(CONFIG, account_max_workers=1), accounts=('alice',))
+    assert pool.assign() == 'alice'
+    # The only account is full and nothing is cooling down, so there is nothing to wait for
+    assert pool.assign() is None
+
+
+def test_strikes_cool_an_account_down_and_it_comes_back(clock):
+    pool = make_pool()
+    assert not pool.throttled('alice')
+    clock.now += PENALTY_DEBOUNCE_SECONDS
+    assert pool.throttled('alice')
+    assert not pool.usable('alice')
+    assert pool.describe('alice') == 'alice: 0 uploads, cooling down'
+    assert [pool.assign(), pool.assign()] == ['bob', 'bob']
+    clock.now += 60
+    assert pool.usable('alice')
+    assert pool.describe('alice') == 'alice: 0 uploads, ready'
+    # The cool-down wiped the slate clean
+    assert not pool.throttled('alice')
+
+
+def test_simultaneous_throttles_are_one_strike(clock):
+    pool = make_pool()
+    assert not pool.throttled('alice')
+    assert not pool.throttled('alice')
+    assert pool.usable('alice')
+
+
+def test_an_upload_clears_the_strikes(clock):
+    pool = make_pool()
+    strike(pool, 'alice', clock, 1)
+    pool.uploaded('alice')
+    strike(pool, 'alice', clock, 1)
+    assert pool.usable('alice')
+
+
+def test_assign_waits_for_a_cooling_account(clock):
+    pool = make_pool(accounts=('alice',))
+    strike(pool, 'alice', clock, 2)
+    started = clock.now
+    assert pool.assign() == 'alice'
+    assert clock.now - started >= 60 - 2 * PENALTY_DEBOUNCE_SECONDS
+
+
+def test_logged_out_and_spent_accounts_stay_out(clock):
+    pool = make_pool(dict(CONFIG, account_max_uploads=1))
+    pool.logged_out('alice')
+    pool.uploaded('bob')
+    assert not pool.usable('alice') and not pool.usable('bob')
+    assert pool.describe('alice') == 'alice: 0 uploads, logged out'
+    assert pool.describe('bob') == 'bob: 1 uploads, upload budget used'
+    assert pool.assign() is None
+
+
+def test_unknown_accounts_are_ignored(clock):
+    pool = make_pool()
+    assert pool.usable(None)
+    assert not pool.throttled(None)
+    pool.release(None)
+    pool.logged_out(None)
+    pool.uploaded(None)
+
+
+def write_cookies(tmp_path, name, cookies):
+    path = tmp_path / f'{name}.json'
+    path.write_text(cookies if isinstance(cookies, str) else json.dumps(cookies))
+    return str(path)
+
+
+def test_check_cookie_file(fake_site, tmp_path):
+    live = [{'name': 'xf_user', 'value': '1', 'expirationDate': 4102444800}]
+    assert check_cookie_file(CONFIG, write_cookies(tmp_path, 'live', live), fake_site.url) == 'logged_in'
+    expired = [{'name': 'xf_user', 'value': '1', 'expiry': 1}]
+    assert check_cookie_file(CONFIG, write_cookies(tmp_path, 'expired', expired), fake_site.url) == 'invalid'
+    assert check_cookie_file(CONFIG, write_cookies(tmp_path, 'broken', '{not json'), fake_site.url) == 'invalid'
+    assert check_cookie_file(CONFIG, write_cookies(tmp_path, 'dict', {'name': 'x'}), fake_site.url) == 'invalid'
+    assert check_cookie_file(CONFIG, str(tmp_path / 'missing.json'), fake_site.url) == 'invalid'
+
+
+def test_check_cookie_file_when_the_site_is_unreachable(tmp_path):
+    live = [{'name': 'xf_user', 'value': '1'}]
+    # Nothing listens on port 9, so the login state cannot be told
+    assert check_cookie_file(CONFIG, write_cookies(tmp_path, 'live', live), 'http://127.0.0.1:9/', timeout=2) == 'unknown'
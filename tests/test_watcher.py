@@ -0,0 +1,154 @@
+import os
+import queue
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import watcher
+from watcher import MAX_DEPTH, _ZipHandler, _within_depth, watch_zips
+
+
+class FakeObserver:
+    """Stands in for watchdog's Observer; events are delivered by calling the handler directly."""
+
+    instances = []
+
+    def __init__(self):
+        self.handler = None
+        self.stopped = False
+        FakeObserver.instances.append(self)
+
+    def schedule(self, handler, folder, recursive=False):
+        self.handler = handler
+
+    def start(self):
+        pass
+
+    def stop(self):
+        self.stopped = True
+
+    def join(self):
+        pass
+
+
+@pytest.fixture
+def folder(tmp_path):
+    path = tmp_path / 'zipsToUpload'
+    path.mkdir()
+    return str(path)
+
+
+@pytest.fixture
+def watch(folder):
+    """Run watch_zips on a thread; returns (results queue, stop event)."""
+    threads = []
+    stop = threading.Event()
+
+    def start(known=(), settle_seconds=0.2):
+        results = queue.Queue()
+
+        def run():
+            for path in watch_zips(folder, known, settle_seconds, 0.02, stop):
+                results.put(path)
+            results.put(None)
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        threads.append(thread)
+        return results
+
+    yield start, stop
+    stop.set()
+    for thread in threads:
+        thread.join(5)
+
+
+def write(path, data=b'PK'):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'ab') as f:
+        f.write(data)
+
+
+def drain(results, timeout=1.0):
+    found = []
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            found.append(results.get(timeout=0.05))
+        except queue.Empty:
+            pass
+    return found
+
+
+def test_depth_covers_the_folder_and_one_subfolder(folder):
+    assert MAX_DEPTH == 2
+    assert _within_depth(folder, os.path.join(folder, 'a.zip'))
+    assert _within_depth(folder, os.path.join(folder, 'Mods', 'a.zip'))
+    assert not _within_depth(folder, os.path.join(folder, 'Mods', 'old', 'a.zip'))
+
+
+def test_handler_only_offers_zips_within_depth(folder):
+    candidates = queue.Queue()
+    handler = _ZipHandler(folder, candidates)
+    event = lambda path, **kw: SimpleNamespace(src_path=path, dest_path=kw.get('dest'), is_directory=kw.get('is_directory', False))
+    handler.on_created(event(os.path.join(folder, 'a.zip')))
+    handler.on_created(event(os.path.join(folder, 'notes.txt')))
+    handler.on_created(event(os.path.join(folder, 'Mods', 'old', 'b.zip')))
+    handler.on_created(event(os.path.join(folder, 'dir.zip'), is_directory=True))
+    handler.on_moved(event(os.path.join(folder, 'c.zip.part'), dest=os.path.join(folder, 'Mods', 'c.zip')))
+    assert list(candidates.queue) == [os.path.join(folder, 'a.zip'), os.path.join(folder, 'Mods', 'c.zip')]
+
+
+def test_polling_yields_settled_zips_once(folder, watch, monkeypatch):
+    monkeypatch.setattr(watcher, 'Observer', None)
+    write(os.path.join(folder, 'old.zip'))
+    start, stop = watch
+    results = start(known=[os.path.join(folder, 'old.zip')])
+    write(os.path.join(folder, 'a.zip'))
+    write(os.path.join(folder, 'Mods', 'b.zip'))
+    write(os.path.join(folder, 'Mods', 'deep', 'c.zip'))
+    write(os.path.join(folder, 'readme.txt'))
+    assert sorted(drain(results)) == [os.path.join(folder, 'Mods', 'b.zip'), os.path.join(folder, 'a.zip')]
+
+
+def test_a_zip_still_being_written_waits_until_it_settles(folder, watch, monkeypatch):
+    monkeypatch.setattr(watcher, 'Observer', None)
+    start, stop = watch
+    results = start(settle_seconds=0.3)
+    path = os.path.join(folder, 'big.zip')
+    started = time.monotonic()
+    for _ in range(6):
+        write(path, b'x' * 1024)
+        time.sleep(0.1)
+    assert results.get(timeout=5) == path
+    # It kept growing for 0.5s and then had to stay unchanged for the settle time
+    assert time.monotonic() - started >= 0.8
+    assert drain(results, 0.5) == []
+
+
+def test_observer_events_replace_polling(folder, watch, monkeypatch):
+    FakeObserver.instances.clear()
+    monkeypatch.setattr(watcher, 'Observer', FakeObserver)
+    write(os.path.join(folder, 'before.zip'))
+    start, stop = watch
+    results = start()
+    assert results.get(timeout=5) == os.path.join(folder, 'before.zip')
+    # After the first scan only events bring in new zips
+    write(os.path.join(folder, 'quiet.zip'))
+    assert drain(results, 0.5) == []
+    observer = FakeObserver.instances[0]
+    observer.handler.on_created(SimpleNamespace(src_path=os.path.join(folder, 'quiet.zip'), is_directory=False))
+    assert results.get(timeout=5) == os.path.join(folder, 'quiet.zip')
+    stop.set()
+    assert results.get(timeout=5) is None
+    assert observer.stopped
+
+
+def test_stop_event_ends_the_watch(folder, watch, monkeypatch):
+    monkeypatch.setattr(watcher, 'Observer', None)
+    start, stop = watch
+    results = start()
+    stop.set()
+    assert results.get(timeout=5) is None
@@ -0,0 +1,101 @@
+import glob
+import os
+import queue
+import threading
+import time
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    # Without watchdog the folder is polled instead
+    FileSystemEventHandler = object
+    Observer = None
+
+
+# Zips directly in the folder or in one category subfolder, the same depth main() scans at startup
+MAX_DEPTH = 2
+
+
+def _within_depth(folder, path):
+    return len(os.path.relpath(path, folder).split(os.sep)) <= MAX_DEPTH
+
+
+class _ZipHandler(FileSystemEventHandler):
+    def __init__(self, folder, candidates):
+        super().__init__()
+        self.folder = folder
+        self.candidates = candidates
+
+    def _offer(self, path):
+        # The observer is recursive so new category folders are seen, but deeper zips are not uploaded
+        if path.lower().endswith('.zip') and _within_depth(self.folder, path):
+            self.candidates.put(path)
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self._offer(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self._offer(event.src_path)
+
+    def on_moved(self, event):
+        # Copy tools often write to a temp name and rename to .zip when done
+        if not event.is_directory:
+            self._offer(event.dest_path)
+
+
+def _key(path):
+    return os.path.normcase(os.path.abspath(path))
+
+
+def watch_zips(folder, known=(), settle_seconds=5, poll_interval=2, stop_event=None):
+    """Yield each new zip dropped into folder (or one of its direct subfolders) once its size and mtime stop changing.
+
+    Uses watchdog (inotify and friends) when installed and falls back to polling the folder.
+    Zips in known are treated as already handled. Runs until stop_event is set.
+    """
+    stop_event = stop_event or threading.Event()
+    seen = {_key(p) for p in known}
+    candidates = queue.Queue()
+    pending = {}
+    observer = None
+    if Observer is not None:
+        observer = Observer()
+        observer.schedule(_ZipHandler(folder, candidates), folder, recursive=True)
+        observer.start()
+    try:
+        # One scan up front catches anything dropped before the observer started
+        rescan = True
+        while not stop_event.is_set():
+            if rescan:
+                for path in glob.glob(os.path.join(folder, '*.zip')) + glob.glob(os.path.join(folder, '*', '*.zip')):
+                    candidates.put(path)
+                rescan = observer is None
+            while True:
+                try:
+                    path = candidates.get_nowait()
+                except queue.Empty:
+                    break
+                if _key(path) not in seen and path not in pending:
+                    pending[path] = None
+            for path, last in list(pending.items()):
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    del pending[path]
+                    continue
+                signature = (st.st_size, st.st_mtime_ns)
+                if last is None or last[0] != signature:
+                    # Still being written; restart the settle clock
+                    pending[path] = (signature, time.monotonic())
+                elif time.monotonic() - last[1] >= settle_seconds:
+                    del pending[path]
+                    seen.add(_key(path))
+                    yield path
+            stop_event.wait(poll_interval)
+    finally:
+        if observer is not None:
+            observer.stop()
+            observer.join()